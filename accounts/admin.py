@@ -3,6 +3,19 @@ from django.contrib.auth.admin import UserAdmin
 
 from .forms import CustomUserChangeForm, CustomUserCreationForm
 from .models import CustomUser
+from .roles import ROLE_GROUPS
+
+
+def set_role_action(role_name):
+    """Returns an admin action setting the role of the selected users."""
+    def set_role(modeladmin, request, queryset):
+        count = queryset.count()
+        CustomUser.objects.bulk_set_role(queryset, role_name)
+        modeladmin.message_user(request, f'{count} users are set to {role_name}.')
+
+    set_role.__name__ = f'set_role_{role_name.lower()}'
+    set_role.short_description = f'Set the selected users role to {role_name}'
+    return set_role
 
 
 @admin.register(CustomUser)
@@ -42,4 +55,5 @@ class CustomUserAdmin(UserAdmin):
         ),
     )
     ordering = ('email',)
+    actions = [set_role_action(role_name) for role_name in ROLE_GROUPS]
 
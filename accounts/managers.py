@@ -1,6 +1,10 @@
 from django.contrib.auth.base_user import BaseUserManager
+from django.db import transaction
+from django.db.models import QuerySet
 from django.utils.translation import ugettext_lazy as _
 
+from .roles import get_role_groups, get_role_group
+
 
 class CustomUserManager(BaseUserManager):
     """
@@ -32,3 +36,35 @@ class CustomUserManager(BaseUserManager):
         if kwargs.get('is_superuser') is not True:
             raise ValueError(_('Superuser must have is_superuser=True.'))
         return self.create_user(email, password, phone_number, **kwargs)
+
+    def bulk_set_role(self, users, role_name):
+        """
+        Set the role of many users in a fixed number of queries.
+
+        Args:
+            users (QuerySet|list<User>): the users to update
+            role_name (str): name of the new role
+
+        Raises:
+            ValueError: if `role_name` is not an existing role
+        """
+        group = get_role_group(role_name)
+        if isinstance(users, QuerySet):
+            user_ids = list(users.values_list('pk', flat=True))
+        else:
+            user_ids = [user.pk for user in users]
+
+        UserGroup = self.model.groups.through
+        with transaction.atomic():
+            UserGroup.objects.filter(
+                customuser_id__in=user_ids,
+                group__in=get_role_groups().values()
+            ).delete()
+            UserGroup.objects.bulk_create([
+                UserGroup(customuser_id=user_id, group=group)
+                for user_id in user_ids
+            ])
+
+        if not isinstance(users, QuerySet):
+            for user in users:
+                user._role = group
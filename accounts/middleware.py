@@ -0,0 +1,15 @@
+class RoleMiddleware:
+    """
+    Attaches the role of the logged in user to the request as `request.role`.
+
+    The role is cached on `request.user`, so the later role checks of the
+    views & templates don't query the database again.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        user = request.user
+        request.role = user.role if user.is_authenticated else None
+        return self.get_response(request)
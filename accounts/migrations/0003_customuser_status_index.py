@@ -0,0 +1,17 @@
+# Generated by Django 2.2.13 on 2026-10-18 16:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_customuser_supplier'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['status'], name='user_status_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_customuser_status_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='customuser',
+            name='user_status_idx',
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['is_active', 'is_superuser', 'status'], name='user_list_status_idx'),
+        ),
+    ]
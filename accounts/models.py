@@ -1,22 +1,15 @@
 from uuid import uuid4
 
 from django.conf import settings
-from django.contrib.auth.models import AbstractUser, Permission, Group
+from django.contrib.auth.models import AbstractUser, Permission
 from django.db import models
 
 from phonenumber_field.modelfields import PhoneNumberField
 
-from shared.constants import ROLE_ADMIN, ROLE_MANAGEMENT, ROLE_STAFF, \
-    ROLE_SUPPLIER, ROLE_GUEST
 from purchases.models import Supplier
 
 from .managers import CustomUserManager
-
-
-ROLE_GROUPS = [
-    ROLE_ADMIN, ROLE_MANAGEMENT,
-    ROLE_STAFF, ROLE_SUPPLIER, ROLE_GUEST
-]
+from .roles import ROLE_GROUPS, get_role_groups, get_role_group
 
 
 class CustomUser(AbstractUser):
@@ -51,32 +44,42 @@ class CustomUser(AbstractUser):
 
     class Meta(AbstractUser.Meta):
         default_related_name = 'users'
+        indexes = [
+            # Covers the listed users (active, not superusers) by status,
+            # so the facet counts read the index instead of the table
+            models.Index(
+                fields=['is_active', 'is_superuser', 'status'],
+                name='user_list_status_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.email
 
     @property
     def role(self):
-        """Gets user role."""
-        return self.groups.filter(name__in=ROLE_GROUPS).first()
+        """Gets user role.
+
+        The role is cached on the instance, so it's resolved once per request
+        for `request.user`. Use `clear_role_cache` to resolve it again.
+        """
+        if not hasattr(self, '_role'):
+            self._role = self.groups.filter(name__in=ROLE_GROUPS).first()
+        return self._role
 
     @role.setter
     def role(self, role_name):
         """Set user role."""
-        try:
-            # Predefined roles
-            admin_group = Group.objects.get(name=ROLE_ADMIN)
-            staff_group = Group.objects.get(name=ROLE_STAFF)
-            management_group = Group.objects.get(name=ROLE_MANAGEMENT)
-            supplier_group = Group.objects.get(name=ROLE_SUPPLIER)
-            guest_group = Group.objects.get(name=ROLE_GUEST)
-
-            # New role
-            group = Group.objects.get(name=role_name)
-            self.groups.remove(
-                admin_group, staff_group, management_group,
-                supplier_group, guest_group
-            )
-            self.groups.add(group)
-        except Group.DoesNotExist:
-            raise ValueError(f'{role_name} role does not exists.')
+        group = get_role_group(role_name)
+        self.groups.remove(*get_role_groups().values())
+        self.groups.add(group)
+        self._role = group
+
+    def clear_role_cache(self):
+        """Clears the cached user role."""
+        self.__dict__.pop('_role', None)
+
+    def refresh_from_db(self, *args, **kwargs):
+        """Reloads the user & clears the cached role."""
+        self.clear_role_cache()
+        super().refresh_from_db(*args, **kwargs)
@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.contrib.auth.models import Group
+
+from shared.cache import bump_version, get_or_compute, make_key
+from shared.constants import ROLE_ADMIN, ROLE_MANAGEMENT, ROLE_STAFF, \
+    ROLE_SUPPLIER, ROLE_GUEST
+
+
+ROLE_GROUPS = [
+    ROLE_ADMIN, ROLE_MANAGEMENT,
+    ROLE_STAFF, ROLE_SUPPLIER, ROLE_GUEST
+]
+
+# Namespace of the cached role groups, shared by the workers. It's bumped by
+# the `Group` save & delete signals.
+ROLE_GROUPS_NAMESPACE = 'accounts:roles'
+
+
+def compute_role_groups():
+    """Returns the existing role groups keyed by group name."""
+    groups = Group.objects.filter(name__in=ROLE_GROUPS)
+    return {group.name: group for group in groups}
+
+
+def get_role_groups():
+    """Returns the cached role groups keyed by group name.
+
+    Returns:
+        role_groups (dict<str, Group>): the existing role groups
+    """
+    return get_or_compute(
+        ROLE_GROUPS_NAMESPACE,
+        make_key(ROLE_GROUPS_NAMESPACE),
+        compute_role_groups,
+        settings.ROLE_GROUPS_TIMEOUT,
+        value_type=dict
+    )
+
+
+def get_role_group(role_name):
+    """Returns the group of a role.
+
+    Raises:
+        ValueError: if `role_name` is not an existing role
+    """
+    try:
+        return get_role_groups()[role_name]
+    except KeyError:
+        raise ValueError(f'{role_name} role does not exists.')
+
+
+def clear_role_groups():
+    """Invalidates the cached role groups of all the workers."""
+    bump_version(ROLE_GROUPS_NAMESPACE)
@@ -0,0 +1,23 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_save, post_delete
+from django.dispatch import receiver
+
+from .roles import clear_role_groups
+
+
+User = get_user_model()
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def clear_role_cache(sender, instance, action, reverse, **kwargs):
+    """Clears the cached role of a user whose groups are changed."""
+    if action in ('post_add', 'post_remove', 'post_clear') and not reverse:
+        instance.clear_role_cache()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def clear_role_group_registry(sender, **kwargs):
+    """Invalidates the role groups after a group is added, edited or deleted."""
+    clear_role_groups()
@@ -0,0 +1,201 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from shared.constants import ROLE_ADMIN, ROLE_STAFF, ROLE_GUEST
+from accounts.roles import ROLE_GROUPS, get_role_groups
+
+from .factories import UserFactory, AdminUserFactory
+
+
+User = get_user_model()
+
+
+class CustomUserRoleTests(TestCase):
+    """
+    Tests for the cached `role` property of the `CustomUser` model.
+    """
+    fixtures = ['roles']
+
+    def setUp(self):
+        self.user = User.objects.get(pk=AdminUserFactory().pk)
+
+    def test_role_is_resolved_once(self):
+        """
+        Ensure the role is queried on the first access only.
+        """
+        with self.assertNumQueries(1):
+            self.assertEqual(self.user.role.name, ROLE_ADMIN)
+            self.assertEqual(self.user.role.name, ROLE_ADMIN)
+
+    def test_user_without_role(self):
+        """
+        Ensure a missing role is cached as well.
+        """
+        user = UserFactory()
+        with self.assertNumQueries(1):
+            self.assertIsNone(user.role)
+            self.assertIsNone(user.role)
+
+    def test_role_setter_updates_cached_role(self):
+        """
+        Ensure the role setter replaces the cached role.
+        """
+        self.user.role
+        self.user.role = ROLE_STAFF
+
+        # Assertions
+        with self.assertNumQueries(0):
+            self.assertEqual(self.user.role.name, ROLE_STAFF)
+        self.assertEqual(User.objects.get(pk=self.user.pk).role.name, ROLE_STAFF)
+
+    def test_group_changes_clear_cached_role(self):
+        """
+        Ensure editing the user groups (e.g. from the admin) clears the
+        cached role.
+        """
+        self.user.role
+        self.user.groups.set([Group.objects.get(name=ROLE_STAFF)])
+
+        # Assertions
+        self.assertEqual(self.user.role.name, ROLE_STAFF)
+
+    def test_refresh_from_db_clears_cached_role(self):
+        """
+        Ensure `refresh_from_db` resolves the role again.
+        """
+        self.user.role
+        User.objects.get(pk=self.user.pk).groups.clear()
+        self.user.refresh_from_db()
+
+        # Assertions
+        self.assertIsNone(self.user.role)
+
+
+class RoleMiddlewareTests(TestCase):
+    """
+    Tests for the `RoleMiddleware` middleware.
+    """
+    fixtures = ['roles']
+
+    def test_role_is_queried_once_per_request(self):
+        """
+        Ensure the role is attached to the request & queried only once.
+        """
+        self.client.force_login(AdminUserFactory(status=User.ACTIVE))
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('customers:union-list'))
+        role_queries = [
+            query for query in context.captured_queries
+            if ROLE_ADMIN in query['sql'] and 'auth_group' in query['sql']
+        ]
+
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.role.name, ROLE_ADMIN)
+        self.assertEqual(len(role_queries), 1)
+
+    def test_anonymous_user_has_no_role(self):
+        """
+        Ensure anonymous requests have no role.
+        """
+        response = self.client.get(reverse('accounts:login'))
+
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.wsgi_request.role)
+
+
+@override_settings(ROLE_GROUPS_TIMEOUT=60)
+class RoleGroupRegistryTests(TestCase):
+    """
+    Tests for the cached role group registry.
+    """
+    fixtures = ['roles']
+
+    def setUp(self):
+        cache.clear()
+
+    def test_role_setter_uses_registry(self):
+        """
+        Ensure the role setter doesn't look up the role groups again.
+        """
+        user = UserFactory()
+        get_role_groups()
+
+        # Remove, then select & insert the new group
+        with self.assertNumQueries(3):
+            user.role = ROLE_ADMIN
+        self.assertEqual(User.objects.get(pk=user.pk).role.name, ROLE_ADMIN)
+
+    def test_registry_is_cached(self):
+        """
+        Ensure the role groups are read from the shared cache once loaded.
+        """
+        get_role_groups()
+        with self.assertNumQueries(0):
+            role_groups = get_role_groups()
+
+        # Assertions
+        self.assertEqual(set(role_groups), set(ROLE_GROUPS))
+
+    def test_role_setter_with_invalid_role(self):
+        """
+        Ensure setting an unknown role raises `ValueError`.
+        """
+        user = UserFactory()
+        with self.assertRaises(ValueError):
+            user.role = 'Unknown'
+
+    def test_registry_is_refreshed_on_group_changes(self):
+        """
+        Ensure saving or deleting a group reloads the registry.
+        """
+        group = get_role_groups()[ROLE_STAFF]
+        group.name = 'Renamed'
+        group.save()
+        self.assertNotIn(ROLE_STAFF, get_role_groups())
+        group.name = ROLE_STAFF
+        group.save()
+        self.assertIn(ROLE_STAFF, get_role_groups())
+
+        Group.objects.get(name=ROLE_STAFF).delete()
+        self.assertNotIn(ROLE_STAFF, get_role_groups())
+
+    def test_bulk_set_role_method(self):
+        """
+        Ensure `bulk_set_role` replaces the role of all the given users.
+        """
+        users = AdminUserFactory.create_batch(3) + UserFactory.create_batch(2)
+        User.objects.bulk_set_role(users, ROLE_STAFF)
+
+        # Assertions
+        for user in users:
+            self.assertEqual(user.role.name, ROLE_STAFF)
+            self.assertEqual(
+                list(User.objects.get(pk=user.pk).groups.all()),
+                [Group.objects.get(name=ROLE_STAFF)]
+            )
+
+    def test_bulk_set_role_query_count(self):
+        """
+        Ensure `bulk_set_role` runs a fixed number of queries regardless
+        of the number of users.
+        """
+        get_role_groups()
+        query_counts = []
+        for count in (2, 20):
+            AdminUserFactory.create_batch(count)
+            with CaptureQueriesContext(connection) as context:
+                User.objects.bulk_set_role(User.objects.all(), ROLE_GUEST)
+            query_counts.append(len(context.captured_queries))
+
+        # Assertions
+        self.assertEqual(query_counts[0], query_counts[1])
+        self.assertEqual(
+            User.objects.filter(groups__name=ROLE_GUEST).count(), 22
+        )
@@ -67,6 +67,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'accounts.middleware.RoleMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'livereload.middleware.LiveReloadScript',
@@ -150,6 +151,10 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'mediafiles')
 
+# Internal nginx location of MEDIA_ROOT (e.g. '/protected-media/'). When set,
+# generated files are sent by nginx via `X-Accel-Redirect`.
+MEDIA_X_ACCEL_REDIRECT = config('MEDIA_X_ACCEL_REDIRECT', default='')
+
 
 # Authentications
 AUTHENTICATION_BACKENDS = [
@@ -196,6 +201,66 @@ PHONENUMBER_DEFAULT_REGION = 'ET'
 PHONENUMBER_DB_FORMAT = 'NATIONAL'
 
 
+# Cache
+# Shared by all the workers through Redis (the `django-redis` backend),
+# falls back to a per-process memory cache when `CACHE_URL` is not set (only
+# in development, production requires it).
+CACHE_URL = config('CACHE_URL', default='')
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': CACHE_URL,
+            'KEY_PREFIX': 'woreket',
+            'OPTIONS': {
+                'SOCKET_TIMEOUT': 1,
+                'SOCKET_CONNECT_TIMEOUT': 1,
+            }
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+
+# REST API
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+    ],
+    'DEFAULT_PERMISSION_CLASSES': ['shared.api.HasAccessRole'],
+    'DEFAULT_PAGINATION_CLASS': 'shared.api.CursorPagination',
+}
+
+
+# Seconds to cache the status & role counts of the user list, 0 to disable
+USER_FACET_COUNTS_TIMEOUT = config(
+    'USER_FACET_COUNTS_TIMEOUT', default=30, cast=int
+)
+
+# Seconds to cache the rendered delivery order panes of the batch page,
+# 0 to disable. Panes are keyed by the order & batch `updated_at`.
+DELIVERY_ORDER_PANE_TIMEOUT = config(
+    'DELIVERY_ORDER_PANE_TIMEOUT', default=60 * 60 * 24, cast=int
+)
+
+# Seconds to cache the customer, union & location lookup maps of the
+# imports, 0 to disable. The maps are invalidated when any of them changes.
+CUSTOMER_LOOKUPS_TIMEOUT = config(
+    'CUSTOMER_LOOKUPS_TIMEOUT', default=60 * 60, cast=int
+)
+
+# Seconds to cache the role groups, 0 to disable. They are invalidated when
+# any group changes.
+ROLE_GROUPS_TIMEOUT = config(
+    'ROLE_GROUPS_TIMEOUT', default=60 * 60, cast=int
+)
+
+
 # Start-up fixtures
 FIXTURES = ['categories', 'customers', 'units', 'ports', 'roles']
 
@@ -1,6 +1,24 @@
 from .base import *
 from decouple import Csv
+from django.core.exceptions import ImproperlyConfigured
 
 
 DEBUG = False
 ALLOWED_HOSTS = config('ALLOWED_HOSTS', cast=Csv())
+
+
+# Keep the database connections of the gunicorn workers open between
+# requests, checking them before reuse (see `shared.signals`)
+DATABASES['default'].update({
+    'CONN_MAX_AGE': config('CONN_MAX_AGE', default=60, cast=int),
+    'CONN_HEALTH_CHECKS': True
+})
+
+# The sessions & the cache invalidations (`shared.cache.bump_version`) must
+# be shared by all the workers, so the Redis cache is required
+if not CACHE_URL:
+    raise ImproperlyConfigured('Set `CACHE_URL` to the Redis cache URL.')
+
+# Read the sessions from the (Redis) cache, writing them through to the
+# database so they survive a cache flush
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
@@ -4,3 +4,21 @@ from decouple import Csv
 
 DEBUG = True
 ALLOWED_HOSTS = ['*']
+
+# Local cache, so the tests don't need a Redis server
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Always count the users, render the delivery order panes & compute the
+# lookup maps & role groups in tests
+USER_FACET_COUNTS_TIMEOUT = 0
+DELIVERY_ORDER_PANE_TIMEOUT = 0
+CUSTOMER_LOOKUPS_TIMEOUT = 0
+ROLE_GROUPS_TIMEOUT = 0
+
+# Run celery tasks synchronously
+CELERY_TASK_ALWAYS_EAGER = True
+CELERY_TASK_EAGER_PROPAGATES = True
@@ -25,6 +25,8 @@ urlpatterns = [
     path('users/', include('users.urls',namespace='users')),
     path('purchases/', include('purchases.urls', namespace='purchases')),
     path('customers/', include('customers.urls', namespace='customers')),
+    path('search/', include('shared.urls', namespace='shared')),
+    path('api/v1/', include('orders.api.urls', namespace='api-v1')),
     path('', include('orders.urls', namespace='orders'))
 ]
 
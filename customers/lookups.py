@@ -0,0 +1,93 @@
+"""Lookup maps of the customers, unions & locations by name.
+
+The maps only hold primary keys, so they are cheap to cache & share
+between the workers. They are invalidated by bumping the namespace version
+whenever a customer, union or location changes.
+
+The union & location choices of each region are cached in the same
+namespace, so they are invalidated together with the maps.
+"""
+from collections import namedtuple
+from functools import partial
+
+from django.conf import settings
+
+from shared.cache import get_or_compute, make_key
+
+from .models import Customer, Location, Union
+
+
+LOOKUPS_NAMESPACE = 'customers:lookups'
+
+Lookups = namedtuple('Lookups', ['customers', 'unions', 'locations'])
+
+RegionChoices = namedtuple('RegionChoices', ['unions', 'locations'])
+
+
+def normalize(name):
+    """Returns the case & whitespace insensitive lookup key of a name."""
+    return ' '.join(str(name).split()).lower()
+
+
+def compute_lookups():
+    """Returns the lookup maps of the customers, unions & locations.
+
+    Returns:
+        lookups (Lookups): customer pks by region, code & name; union &
+            location pks by `(customer pk, name)`
+    """
+    customers = {}
+    for pk, region, code, name in Customer.objects.values_list(
+            'pk', 'region', 'code', 'name'):
+        for key in (name, code, region):
+            customers[normalize(key)] = pk
+    unions = {
+        (customer_pk, normalize(name)): pk
+        for pk, customer_pk, name in Union.objects.values_list(
+            'pk', 'customer', 'name'
+        )
+    }
+    locations = {
+        (customer_pk, normalize(name)): pk
+        for pk, customer_pk, name in Location.objects.values_list(
+            'pk', 'customer', 'name'
+        )
+    }
+    return Lookups(customers, unions, locations)
+
+
+def get_lookups():
+    """Returns the cached lookup maps, computing them on a miss."""
+    return get_or_compute(
+        LOOKUPS_NAMESPACE,
+        make_key(LOOKUPS_NAMESPACE),
+        compute_lookups,
+        settings.CUSTOMER_LOOKUPS_TIMEOUT,
+        value_type=Lookups
+    )
+
+
+def compute_region_choices(customer_pk):
+    """Returns the union & location choices of a region.
+
+    Args:
+        customer_pk (int): the region (customer) pk
+
+    Returns:
+        choices (RegionChoices): the lists of unions & locations
+    """
+    return RegionChoices(
+        list(Union.objects.filter(customer__pk=customer_pk)),
+        list(Location.objects.filter(customer__pk=customer_pk))
+    )
+
+
+def get_region_choices(customer_pk):
+    """Returns the cached choices of a region, computing them on a miss."""
+    return get_or_compute(
+        LOOKUPS_NAMESPACE,
+        make_key(LOOKUPS_NAMESPACE, 'choices', customer_pk),
+        partial(compute_region_choices, customer_pk),
+        settings.CUSTOMER_LOOKUPS_TIMEOUT,
+        value_type=RegionChoices
+    )
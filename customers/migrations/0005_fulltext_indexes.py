@@ -0,0 +1,18 @@
+from django.db import migrations
+
+from shared.fulltext import AddFullTextIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0004_auto_20200526_1727'),
+    ]
+
+    operations = [
+        AddFullTextIndex(
+            model_name='union',
+            name='customers_union_search_ft',
+            fields=['name'],
+        ),
+    ]
@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from shared.cache import bump_version
+
+from .lookups import LOOKUPS_NAMESPACE
+from .models import Customer, Location, Union
+
+
+@receiver(post_save, sender=Customer)
+@receiver(post_save, sender=Union)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Customer)
+@receiver(post_delete, sender=Union)
+@receiver(post_delete, sender=Location)
+def invalidate_lookups(**kwargs):
+    """Invalidates the cached lookup maps when a name may have changed."""
+    bump_version(LOOKUPS_NAMESPACE)
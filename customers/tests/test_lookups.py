@@ -0,0 +1,55 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from customers.lookups import get_lookups, normalize
+
+from .factories import CustomerFactory, UnionFactory, LocationFactory
+
+
+@override_settings(CUSTOMER_LOOKUPS_TIMEOUT=60)
+class LookupsTests(TestCase):
+    """
+    Tests for the cached customer, union & location lookup maps.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.customer = CustomerFactory(region='Amhara', code='AMH')
+        self.union = UnionFactory(customer=self.customer, name='Merkeb')
+
+    def test_lookups_are_cached(self):
+        """
+        Ensure the lookup maps are only computed once.
+        """
+        lookups = get_lookups()
+        with CaptureQueriesContext(connection) as queries:
+            cached_lookups = get_lookups()
+
+        # Assertions
+        self.assertEqual(len(queries.captured_queries), 0)
+        self.assertEqual(cached_lookups, lookups)
+        self.assertEqual(lookups.customers['amh'], self.customer.pk)
+        self.assertEqual(lookups.customers['amhara'], self.customer.pk)
+        self.assertEqual(
+            lookups.unions[self.customer.pk, 'merkeb'],
+            self.union.pk
+        )
+
+    def test_lookups_are_invalidated(self):
+        """
+        Ensure the cached lookup maps are invalidated when a union or a
+        location is saved or deleted.
+        """
+        get_lookups()
+        location = LocationFactory(customer=self.customer, name='Bahir  Dar')
+        self.union.delete()
+        lookups = get_lookups()
+
+        # Assertions
+        self.assertEqual(
+            lookups.locations[self.customer.pk, normalize('BAHIR DAR')],
+            location.pk
+        )
+        self.assertNotIn((self.customer.pk, 'merkeb'), lookups.unions)
@@ -1,12 +1,14 @@
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from accounts.tests.factories import UserFactory, AdminUserFactory, \
     GuestUserFactory, ManagementUserFactory, StaffUserFactory
 
 from customers.models import Customer, Union
-from .factories import CustomerFactory, UnionFactory
+from .factories import CustomerFactory, UnionFactory, LocationFactory
 
 
 User = get_user_model()
@@ -130,6 +132,69 @@ class UnionListViewTests(TestCase):
         # Assertions
         self.assertEqual(response.status_code, 403)
 
+    def test_cursor_pagination(self):
+        """
+        Ensure the unions are paginated with next & previous cursors
+        keeping the region filter.
+        """
+        customer = CustomerFactory()
+        for _ in range(12):
+            UnionFactory(customer=customer)
+        self.admin.status = User.ACTIVE
+        self.admin.save()
+
+        self.client.force_login(self.admin)
+        response = self.client.get(self.url, {'region': customer.pk})
+        page = response.context['page_obj']
+        next_response = self.client.get(
+            self.url, {'region': customer.pk, 'cursor': page.next_cursor}
+        )
+        next_page = next_response.context['page_obj']
+
+        # Assertions
+        self.assertEqual(len(page), 10)
+        self.assertEqual(len(next_page), 2)
+        self.assertFalse(next_page.has_next())
+        self.assertContains(
+            response, f'href="?region={customer.pk}&amp;cursor='
+        )
+        self.assertEqual(
+            list(page) + list(next_page),
+            list(Union.objects.filter(customer=customer).order_by('name', 'pk'))
+        )
+
+    def test_constant_query_count(self):
+        """
+        Ensure the number of queries doesn't grow with the number of unions
+        & regions on the page.
+        """
+        self.admin.status = User.ACTIVE
+        self.admin.save()
+        self.client.force_login(self.admin)
+        query_counts = []
+        for _ in range(2):
+            for customer in CustomerFactory.create_batch(3):
+                UnionFactory.create_batch(4, customer=customer)
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(self.url)
+            query_counts.append(len(queries.captured_queries))
+
+        # Assertions
+        self.assertEqual(query_counts[0], query_counts[1])
+
+    def test_invalid_cursor(self):
+        """
+        Ensure an invalid cursor returns a 404 page.
+        """
+        self.admin.status = User.ACTIVE
+        self.admin.save()
+
+        self.client.force_login(self.admin)
+        response = self.client.get(self.url, {'cursor': 'invalid'})
+
+        # Assertions
+        self.assertEqual(response.status_code, 404)
+
 
 class UnionCreateViewTests(TestCase):
     """
@@ -545,3 +610,69 @@ class UnionDeleteViewTests(TestCase):
 
         # Assertions
         self.assertEqual(response.status_code, 403)
+
+
+class RegionChoicesViewTests(TestCase):
+    """
+    Tests for the `RegionChoicesView` view.
+    """
+    fixtures = ['roles']
+
+    def setUp(self):
+        self.customer, other_customer = CustomerFactory.create_batch(2)
+        self.union = UnionFactory(customer=self.customer, name='Merkeb')
+        self.location = LocationFactory(customer=self.customer, name='Dessie')
+        UnionFactory(customer=other_customer)
+        self.url = reverse('customers:region-choices', args=[self.customer.pk])
+        self.client.force_login(AdminUserFactory(status=User.ACTIVE))
+
+    def test_region_choices(self):
+        """
+        Ensure only the unions & locations of the region are returned.
+        """
+        response = self.client.get(self.url)
+
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'unions': [{'id': str(self.union.pk), 'name': 'Merkeb'}],
+            'locations': [{'id': str(self.location.pk), 'name': 'Dessie'}]
+        })
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_conditional_get(self):
+        """
+        Ensure current copies get a `304` response without a database
+        query, until a union of the region changes.
+        """
+        response = self.client.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            not_modified_response = self.client.get(
+                self.url, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+            # Session, user & role queries
+            query_count = len(queries.captured_queries)
+        self.union.name = 'Lake Tana'
+        self.union.save()
+        modified_response = self.client.get(
+            self.url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+
+        # Assertions
+        self.assertEqual(not_modified_response.status_code, 304)
+        self.assertEqual(query_count, 3)
+        self.assertEqual(modified_response.status_code, 200)
+        self.assertEqual(
+            modified_response.json()['unions'][0]['name'], 'Lake Tana'
+        )
+
+    def test_request_with_guest_user(self):
+        """
+        Ensure users without the `ADMIN` or `STAFF` role can't fetch the
+        choices.
+        """
+        self.client.force_login(GuestUserFactory(status=User.ACTIVE))
+        response = self.client.get(self.url)
+
+        # Assertions
+        self.assertEqual(response.status_code, 403)
@@ -1,7 +1,7 @@
 from django.urls import path
 
 from .views import UnionListView, UnionCreateView, UnionUpdateView, \
-    UnionDeleteView
+    UnionDeleteView, RegionChoicesView
 
 
 app_name = 'customers'
@@ -18,5 +18,10 @@ urlpatterns = [
         'unions/<uuid:pk>/delete/',
         UnionDeleteView.as_view(),
         name='union-delete'
+    ),
+    path(
+        'regions/<int:pk>/choices/',
+        RegionChoicesView.as_view(),
+        name='region-choices'
     )
 ]
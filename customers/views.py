@@ -1,23 +1,34 @@
+import hashlib
+
 from django.contrib import messages
 from django.contrib.messages.views import SuccessMessageMixin
-from django.db.models import Q
+from django.db.models import Count, Q
+from django.http import JsonResponse
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
-from django.views.generic import ListView, CreateView, UpdateView, DeleteView
+from django.utils.cache import get_conditional_response, \
+    patch_cache_control
+from django.utils.http import quote_etag
+from django.views.generic import View, ListView, CreateView, UpdateView, \
+    DeleteView
 
+from shared.cache import get_version
 from shared.constants import ROLE_ADMIN, ROLE_MANAGEMENT, ROLE_STAFF, ROLE_GUEST
+from shared.pagination import CursorPaginationMixin
 
+from .lookups import LOOKUPS_NAMESPACE, get_region_choices
 from .mixins import BaseCustomersView
 from .models import Customer, Union
 
 
-class UnionListView(BaseCustomersView, ListView):
+class UnionListView(BaseCustomersView, CursorPaginationMixin, ListView):
     """List view of registered unions."""
     template_name = 'customers/union_list.html'
     model = Union
     paginate_by = 10
+    cursor_ordering = ('name', )
     page_name = 'unions'
-    queryset = Union.objects.all()
+    queryset = Union.objects.select_related('customer')
     access_roles = [ROLE_STAFF, ROLE_MANAGEMENT, ROLE_ADMIN, ROLE_GUEST]
 
     def get_queryset(self):
@@ -34,7 +45,9 @@ class UnionListView(BaseCustomersView, ListView):
         return qs
 
     def get_context_data(self, **kwargs):
-        kwargs['customer_list'] = Customer.objects.all()
+        kwargs['customer_list'] = Customer.objects.annotate(
+            union_count=Count('unions')
+        )
         kwargs['selected_region'] = self.request.GET.get('region')
         kwargs['union_count'] = self.queryset.count()
         kwargs['search_query'] = self.request.GET.get('search', '').strip()
@@ -105,3 +118,38 @@ class UnionDeleteView(BaseCustomersView, SuccessMessageMixin, DeleteView):
         success_url = self.get_success_url()
         messages.success(request, self.success_message)
         return redirect(success_url)
+
+
+class RegionChoicesView(BaseCustomersView, View):
+    """Returns the union & location choices of a region as JSON.
+
+    The `ETag` is derived from the version of the cached customer lookups,
+    which is bumped whenever a customer, union or location changes. The
+    allocation & distribution modals keep the choices of each region &
+    revalidate them with a `304 Not Modified` response.
+    """
+    access_roles = [ROLE_ADMIN, ROLE_STAFF]
+
+    def get(self, request, *args, **kwargs):
+        pk = self.kwargs.get('pk')
+        version = get_version(LOOKUPS_NAMESPACE)
+        etag = quote_etag(
+            hashlib.md5(f'{version}:{pk}'.encode()).hexdigest()
+        )
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            choices = get_region_choices(pk)
+            response = JsonResponse({
+                'unions': [
+                    {'id': str(union.pk), 'name': union.name}
+                    for union in choices.unions
+                ],
+                'locations': [
+                    {'id': str(location.pk), 'name': location.name}
+                    for location in choices.locations
+                ]
+            })
+        response['ETag'] = etag
+        # Browsers must revalidate the choices, shared caches can't store them
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
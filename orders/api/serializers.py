@@ -0,0 +1,129 @@
+from rest_framework import serializers
+
+from shared.api import SparseFieldsetMixin
+
+from orders.models import Batch, DeliveryOrder, Allocation, Distribution, \
+    UnionAllocation, UnionDistribution
+
+
+class QuantityField(serializers.DecimalField):
+    """Read-only decimal field of the annotated rollup values & amounts."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('max_digits', 24)
+        kwargs.setdefault('decimal_places', 4)
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+
+class BatchSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Serializer of the batches, annotated by `BatchViewSet`."""
+    product = serializers.CharField(
+        source='product.name', read_only=True, default=None
+    )
+    supplier = serializers.CharField(
+        source='supplier.name', read_only=True, default=None
+    )
+    agreement_amount = QuantityField(source='get_agreement_amount')
+    allocated_quantity = QuantityField(source='total_allocated_quantity')
+    allocated_amount = QuantityField(source='get_allocated_amount')
+    advance_amount = QuantityField(source='get_advance_amount')
+    retention_amount = QuantityField(source='get_retention_amount')
+    distributed_quantity = QuantityField(source='total_distributed_quantity')
+    distributed_shortage = QuantityField(source='total_distributed_shortage')
+    distributed_amount = QuantityField(source='get_distributed_amount')
+
+    class Meta:
+        model = Batch
+        fields = (
+            'id', 'name', 'lc_number', 'year', 'status', 'product',
+            'supplier', 'quantity', 'rate', 'agreement_amount',
+            'allocated_quantity', 'allocated_amount', 'advance_amount',
+            'retention_amount', 'distributed_quantity',
+            'distributed_shortage', 'distributed_amount', 'created_at',
+            'updated_at'
+        )
+
+
+class DeliveryOrderSerializer(SparseFieldsetMixin,
+                              serializers.ModelSerializer):
+    """Serializer of the delivery orders, annotated by `DeliveryOrderViewSet`."""
+    port = serializers.CharField(
+        source='port.name', read_only=True, default=None
+    )
+    allocated_quantity = QuantityField(source='total_allocated_quantity')
+    allocated_amount = QuantityField(source='get_allocated_amount')
+    advance_amount = QuantityField(source='get_allocated_advance')
+    retention_amount = QuantityField(source='get_allocated_retention')
+    distributed_quantity = QuantityField(source='total_distributed_quantity')
+    distributed_shortage = QuantityField(source='total_distributed_shortage')
+    distributed_amount = QuantityField(source='get_distributed_amount')
+
+    class Meta:
+        model = DeliveryOrder
+        fields = (
+            'id', 'batch', 'vessel', 'bill_of_loading', 'port',
+            'arrival_date', 'allocated_quantity', 'allocated_amount',
+            'advance_amount', 'retention_amount', 'distributed_quantity',
+            'distributed_shortage', 'distributed_amount', 'created_at',
+            'updated_at'
+        )
+
+
+class UnionAllocationSerializer(serializers.ModelSerializer):
+    union = serializers.CharField(source='union.name')
+    location = serializers.CharField(source='location.name')
+
+    class Meta:
+        model = UnionAllocation
+        fields = ('union', 'location', 'quantity')
+
+
+class AllocationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Serializer of the allocations, annotated by `AllocationViewSet`."""
+    region = serializers.CharField(
+        source='buyer.region', read_only=True, default=None
+    )
+    quantity = QuantityField(source='total_quantity')
+    amount = QuantityField(source='get_amount')
+    unions = UnionAllocationSerializer(
+        source='union_allocations', many=True, read_only=True
+    )
+
+    class Meta:
+        model = Allocation
+        fields = (
+            'id', 'delivery_order', 'region', 'quantity', 'amount',
+            'unions', 'created_at', 'updated_at'
+        )
+
+
+class UnionDistributionSerializer(serializers.ModelSerializer):
+    union = serializers.CharField(source='union.name')
+    location = serializers.CharField(source='location.name')
+
+    class Meta:
+        model = UnionDistribution
+        fields = ('union', 'location', 'quantity', 'shortage', 'over')
+
+
+class DistributionSerializer(SparseFieldsetMixin,
+                             serializers.ModelSerializer):
+    """Serializer of the distributions, annotated by `DistributionViewSet`."""
+    region = serializers.CharField(
+        source='buyer.region', read_only=True, default=None
+    )
+    quantity = QuantityField(source='total_quantity')
+    shortage = QuantityField(source='total_shortage')
+    amount = QuantityField(source='get_amount')
+    retention = QuantityField(source='get_retention')
+    unions = UnionDistributionSerializer(
+        source='union_distributions', many=True, read_only=True
+    )
+
+    class Meta:
+        model = Distribution
+        fields = (
+            'id', 'delivery_order', 'region', 'quantity', 'shortage',
+            'amount', 'retention', 'unions', 'created_at', 'updated_at'
+        )
@@ -0,0 +1,15 @@
+from rest_framework.routers import DefaultRouter
+
+from .views import BatchViewSet, DeliveryOrderViewSet, AllocationViewSet, \
+    DistributionViewSet
+
+
+app_name = 'api-v1'
+
+router = DefaultRouter()
+router.register('batches', BatchViewSet)
+router.register('delivery-orders', DeliveryOrderViewSet)
+router.register('allocations', AllocationViewSet)
+router.register('distributions', DistributionViewSet)
+
+urlpatterns = router.urls
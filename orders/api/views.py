@@ -0,0 +1,154 @@
+import uuid
+
+from django.db.models import Prefetch
+from rest_framework import viewsets
+from rest_framework.exceptions import ValidationError
+
+from shared.api import ConditionalGetMixin, get_requested_fields
+from shared.constants import ROLE_ADMIN, ROLE_MANAGEMENT, ROLE_STAFF, \
+    ROLE_GUEST
+
+from orders.models import Batch, DeliveryOrder, Allocation, Distribution, \
+    UnionAllocation, UnionDistribution
+
+from .serializers import BatchSerializer, DeliveryOrderSerializer, \
+    AllocationSerializer, DistributionSerializer
+
+
+UUID_PATTERN = '[0-9a-f-]{32,36}'
+
+
+class BaseAPIViewSet(ConditionalGetMixin, viewsets.GenericViewSet):
+    """Abstract base class of the read-only `orders` API endpoints.
+
+    The rollup fields are annotated by `annotate_queryset`, so that the
+    serializers never walk the delivery order tree of each row. The amounts
+    are rounded by the model methods, like on the web pages & the letters.
+    """
+    access_roles = [ROLE_ADMIN, ROLE_MANAGEMENT, ROLE_STAFF, ROLE_GUEST]
+    lookup_value_regex = UUID_PATTERN
+    cursor_ordering = ('-created_at', )
+    filter_params = {}
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        for param, lookup in self.filter_params.items():
+            value = self.request.query_params.get(param)
+            if value is not None:
+                qs = qs.filter(**{lookup: self.get_uuid(param, value)})
+        return qs
+
+    def get_uuid(self, param, value):
+        """Returns the UUID of a filter query parameter."""
+        try:
+            return uuid.UUID(value)
+        except ValueError:
+            raise ValidationError({param: 'Must be a valid UUID.'})
+
+    def wants_field(self, name):
+        """Returns `True` if the sparse fieldset includes `name`."""
+        names = get_requested_fields(self.request)
+        return names is None or name in names
+
+
+class BatchViewSet(BaseAPIViewSet):
+    """Purchasing batches with their allocation & distribution rollups.
+
+    Filters: `status` (OPEN or CLOSED), `product` & `supplier`.
+    """
+    queryset = Batch.objects.all()
+    serializer_class = BatchSerializer
+    filter_params = {'product': 'product', 'supplier': 'supplier'}
+    version_fields = ('updated_at', 'delivery_orders__updated_at')
+    version_counts = ('pk', 'delivery_orders')
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        status = self.request.query_params.get('status')
+        if status is not None:
+            if status.upper() not in (Batch.OPEN, Batch.CLOSED):
+                raise ValidationError({'status': 'Must be OPEN or CLOSED.'})
+            qs = qs.filter(status=status.upper())
+        return qs
+
+    def annotate_queryset(self, queryset):
+        # The batch amounts are read from the joined stored totals
+        return queryset.with_totals().select_related('product', 'supplier')
+
+
+class DeliveryOrderViewSet(BaseAPIViewSet):
+    """Delivery orders with their allocation & distribution rollups.
+
+    Filters: `batch`.
+    """
+    queryset = DeliveryOrder.objects.filter(batch__isnull=False)
+    serializer_class = DeliveryOrderSerializer
+    filter_params = {'batch': 'batch'}
+    version_fields = ('updated_at', 'batch__updated_at')
+
+    def annotate_queryset(self, queryset):
+        return queryset.with_totals().select_related('batch', 'port')
+
+
+class AllocationViewSet(BaseAPIViewSet):
+    """Region allocations of the delivery orders, with their unions.
+
+    Filters: `delivery_order` & `batch`.
+    """
+    queryset = Allocation.objects.filter(delivery_order__batch__isnull=False)
+    serializer_class = AllocationSerializer
+    filter_params = {
+        'delivery_order': 'delivery_order',
+        'batch': 'delivery_order__batch'
+    }
+    # Union rows are saved without the allocation, but touch the order
+    version_fields = (
+        'updated_at', 'delivery_order__updated_at',
+        'delivery_order__batch__updated_at'
+    )
+
+    def annotate_queryset(self, queryset):
+        queryset = queryset.with_totals().select_related(
+            'buyer', 'delivery_order__batch'
+        )
+        if self.wants_field('unions'):
+            queryset = queryset.prefetch_related(Prefetch(
+                'union_allocations',
+                queryset=UnionAllocation.objects.select_related(
+                    'union', 'location'
+                )
+            ))
+        return queryset
+
+
+class DistributionViewSet(BaseAPIViewSet):
+    """Region distributions of the delivery orders, with their unions.
+
+    Filters: `delivery_order` & `batch`.
+    """
+    queryset = Distribution.objects.filter(
+        delivery_order__batch__isnull=False
+    )
+    serializer_class = DistributionSerializer
+    filter_params = {
+        'delivery_order': 'delivery_order',
+        'batch': 'delivery_order__batch'
+    }
+    # Union rows are saved without the distribution, but touch the order
+    version_fields = (
+        'updated_at', 'delivery_order__updated_at',
+        'delivery_order__batch__updated_at'
+    )
+
+    def annotate_queryset(self, queryset):
+        queryset = queryset.with_totals().select_related(
+            'buyer', 'delivery_order__batch'
+        )
+        if self.wants_field('unions'):
+            queryset = queryset.prefetch_related(Prefetch(
+                'union_distributions',
+                queryset=UnionDistribution.objects.select_related(
+                    'union', 'location'
+                )
+            ))
+        return queryset
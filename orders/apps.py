@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class OrdersConfig(AppConfig):
     name = 'orders'
     verbose_name = 'Delivery Orders'
+
+    def ready(self):
+        from . import signals  # noqa
@@ -0,0 +1,29 @@
+"""Buyer (region) choices of the delivery order allocations & distributions.
+
+A region has at most one allocation & one distribution per delivery order,
+so the choices of a new one are the customers without a row yet.
+"""
+from django.db.models import Subquery
+
+from customers.models import Customer
+
+
+def get_remaining_buyers(delivery_order, model):
+    """Returns the customers without a `model` row in the delivery order.
+
+    The choices are computed by the database with a single
+    `NOT IN (subquery)` query, whenever the queryset is evaluated.
+
+    Args:
+        delivery_order (DeliveryOrder): the allocated or distributed order
+        model (Model): `Allocation` or `Distribution`
+
+    Returns:
+        customers (QuerySet): the remaining buyer choices
+    """
+    # `NOT IN` never matches when the subquery has a `NULL` buyer
+    buyers = model.objects.filter(
+        delivery_order=delivery_order,
+        buyer__isnull=False
+    ).values('buyer')
+    return Customer.objects.exclude(pk__in=Subquery(buyers))
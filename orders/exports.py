@@ -0,0 +1,127 @@
+"""Exports of the union allocations & distributions for finance.
+
+The union rows are read with `QuerySet.iterator`, so they are written to
+the streamed spreadsheet chunk by chunk instead of being loaded at once.
+"""
+from itertools import chain
+
+from shared.constants import ADVANCE, RETENTION
+from shared.spreadsheets import stream_csv, stream_xlsx
+
+from .models import UnionAllocation, UnionDistribution
+
+
+# Number of rows fetched from the database at a time
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_HEADER = [
+    'Batch', 'L/C Number', 'Vessel', 'Bill of Loading', 'Arrival Date',
+    'Region', 'Union', 'Location', 'Quantity', 'Shortage', 'Over',
+    'Amount', 'Advance', 'Retention'
+]
+
+
+def get_union_allocations(delivery_orders):
+    """Returns the union allocations of `delivery_orders` to export."""
+    return UnionAllocation.objects.filter(
+        allocation__delivery_order__in=delivery_orders
+    ).select_related(
+        'allocation__buyer',
+        'allocation__delivery_order__batch',
+        'union',
+        'location'
+    ).order_by(
+        'allocation__delivery_order__arrival_date',
+        'allocation__delivery_order__created_at',
+        'allocation__created_at',
+        '_order'
+    )
+
+
+def get_union_distributions(delivery_orders):
+    """Returns the union distributions of `delivery_orders` to export."""
+    return UnionDistribution.objects.filter(
+        distribution__delivery_order__in=delivery_orders
+    ).select_related(
+        'distribution__buyer',
+        'distribution__delivery_order__batch',
+        'union',
+        'location'
+    ).order_by(
+        'distribution__delivery_order__arrival_date',
+        'distribution__delivery_order__created_at',
+        'distribution__created_at',
+        '_order'
+    )
+
+
+def get_row(delivery_order, buyer, union_row, quantity, shortage, over):
+    """Returns the exported values of a union allocation or distribution.
+
+    The amount is the total (received + shortage + over) quantity at the
+    batch rate, split into the advance & retention payments.
+    """
+    batch = delivery_order.batch
+    amount = round((quantity + shortage + over) * batch.rate, 4)
+    return [
+        batch.name,
+        batch.lc_number,
+        delivery_order.vessel,
+        delivery_order.bill_of_loading,
+        delivery_order.arrival_date,
+        buyer.region if buyer else '',
+        union_row.union.name,
+        union_row.location.name,
+        quantity,
+        shortage,
+        over,
+        amount,
+        round(amount * ADVANCE, 4),
+        round(amount * RETENTION, 4),
+    ]
+
+
+def iter_allocation_rows(delivery_orders, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yields the exported rows of the `delivery_orders` union allocations."""
+    union_allocations = get_union_allocations(delivery_orders)
+    for union_allocation in union_allocations.iterator(chunk_size=chunk_size):
+        allocation = union_allocation.allocation
+        yield get_row(
+            allocation.delivery_order, allocation.buyer, union_allocation,
+            union_allocation.quantity, 0, 0
+        )
+
+
+def iter_distribution_rows(delivery_orders, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yields the exported rows of the `delivery_orders` union distributions."""
+    union_distributions = get_union_distributions(delivery_orders)
+    for union_distribution in union_distributions.iterator(chunk_size=chunk_size):
+        distribution = union_distribution.distribution
+        yield get_row(
+            distribution.delivery_order, distribution.buyer,
+            union_distribution, union_distribution.quantity,
+            union_distribution.shortage, union_distribution.over
+        )
+
+
+def stream_csv_export(delivery_orders):
+    """Yields the CSV export of `delivery_orders`, allocations first."""
+    rows = chain(
+        (['Allocation', *row] for row in iter_allocation_rows(delivery_orders)),
+        (
+            ['Distribution', *row]
+            for row in iter_distribution_rows(delivery_orders)
+        )
+    )
+    return stream_csv(['Type', *EXPORT_HEADER], rows)
+
+
+def stream_xlsx_export(delivery_orders):
+    """Yields the Excel export of `delivery_orders`, a sheet per type."""
+    return stream_xlsx([
+        ('Allocations', EXPORT_HEADER, iter_allocation_rows(delivery_orders)),
+        (
+            'Distributions', EXPORT_HEADER,
+            iter_distribution_rows(delivery_orders)
+        ),
+    ])
@@ -1,7 +1,8 @@
 from django import forms
+from django.db import transaction
 from django.forms import inlineformset_factory, BaseInlineFormSet
 
-from shared.fields import FormattedNumberField
+from shared.fields import FormattedNumberField, PrefetchedModelChoiceField
 from customers.models import Union, Location
 
 from .models import Batch, DeliveryOrder, Allocation, Distribution, \
@@ -37,18 +38,30 @@ class AllocationForm(forms.ModelForm):
         fields = ('buyer', )
 
 
-class UnionAllocationForm(forms.ModelForm):
-    """Model form for creating new union allocation instance."""
-    union = forms.ModelChoiceField(
+class BaseUnionForm(forms.ModelForm):
+    """Base model form for the union rows of an allocation or distribution."""
+    union = PrefetchedModelChoiceField(
         queryset=Union.objects.all(),
         empty_label=None,
         required=True
     )
-    location = forms.ModelChoiceField(
+    location = PrefetchedModelChoiceField(
         queryset=Location.objects.all(),
         empty_label=None,
         required=True
     )
+
+    def _get_validation_exclusions(self):
+        exclude = super()._get_validation_exclusions()
+        # The prefetched choices are already checked by the form fields
+        for name in ('union', 'location'):
+            if self.fields[name].objects is not None:
+                exclude.append(name)
+        return exclude
+
+
+class UnionAllocationForm(BaseUnionForm):
+    """Model form for creating new union allocation instance."""
     quantity = FormattedNumberField(max_digits=20, decimal_places=4)
 
     class Meta:
@@ -56,7 +69,90 @@ class UnionAllocationForm(forms.ModelForm):
         fields = ('union', 'location', 'quantity')
 
 
-class BaseUnionAllocationFormSet(BaseInlineFormSet):
+class BaseUnionFormSet(BaseInlineFormSet):
+    """Base formset for the union rows of an allocation or distribution.
+
+    The union & location choices of the region (see `get_region_choices`)
+    are loaded once & shared by the forms, so validating a row doesn't
+    query the unions & locations again.
+
+    The rows are saved with a few bulk queries instead of a query per row.
+    """
+
+    def __init__(self, *args, region_choices=None, **kwargs):
+        self.choice_objects = None
+        if region_choices is not None:
+            self.choice_objects = {
+                'union': {str(u.pk): u for u in region_choices.unions},
+                'location': {
+                    str(location.pk): location
+                    for location in region_choices.locations
+                }
+            }
+        super().__init__(*args, **kwargs)
+
+    def _construct_form(self, i, **kwargs):
+        form = super()._construct_form(i, **kwargs)
+        if self.choice_objects is not None:
+            for name, objects in self.choice_objects.items():
+                form.fields[name].set_objects(objects)
+        return form
+
+    def save(self, commit=True):
+        """Saves the submitted union rows in a single transaction.
+
+        The forms are diffed against the existing rows: new rows are saved
+        with `bulk_create`, changed rows with `bulk_update` & deleted rows
+        with a single filtered delete. The `_order` of the rows is set
+        explicitly from the form order, since the bulk queries don't
+        maintain it.
+
+        Returns:
+            objects (list): the new & changed union rows
+        """
+        if not commit:
+            return super().save(commit=False)
+
+        self.new_objects = []
+        self.changed_objects = []
+        self.deleted_objects = []
+        updated_objects = []
+        fields = list(self.form._meta.fields) + ['_order']
+        order = 0
+        for form in self.forms:
+            obj = form.instance
+            is_initial = obj.pk is not None and form in self.initial_forms
+            if self.can_delete and self._should_delete_form(form):
+                if is_initial:
+                    self.deleted_objects.append(obj)
+                continue
+            if is_initial:
+                if form.has_changed():
+                    self.changed_objects.append((obj, form.changed_data))
+                    updated_objects.append(obj)
+                elif obj._order != order:
+                    updated_objects.append(obj)
+            elif form.has_changed():
+                setattr(obj, self.fk.name, self.instance)
+                self.new_objects.append(obj)
+            else:
+                continue
+            obj._order = order
+            order += 1
+
+        with transaction.atomic():
+            if self.deleted_objects:
+                self.model.objects.filter(pk__in=[
+                    obj.pk for obj in self.deleted_objects
+                ]).delete()
+            if updated_objects:
+                self.model.objects.bulk_update(updated_objects, fields)
+            if self.new_objects:
+                self.model.objects.bulk_create(self.new_objects)
+        return self.new_objects + [obj for obj, _ in self.changed_objects]
+
+
+class BaseUnionAllocationFormSet(BaseUnionFormSet):
     def clean(self):
         """Remove validation for forms to be deleted."""
         for form in self.forms:
@@ -82,18 +178,8 @@ class DistributionForm(forms.ModelForm):
         fields = ('buyer', )
 
 
-class UnionDistributionForm(forms.ModelForm):
+class UnionDistributionForm(BaseUnionForm):
     """Model form for creating new union distribution instance."""
-    union = forms.ModelChoiceField(
-        queryset=Union.objects.all(),
-        empty_label=None,
-        required=True
-    )
-    location = forms.ModelChoiceField(
-        queryset=Location.objects.all(),
-        empty_label=None,
-        required=True
-    )
     quantity = FormattedNumberField(max_digits=20, decimal_places=4)
     shortage = FormattedNumberField(max_digits=20, decimal_places=4)
     over = FormattedNumberField(max_digits=20, decimal_places=4)
@@ -103,7 +189,7 @@ class UnionDistributionForm(forms.ModelForm):
         fields = ('union', 'location', 'quantity', 'shortage', 'over')
 
 
-class BaseUnionDistributionFormSet(BaseInlineFormSet):
+class BaseUnionDistributionFormSet(BaseUnionFormSet):
     def clean(self):
         """Remove validation for forms to be deleted."""
         for form in self.forms:
@@ -132,3 +218,43 @@ class LetterDownloadForm(forms.Form):
     )
 
     type = forms.ChoiceField(choices=TYPE_CHOICES, widget=forms.RadioSelect)
+
+
+class ExportForm(forms.Form):
+    """Form for exporting the allocations & distributions of a period"""
+    CSV = 'csv'
+    XLSX = 'xlsx'
+
+    FORMAT_CHOICES = (
+        (XLSX, 'Excel (.xlsx)'),
+        (CSV, 'CSV (.csv)')
+    )
+
+    start_date = forms.DateField(help_text='Earliest vessel arrival date.')
+    end_date = forms.DateField(help_text='Latest vessel arrival date.')
+    format = forms.ChoiceField(choices=FORMAT_CHOICES, initial=XLSX)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start_date = cleaned_data.get('start_date')
+        end_date = cleaned_data.get('end_date')
+        if start_date and end_date and start_date > end_date:
+            raise forms.ValidationError(
+                'The start date must be before the end date.'
+            )
+        return cleaned_data
+
+
+class ImportForm(forms.Form):
+    """Form for importing union allocations & distributions"""
+    file = forms.FileField(
+        help_text='CSV or Excel (.xlsx) file with a row per union.'
+    )
+
+    def clean_file(self):
+        file = self.cleaned_data['file']
+        if not file.name.lower().endswith(('.csv', '.xlsx')):
+            raise forms.ValidationError(
+                'Only CSV & Excel (.xlsx) files are supported.'
+            )
+        return file
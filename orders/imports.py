@@ -0,0 +1,306 @@
+"""Bulk import of the union allocations & distributions from spreadsheets.
+
+All the rows are validated against the cached customer, union & location
+lookup maps before anything is written. Valid imports are then saved with
+a few `bulk_create` queries inside a single transaction.
+
+The imported regions replace the existing allocations (or distributions)
+of the same delivery order & region, so the file of an export can be
+edited & imported back.
+"""
+from collections import OrderedDict, namedtuple
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import Q
+
+from customers.lookups import get_lookups, normalize
+from shared.spreadsheets import SpreadsheetError
+
+from .models import Allocation, Distribution, UnionAllocation, \
+    UnionDistribution
+
+
+# Number of rows inserted by each `bulk_create` query
+IMPORT_BATCH_SIZE = 1000
+
+# Validation stops after this many row errors
+MAX_ERRORS = 100
+
+ALLOCATION = 'allocation'
+DISTRIBUTION = 'distribution'
+
+# Column names of the header row, by lookup key
+COLUMNS = {
+    'type': 'type',
+    'bill of loading': 'bill_of_loading',
+    'b/l': 'bill_of_loading',
+    'region': 'region',
+    'union': 'union',
+    'location': 'location',
+    'quantity': 'quantity',
+    'shortage': 'shortage',
+    'over': 'over',
+}
+
+REQUIRED_COLUMNS = ('region', 'union', 'location', 'quantity')
+
+QUANTITY_PLACES = Decimal('0.0001')
+
+RowError = namedtuple('RowError', ['sheet', 'row', 'message'])
+
+
+class RowInvalid(Exception):
+    """Raised when a row of the imported file is not valid."""
+
+
+class UnionImporter:
+    """Imports the union allocations & distributions of a batch.
+
+    Rows are matched to the batch delivery orders by their bill of loading,
+    which may be left out when importing a single delivery order.
+
+    Attributes:
+        batch (Batch): the batch of the imported delivery orders
+        delivery_order (DeliveryOrder): the only imported order, if any
+        user (User): the user importing the file
+        errors (list<RowError>): the errors of the invalid rows
+    """
+
+    def __init__(self, batch, delivery_order=None, user=None):
+        self.batch = batch
+        self.delivery_order = delivery_order
+        self.user = user
+        self.errors = []
+        self.allocations = OrderedDict()
+        self.distributions = OrderedDict()
+        self.row_count = 0
+
+    def get_delivery_orders(self):
+        """Returns the importable delivery orders by bill of loading."""
+        if self.delivery_order is not None:
+            delivery_orders = [self.delivery_order]
+        else:
+            delivery_orders = self.batch.delivery_orders.all()
+        return {
+            normalize(order.bill_of_loading): order
+            for order in delivery_orders
+        }
+
+    def validate(self, sheets):
+        """Validates the rows of the imported sheets.
+
+        Args:
+            sheets (list<tuple>): `(title, rows)` of each sheet, the type of
+                the rows defaults to the sheet title (e.g. "Allocations")
+
+        Returns:
+            valid (bool): `True` if all the rows are valid
+        """
+        self.lookups = get_lookups()
+        self.delivery_orders = self.get_delivery_orders()
+        try:
+            for title, rows in sheets:
+                self.validate_sheet(title, rows)
+        except SpreadsheetError as e:
+            self.add_error('', None, str(e))
+        if not self.errors and not self.row_count:
+            self.add_error('', None, 'The file has no rows to import.')
+        return not self.errors
+
+    def validate_sheet(self, title, rows):
+        """Validates & collects the rows of a sheet."""
+        rows = iter(rows)
+        header = next(rows, None)
+        if header is None:
+            return
+
+        columns = {}
+        for index, name in enumerate(header):
+            key = COLUMNS.get(normalize(name))
+            if key is not None:
+                columns.setdefault(key, index)
+        missing = [
+            name for name in REQUIRED_COLUMNS if name not in columns
+        ]
+        if 'bill_of_loading' not in columns and self.delivery_order is None:
+            missing.append('bill of loading')
+        if 'type' not in columns and self.get_sheet_type(title) is None:
+            missing.append('type')
+        if missing:
+            self.add_error(title, 1, f'Missing column(s): {", ".join(missing)}.')
+            return
+
+        for number, values in enumerate(rows, start=2):
+            if not any(value.strip() for value in values):
+                continue
+            row = {
+                key: values[index].strip() if index < len(values) else ''
+                for key, index in columns.items()
+            }
+            try:
+                self.add_row(title, row)
+            except RowInvalid as e:
+                self.add_error(title, number, str(e))
+            if len(self.errors) >= MAX_ERRORS:
+                return
+
+    def get_sheet_type(self, title):
+        """Returns the row type of a sheet from its title, if any."""
+        sheet_type = normalize(title).rstrip('s')
+        if sheet_type in (ALLOCATION, DISTRIBUTION):
+            return sheet_type
+        return None
+
+    def add_row(self, title, row):
+        """Validates & collects a row of the imported sheet.
+
+        Raises:
+            RowInvalid: if the row is not valid
+        """
+        row_type = normalize(row.get('type') or title).rstrip('s')
+        if row_type not in (ALLOCATION, DISTRIBUTION):
+            raise RowInvalid(f'Unknown type "{row.get("type")}".')
+
+        delivery_order = self.get_row_delivery_order(row)
+        customer_pk = self.lookups.customers.get(normalize(row['region']))
+        if customer_pk is None:
+            raise RowInvalid(f'Unknown region "{row["region"]}".')
+        union_pk = self.lookups.unions.get(
+            (customer_pk, normalize(row['union']))
+        )
+        if union_pk is None:
+            raise RowInvalid(
+                f'Unknown union "{row["union"]}" in {row["region"]}.'
+            )
+        location_pk = self.lookups.locations.get(
+            (customer_pk, normalize(row['location']))
+        )
+        if location_pk is None:
+            raise RowInvalid(
+                f'Unknown location "{row["location"]}" in {row["region"]}.'
+            )
+
+        key = (delivery_order.pk, customer_pk)
+        quantity = self.get_quantity(row, 'quantity')
+        if row_type == ALLOCATION:
+            self.allocations.setdefault(key, []).append(
+                (union_pk, location_pk, quantity)
+            )
+        else:
+            self.distributions.setdefault(key, []).append((
+                union_pk, location_pk, quantity,
+                self.get_quantity(row, 'shortage', required=False),
+                self.get_quantity(row, 'over', required=False)
+            ))
+        self.row_count += 1
+
+    def get_row_delivery_order(self, row):
+        """Returns the delivery order of a row.
+
+        Raises:
+            RowInvalid: if the bill of loading is not one of the batch
+        """
+        bill_of_loading = row.get('bill_of_loading', '')
+        if not bill_of_loading and self.delivery_order is not None:
+            return self.delivery_order
+        delivery_order = self.delivery_orders.get(normalize(bill_of_loading))
+        if delivery_order is None:
+            raise RowInvalid(f'Unknown bill of loading "{bill_of_loading}".')
+        return delivery_order
+
+    def get_quantity(self, row, name, required=True):
+        """Returns a non-negative quantity of a row.
+
+        Raises:
+            RowInvalid: if the quantity is not a valid number
+        """
+        value = row.get(name, '').replace(',', '')
+        if not value and not required:
+            return Decimal('0')
+        try:
+            quantity = Decimal(value).quantize(QUANTITY_PLACES)
+            # `NaN` is quantized without an error, but can't be compared
+            if not quantity.is_finite():
+                raise InvalidOperation
+        except InvalidOperation:
+            raise RowInvalid(f'Invalid {name} "{row.get(name, "")}".')
+        if quantity < 0:
+            raise RowInvalid(f'The {name} can\'t be negative.')
+        return quantity
+
+    def add_error(self, sheet, row, message):
+        self.errors.append(RowError(sheet, row, message))
+
+    @transaction.atomic
+    def save(self):
+        """Saves the validated rows, replacing the imported regions.
+
+        Returns:
+            count (int): the number of imported union rows
+        """
+        self.replace(
+            Allocation, UnionAllocation, 'allocation', self.allocations,
+            ('union_id', 'location_id', 'quantity')
+        )
+        self.replace(
+            Distribution, UnionDistribution, 'distribution',
+            self.distributions,
+            ('union_id', 'location_id', 'quantity', 'shortage', 'over')
+        )
+
+        delivery_orders = {
+            delivery_order_pk
+            for delivery_order_pk, customer_pk in (
+                *self.allocations, *self.distributions
+            )
+        }
+        for delivery_order in self.delivery_orders.values():
+            if delivery_order.pk in delivery_orders:
+                delivery_order.touch(updated_by=self.user, update_batch=False)
+        self.batch.refresh_totals()
+        return self.row_count
+
+    def replace(self, model, union_model, parent_field, groups, fields):
+        """Replaces the regions of `groups` with their imported union rows.
+
+        Args:
+            model (Model): `Allocation` or `Distribution`
+            union_model (Model): `UnionAllocation` or `UnionDistribution`
+            parent_field (str): the `union_model` foreign key to `model`
+            groups (dict): union row values by `(order pk, customer pk)`
+            fields (tuple): the `union_model` fields of the row values
+        """
+        if not groups:
+            return
+
+        replaced = Q()
+        for delivery_order_pk, customer_pk in groups:
+            replaced |= Q(
+                delivery_order_id=delivery_order_pk,
+                buyer_id=customer_pk
+            )
+        model.objects.filter(replaced).delete()
+
+        parents = [
+            model(
+                delivery_order_id=delivery_order_pk,
+                buyer_id=customer_pk,
+                created_by=self.user
+            )
+            for delivery_order_pk, customer_pk in groups
+        ]
+        model.objects.bulk_create(parents, batch_size=IMPORT_BATCH_SIZE)
+
+        # `order_with_respect_to` isn't set by `bulk_create`
+        union_rows = (
+            union_model(
+                **{parent_field: parent, '_order': order},
+                **dict(zip(fields, values))
+            )
+            for parent, rows in zip(parents, groups.values())
+            for order, values in enumerate(rows)
+        )
+        union_model.objects.bulk_create(
+            union_rows, batch_size=IMPORT_BATCH_SIZE
+        )
@@ -1,46 +1,50 @@
+import re
+
 from docx.shared import Pt
 
-from shared.letters import LetterTemplate, Receiver, Paragraph, Text
+from shared.letters import LetterTemplate, TemplateLetter, Receiver, \
+    Paragraph, Text
 from customers.models import Customer
 
 
-class AllocationLetter(LetterTemplate):
-    """Class for generating allocation letters.
+BANK_ACCOUNT = '1000176361038'
+
+
+class AllocationLetterLayout(LetterTemplate):
+    """Layout of the allocation letters.
 
     Attributes:
-        receiver: An instance of the Receiver class
-        object: An instance of the DeliveryOrder model
+        context: values of the letter placeholders
+        sections: values of the repeated paragraphs (i.e. `allocations`)
     """
-    BANK_ACCOUNT = '1000176361038'
 
-    def __init__(self, delivery_order, *args, **kwargs):
+    def __init__(self, context, sections, *args, **kwargs):
         self.receiver = Receiver(
             name='Commercial Bank of Ethiopia',
             department='Trade Service Special Outlet',
             city='Addis Ababa'
         )
-        self.object = delivery_order
+        self.context = context
+        self.sections = sections
         super().__init__(self.receiver, *args, **kwargs)
 
     @property
     def subject(self):
-        return f'Documentary Credit Number {self.object.batch.lc_number}'
+        return f'Documentary Credit Number {self.context["lc_number"]}'
 
     def _build_content(self, *args, **kwargs):
         """Builds the letter content."""
-        vessel = self.object.vessel
-        quantity = self.object.get_allocated_quantity()
-        quantity = round(quantity, 2)
-        product = self.object.batch.product.name
-        category = self.object.batch.product.category.name.lower()
-        bol = self.object.bill_of_loading  # bill of loading
-        batch = self.object.batch.name
-        port = self.object.port.name
-        office = self.object.port.office
-        arrival_date = self.object.arrival_date
-        supplier = self.object.batch.supplier.name
-        unit = self.object.unit.code
-        eabc = Customer.objects.get(code='EABC')
+        vessel = self.context['vessel']
+        quantity = self.context['quantity']
+        product = self.context['product']
+        category = self.context['category']
+        bol = self.context['bill_of_loading']  # bill of loading
+        batch = self.context['batch']
+        port = self.context['port']
+        office = self.context['office']
+        arrival_date = self.context['arrival_date']
+        supplier = self.context['supplier']
+        unit = self.context['unit']
 
         greeting = Paragraph(self.document)
         greeting.add_text(Text('Dear Sirs,'))
@@ -50,12 +54,12 @@ class AllocationLetter(LetterTemplate):
             Text('Reading the subject in caption '),
             Text(vessel, bold=True),
             Text(' a vessel carrying '),
-            Text(f'{quantity:,} {unit} {product} {category} ', bold=True),
+            Text(f'{quantity} {unit} {product} {category} ', bold=True),
             Text(f'under B/L {bol} for {batch} ', bold=True),
             Text('will arrive at port of '),
             Text(f'{port} ', bold=True),
             Text('around '),
-            Text(f'{arrival_date:%d/%m/%Y}.', bold=True)
+            Text(f'{arrival_date}.', bold=True)
         )
 
         p2 = Paragraph(self.document)
@@ -76,30 +80,12 @@ class AllocationLetter(LetterTemplate):
             )
         )
 
-        for allocation in self.object.allocations.all():
+        for allocation in self.sections['allocations']:
             p3 = Paragraph(
                 self.document, style='List Bullet',
                 line_spacing=1.4, left_indent=Pt(12)
             )
-            allocation_quantity = round(allocation.get_total_quantity(), 2)
-            if allocation.buyer.code == 'TIG':
-                p3.add_texts(
-                    Text(
-                        f'{eabc} bank account no. '
-                        F'{self.BANK_ACCOUNT} for the value of '
-                        f'{allocation_quantity:,} {unit} '
-                        f'({allocation.buyer.region} Allocation)',
-                        bold=True
-                    )
-                )
-            else:
-                p3.add_texts(
-                    Text(
-                        f'{allocation.buyer.name} account for the value of '
-                        f'{allocation_quantity:,} {unit} ',
-                        bold=True
-                    )
-                )
+            p3.add_text(Text(allocation['text'], bold=True))
 
         p4 = Paragraph(self.document)
         p4.add_texts(
@@ -113,7 +99,7 @@ class AllocationLetter(LetterTemplate):
         p5 = Paragraph(self.document, space_after=Pt(18))
         p5.add_texts(
             Text('Please note that, we authorize you to debit our bank '),
-            Text(f'A/C {self.BANK_ACCOUNT} ', bold=True),
+            Text(f'A/C {BANK_ACCOUNT} ', bold=True),
             Text(
                 'with CBE Addis Ababa branch for any related charge to the '
                 'issuance of delivery order.'
@@ -147,3 +133,96 @@ class AllocationLetter(LetterTemplate):
         p9.add_text(
             Text('AISS', bold=True, underline=True)
         )
+
+
+class AllocationLetter(TemplateLetter):
+    """Class for generating allocation letters.
+
+    Attributes:
+        object: An instance of the DeliveryOrder model
+    """
+    BANK_ACCOUNT = BANK_ACCOUNT
+    FILE_DIRECTORY = 'letters/allocation'
+    VERSION_FILE_NAME = re.compile(r'^\d{20}\.docx$')
+
+    layout_class = AllocationLetterLayout
+    placeholders = [
+        'lc_number', 'vessel', 'quantity', 'unit', 'product', 'category',
+        'bill_of_loading', 'batch', 'port', 'office', 'arrival_date',
+        'supplier'
+    ]
+    sections = {'allocations': ['text']}
+
+    def __init__(self, delivery_order, *args, **kwargs):
+        self.object = delivery_order
+
+    @classmethod
+    def get_file_name(cls, delivery_order):
+        """Returns the storage file name of the letter of `delivery_order`.
+
+        The name changes whenever the delivery order (or its batch) is
+        touched, so a stored letter is never served out of date.
+        """
+        version = max(delivery_order.updated_at, delivery_order.batch.updated_at)
+        return (
+            f'{cls.FILE_DIRECTORY}/{delivery_order.pk}/'
+            f'{version:%Y%m%d%H%M%S%f}.docx'
+        )
+
+    @classmethod
+    def get_version_name(cls, delivery_order, file_name):
+        """Returns the storage name of a stored letter version.
+
+        Args:
+            file_name (str): file name of the version, without directory
+
+        Returns:
+            name (str): the storage file name, `None` for an invalid name
+        """
+        if not cls.VERSION_FILE_NAME.match(file_name or ''):
+            return None
+        return f'{cls.FILE_DIRECTORY}/{delivery_order.pk}/{file_name}'
+
+    def get_context(self):
+        batch = self.object.batch
+        quantity = round(self.object.get_totals().allocated_quantity, 2)
+        return {
+            'lc_number': batch.lc_number,
+            'vessel': self.object.vessel,
+            'quantity': f'{quantity:,}',
+            'unit': self.object.unit.code,
+            'product': batch.product.name,
+            'category': batch.product.category.name.lower(),
+            'bill_of_loading': self.object.bill_of_loading,
+            'batch': batch.name,
+            'port': self.object.port.name,
+            'office': self.object.port.office,
+            'arrival_date': f'{self.object.arrival_date:%d/%m/%Y}',
+            'supplier': batch.supplier.name
+        }
+
+    def get_sections(self):
+        unit = self.object.unit.code
+        allocations = self.object.allocations.with_totals()
+        allocations = allocations.select_related('buyer')
+        eabc = None
+
+        items = []
+        for allocation in allocations:
+            quantity = round(allocation.get_total_quantity(), 2)
+            if allocation.buyer.code == 'TIG':
+                if eabc is None:
+                    eabc = Customer.objects.get(code='EABC')
+                text = (
+                    f'{eabc} bank account no. '
+                    f'{self.BANK_ACCOUNT} for the value of '
+                    f'{quantity:,} {unit} '
+                    f'({allocation.buyer.region} Allocation)'
+                )
+            else:
+                text = (
+                    f'{allocation.buyer.name} account for the value of '
+                    f'{quantity:,} {unit} '
+                )
+            items.append({'text': text})
+        return {'allocations': items}
@@ -0,0 +1,97 @@
+import time
+from io import BytesIO
+
+from django.core.management import BaseCommand
+
+from orders.letters.allocationletter import AllocationLetter, \
+    AllocationLetterLayout
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the allocation letter rendering time of the docx template '
+        'against building the letter with python-docx on every run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--letters',
+            type=int,
+            default=100,
+            help='Number of letters rendered by each engine.'
+        )
+        parser.add_argument(
+            '--allocations',
+            type=int,
+            default=12,
+            help='Number of union allocations of each letter.'
+        )
+
+    def handle(self, *args, **options):
+        count = options['letters']
+        letter = SampleAllocationLetter(options['allocations'])
+        context = letter.get_context()
+        sections = letter.get_sections()
+
+        # Build the template outside of the timed runs
+        AllocationLetter.get_template()
+
+        results = {
+            'python-docx': self.run(
+                lambda output: AllocationLetterLayout(
+                    context, sections
+                ).generate(output),
+                count
+            ),
+            'template': self.run(letter.generate, count)
+        }
+        for engine, seconds in results.items():
+            self.stdout.write(
+                f'{engine:<12} {seconds / count * 1000:8.1f}ms per letter '
+                f'{seconds / count * 100:8.2f}s per 100 letters'
+            )
+        speedup = results['python-docx'] / results['template']
+        self.stdout.write(f'Template rendering is {speedup:.1f}x faster.')
+
+    def run(self, generate, count):
+        """Returns the wall time of generating `count` letters in seconds."""
+        start = time.perf_counter()
+        for _ in range(count):
+            generate(BytesIO())
+        return time.perf_counter() - start
+
+
+class SampleAllocationLetter(AllocationLetter):
+    """Allocation letter with synthetic values, so no database is needed."""
+
+    def __init__(self, allocation_count):
+        self.allocation_count = allocation_count
+
+    def get_context(self):
+        return {
+            'lc_number': 'LC-2020-0042',
+            'vessel': 'MV Sample Vessel',
+            'quantity': '25,000.00',
+            'unit': 'MT',
+            'product': 'UREA',
+            'category': 'fertilizer',
+            'bill_of_loading': 'BL-0042',
+            'batch': 'Batch 2020/21',
+            'port': 'Djibouti',
+            'office': 'Djibouti Port Office',
+            'arrival_date': '01/11/2020',
+            'supplier': 'Sample Supplier'
+        }
+
+    def get_sections(self):
+        return {
+            'allocations': [
+                {
+                    'text': (
+                        f'Union {number} account for the value of '
+                        f'{number * 100:,}.00 MT '
+                    )
+                }
+                for number in range(1, self.allocation_count + 1)
+            ]
+        }
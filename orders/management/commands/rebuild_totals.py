@@ -0,0 +1,79 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from orders.models import Batch, BatchTotals, DeliveryOrder, \
+    DeliveryOrderTotals
+
+
+class Command(BaseCommand):
+    help = 'Recompute the materialized batch & delivery order totals.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report the drifted totals without saving them.'
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        drift_count = 0
+
+        delivery_orders = DeliveryOrder.objects.with_totals()
+        delivery_orders = delivery_orders.select_related('batch', 'totals')
+        with transaction.atomic():
+            for order in delivery_orders.exclude(batch=None):
+                values = order.compute_totals()
+                drift_count += self.check_drift(order, values)
+                if not dry_run:
+                    DeliveryOrderTotals.objects.update_or_create(
+                        delivery_order=order,
+                        defaults=values
+                    )
+
+            for batch in Batch.objects.select_related('totals'):
+                stored = self.get_stored_values(batch)
+                if dry_run:
+                    with transaction.atomic():
+                        values = batch.refresh_totals().get_values()
+                        transaction.set_rollback(True)
+                else:
+                    values = batch.refresh_totals().get_values()
+                drift_count += self.check_drift(batch, values, stored)
+
+        self.stdout.write(f'{drift_count} drifted totals found.')
+        if not dry_run:
+            self.stdout.write('Totals are successfully rebuilt.')
+
+    def get_stored_values(self, obj):
+        """Returns the stored totals of `obj`, `None` when missing."""
+        try:
+            return obj.totals.get_values()
+        except (BatchTotals.DoesNotExist, DeliveryOrderTotals.DoesNotExist):
+            return None
+
+    def check_drift(self, obj, values, stored=None):
+        """Reports the stored totals of `obj` that differ from `values`.
+
+        Returns:
+            drifted (int): 1 if the stored totals drifted, 0 otherwise
+        """
+        if stored is None:
+            stored = self.get_stored_values(obj)
+        if stored is None:
+            self.stdout.write(f'{obj!r}: missing totals')
+            return 1
+
+        fields = [
+            field for field, value in values.items()
+            if stored[field] != value
+        ]
+        if not fields:
+            return 0
+
+        for field in fields:
+            self.stdout.write(
+                f'{obj!r}: {field} stored {stored[field]}, '
+                f'actual {values[field]}'
+            )
+        return 1
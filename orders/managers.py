@@ -0,0 +1,191 @@
+from decimal import Decimal
+
+from django.apps import apps
+from django.db import models
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Sum, \
+    Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+
+
+QUANTITY_FIELD = models.DecimalField(max_digits=20, decimal_places=4)
+
+COUNT_FIELD = models.IntegerField()
+
+
+def sum_subquery(model_name, outer_field, expression):
+    """Returns a correlated `SUM` subquery over an `orders` model.
+
+    Args:
+        model_name (str): name of the model to aggregate (e.g. 'UnionAllocation')
+        outer_field (str): lookup path from the model to the outer row
+        expression (str|Expression): the column or expression to sum up
+
+    Returns:
+        total (Expression): the summed value, `0` when there are no rows
+    """
+    model = apps.get_model('orders', model_name)
+    qs = model.objects.filter(**{outer_field: OuterRef('pk')})
+    qs = qs.order_by().values(outer_field)
+    qs = qs.annotate(total=Sum(expression, output_field=QUANTITY_FIELD))
+    return Coalesce(
+        Subquery(qs.values('total'), output_field=QUANTITY_FIELD),
+        Value(Decimal('0')),
+        output_field=QUANTITY_FIELD
+    )
+
+
+def buyer_count(model_name):
+    """Returns a correlated count of the distinct buyers of an order.
+
+    Args:
+        model_name (str): `Allocation` or `Distribution`
+
+    Returns:
+        count (Expression): the number of regions of the outer delivery
+            order with a `model_name` row, `0` when there are no rows
+    """
+    model = apps.get_model('orders', model_name)
+    qs = model.objects.filter(delivery_order=OuterRef('pk'))
+    qs = qs.order_by().values('delivery_order')
+    qs = qs.annotate(total=Count('buyer', distinct=True))
+    return Coalesce(
+        Subquery(qs.values('total'), output_field=COUNT_FIELD),
+        Value(0),
+        output_field=COUNT_FIELD
+    )
+
+
+def customer_count():
+    """Returns an uncorrelated subquery counting all the customers."""
+    table = apps.get_model('customers', 'Customer')._meta.db_table
+    return RawSQL(
+        f'SELECT COUNT(*) FROM {table}', [], output_field=COUNT_FIELD
+    )
+
+
+def is_complete(count_field):
+    """Returns `True` when the annotated buyer count covers all customers."""
+    return Case(
+        When(**{f'{count_field}__gte': F('customer_count')}, then=Value(True)),
+        default=Value(False),
+        output_field=models.BooleanField()
+    )
+
+
+def distributed_quantity():
+    """Returns the union distribution quantity including shortage & over."""
+    return F('quantity') + F('shortage') + F('over')
+
+
+def distributed_shortage():
+    """Returns the union distribution shortage including over supply."""
+    return F('shortage') + F('over')
+
+
+class BatchQuerySet(models.QuerySet):
+    """Custom queryset for the Batch model."""
+
+    def with_totals(self):
+        """Annotates the allocation & distribution rollups of each batch.
+
+        All totals are computed by the database in the same query, so that
+        the `Batch.get_*` methods can skip walking the delivery order tree.
+        The amounts are rounded per delivery order, so they are read from
+        the stored totals, joined in the same query. They are `None` when
+        the totals row is missing.
+        """
+        return self.annotate(
+            total_allocated_quantity=sum_subquery(
+                'UnionAllocation',
+                'allocation__delivery_order__batch',
+                'quantity'
+            ),
+            total_distributed_quantity=sum_subquery(
+                'UnionDistribution',
+                'distribution__delivery_order__batch',
+                distributed_quantity()
+            ),
+            total_distributed_shortage=sum_subquery(
+                'UnionDistribution',
+                'distribution__delivery_order__batch',
+                distributed_shortage()
+            ),
+            total_allocated_amount=F('totals__allocated_amount'),
+            total_advance_amount=F('totals__advance_amount'),
+            total_retention_amount=F('totals__retention_amount'),
+            total_distributed_amount=F('totals__distributed_amount')
+        )
+
+
+class DeliveryOrderQuerySet(models.QuerySet):
+    """Custom queryset for the DeliveryOrder model."""
+
+    def with_totals(self):
+        """Annotates the allocation & distribution rollups of each order."""
+        return self.annotate(
+            total_allocated_quantity=sum_subquery(
+                'UnionAllocation',
+                'allocation__delivery_order',
+                'quantity'
+            ),
+            total_distributed_quantity=sum_subquery(
+                'UnionDistribution',
+                'distribution__delivery_order',
+                distributed_quantity()
+            ),
+            total_distributed_shortage=sum_subquery(
+                'UnionDistribution',
+                'distribution__delivery_order',
+                distributed_shortage()
+            )
+        )
+
+    def with_completeness(self):
+        """Annotates whether all the regions are allocated & distributed.
+
+        The distinct allocated & distributed regions of each order are
+        compared to the number of customers in the same query, so hundreds
+        of orders are checked at once.
+        """
+        return self.annotate(
+            allocated_buyer_count=buyer_count('Allocation'),
+            distributed_buyer_count=buyer_count('Distribution'),
+            customer_count=customer_count()
+        ).annotate(
+            fully_allocated=is_complete('allocated_buyer_count'),
+            fully_distributed=is_complete('distributed_buyer_count')
+        )
+
+    def incomplete(self):
+        """Returns the orders with a region not allocated or distributed."""
+        return self.with_completeness().filter(
+            Q(fully_allocated=False) | Q(fully_distributed=False)
+        )
+
+
+class AllocationQuerySet(models.QuerySet):
+    """Custom queryset for the Allocation model."""
+
+    def with_totals(self):
+        """Annotates the total union allocation quantity."""
+        return self.annotate(
+            total_quantity=sum_subquery(
+                'UnionAllocation', 'allocation', 'quantity'
+            )
+        )
+
+
+class DistributionQuerySet(models.QuerySet):
+    """Custom queryset for the Distribution model."""
+
+    def with_totals(self):
+        """Annotates the total union distribution quantity & shortage."""
+        return self.annotate(
+            total_quantity=sum_subquery(
+                'UnionDistribution', 'distribution', distributed_quantity()
+            ),
+            total_shortage=sum_subquery(
+                'UnionDistribution', 'distribution', distributed_shortage()
+            )
+        )
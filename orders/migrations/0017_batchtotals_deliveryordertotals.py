@@ -0,0 +1,50 @@
+# Generated by Django 2.2.13 on 2026-10-18 16:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0016_auto_20200920_1452'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BatchTotals',
+            fields=[
+                ('allocated_quantity', models.DecimalField(decimal_places=4, default=0, max_digits=20)),
+                ('allocated_amount', models.DecimalField(decimal_places=4, default=0, max_digits=24)),
+                ('advance_amount', models.DecimalField(decimal_places=4, default=0, max_digits=24)),
+                ('retention_amount', models.DecimalField(decimal_places=4, default=0, max_digits=24)),
+                ('distributed_quantity', models.DecimalField(decimal_places=4, default=0, max_digits=20)),
+                ('distributed_shortage', models.DecimalField(decimal_places=4, default=0, max_digits=20)),
+                ('distributed_amount', models.DecimalField(decimal_places=4, default=0, max_digits=24)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('batch', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='totals', serialize=False, to='orders.Batch')),
+            ],
+            options={
+                'verbose_name': 'Batch Totals',
+                'verbose_name_plural': 'Batch Totals',
+            },
+        ),
+        migrations.CreateModel(
+            name='DeliveryOrderTotals',
+            fields=[
+                ('allocated_quantity', models.DecimalField(decimal_places=4, default=0, max_digits=20)),
+                ('allocated_amount', models.DecimalField(decimal_places=4, default=0, max_digits=24)),
+                ('advance_amount', models.DecimalField(decimal_places=4, default=0, max_digits=24)),
+                ('retention_amount', models.DecimalField(decimal_places=4, default=0, max_digits=24)),
+                ('distributed_quantity', models.DecimalField(decimal_places=4, default=0, max_digits=20)),
+                ('distributed_shortage', models.DecimalField(decimal_places=4, default=0, max_digits=20)),
+                ('distributed_amount', models.DecimalField(decimal_places=4, default=0, max_digits=24)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('delivery_order', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='totals', serialize=False, to='orders.DeliveryOrder')),
+            ],
+            options={
+                'verbose_name': 'Delivery Order Totals',
+                'verbose_name_plural': 'Delivery Order Totals',
+            },
+        ),
+    ]
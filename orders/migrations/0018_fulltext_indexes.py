@@ -0,0 +1,23 @@
+from django.db import migrations
+
+from shared.fulltext import AddFullTextIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0017_batchtotals_deliveryordertotals'),
+    ]
+
+    operations = [
+        AddFullTextIndex(
+            model_name='batch',
+            name='orders_batch_search_ft',
+            fields=['name', 'lc_number'],
+        ),
+        AddFullTextIndex(
+            model_name='deliveryorder',
+            name='orders_deliveryorder_search_ft',
+            fields=['vessel', 'bill_of_loading'],
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 2.2.13 on 2026-10-18 16:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0018_fulltext_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='allocation',
+            index=models.Index(fields=['delivery_order', 'created_at'], name='allocation_order_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='batch',
+            index=models.Index(fields=['status', 'created_at'], name='batch_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='batch',
+            index=models.Index(fields=['status', 'supplier', 'created_at'], name='batch_status_supplier_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='batch',
+            index=models.Index(fields=['status', 'product', 'created_at'], name='batch_status_product_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deliveryorder',
+            index=models.Index(fields=['batch', 'created_at'], name='deliveryorder_batch_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='distribution',
+            index=models.Index(fields=['delivery_order', 'created_at'], name='distribution_order_created_idx'),
+        ),
+    ]
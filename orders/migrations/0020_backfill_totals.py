@@ -0,0 +1,102 @@
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import F, Sum
+
+from shared.constants import ADVANCE, RETENTION
+
+
+QUANTITY_FIELD = models.DecimalField(max_digits=20, decimal_places=4)
+
+
+def sum_by_order(queryset, order_field, expression):
+    """Returns the sums of `expression` keyed by delivery order pk."""
+    rows = queryset.order_by().values(order_field).annotate(
+        total=Sum(expression, output_field=QUANTITY_FIELD)
+    )
+    return {row[order_field]: row['total'] for row in rows}
+
+
+def compute_order_totals(allocated, distributed, shortage, rate):
+    """Returns the totals of an order, rounded like `compute_totals`."""
+    allocated_amount = round(round(allocated, 4) * rate, 4)
+    return {
+        'allocated_quantity': round(allocated, 4),
+        'allocated_amount': allocated_amount,
+        'advance_amount': round(allocated_amount * ADVANCE),
+        'retention_amount': round(allocated_amount * RETENTION),
+        'distributed_quantity': round(distributed, 4),
+        'distributed_shortage': round(shortage, 4),
+        'distributed_amount': round(round(distributed, 4) * rate, 4)
+    }
+
+
+def backfill_totals(apps, schema_editor):
+    """Stores the missing totals rows of the existing batches & orders.
+
+    Computes the same values as the `rebuild_totals` command with the
+    historical models, the existing rows are kept.
+    """
+    Batch = apps.get_model('orders', 'Batch')
+    BatchTotals = apps.get_model('orders', 'BatchTotals')
+    DeliveryOrder = apps.get_model('orders', 'DeliveryOrder')
+    DeliveryOrderTotals = apps.get_model('orders', 'DeliveryOrderTotals')
+    UnionAllocation = apps.get_model('orders', 'UnionAllocation')
+    UnionDistribution = apps.get_model('orders', 'UnionDistribution')
+
+    allocated = sum_by_order(
+        UnionAllocation.objects.all(),
+        'allocation__delivery_order',
+        'quantity'
+    )
+    distributed = sum_by_order(
+        UnionDistribution.objects.all(),
+        'distribution__delivery_order',
+        F('quantity') + F('shortage') + F('over')
+    )
+    shortage = sum_by_order(
+        UnionDistribution.objects.all(),
+        'distribution__delivery_order',
+        F('shortage') + F('over')
+    )
+
+    stored_orders = set(
+        DeliveryOrderTotals.objects.values_list('delivery_order', flat=True)
+    )
+    batch_values = {}
+    order_totals = []
+    delivery_orders = DeliveryOrder.objects.exclude(batch=None)
+    for pk, batch_pk, rate in delivery_orders.values_list(
+            'pk', 'batch', 'batch__rate'):
+        values = compute_order_totals(
+            allocated.get(pk, Decimal('0')),
+            distributed.get(pk, Decimal('0')),
+            shortage.get(pk, Decimal('0')),
+            rate
+        )
+        totals = batch_values.setdefault(batch_pk, {})
+        for field, value in values.items():
+            totals[field] = totals.get(field, Decimal('0')) + value
+        if pk not in stored_orders:
+            order_totals.append(
+                DeliveryOrderTotals(delivery_order_id=pk, **values)
+            )
+    DeliveryOrderTotals.objects.bulk_create(order_totals, batch_size=500)
+
+    stored_batches = set(BatchTotals.objects.values_list('batch', flat=True))
+    BatchTotals.objects.bulk_create([
+        BatchTotals(batch_id=pk, **batch_values.get(pk, {}))
+        for pk in Batch.objects.values_list('pk', flat=True)
+        if pk not in stored_batches
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0019_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_totals, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,14 @@
-from shared.mixins import BaseAccessMixin
+from django.forms import modelform_factory
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, render
+
+from customers.lookups import RegionChoices, get_region_choices
+from shared.mixins import BaseAccessMixin, MediaFileMixin
+from shared.spreadsheets import CSV_CONTENT_TYPE, XLSX_CONTENT_TYPE
+
+from .buyers import get_remaining_buyers
+from .exports import stream_csv_export, stream_xlsx_export
+from .models import DeliveryOrder
 
 
 class BaseOrderView(BaseAccessMixin):
@@ -15,3 +25,132 @@ class BaseBatchesView(BaseAccessMixin):
     """
     page_name = 'batches'
     access_roles = []
+
+
+class BuyerChoicesMixin:
+    """
+    Mixin for the views adding an allocation (or distribution) to the
+    delivery order of the `pk` URL argument.
+
+    The delivery order & the buyer form are built once per request, both
+    when the form is displayed & when it is submitted. The buyer choices
+    are the regions without a `buyer_model` row in the delivery order.
+    """
+    buyer_model = None
+
+    def get_delivery_order(self):
+        if not hasattr(self, 'delivery_order'):
+            self.delivery_order = get_object_or_404(
+                DeliveryOrder.objects.select_related('batch'),
+                pk=self.kwargs.get('pk')
+            )
+        return self.delivery_order
+
+    def get_buyer_choices(self):
+        return get_remaining_buyers(
+            self.get_delivery_order(), self.buyer_model
+        )
+
+    def get_buyer_form(self):
+        if not hasattr(self, 'buyer_form'):
+            form_class = modelform_factory(
+                self.buyer_model, fields=('buyer', )
+            )
+            form = form_class(self.request.POST or None)
+            form.fields['buyer'].queryset = self.get_buyer_choices()
+            self.buyer_form = form
+        return self.buyer_form
+
+
+class RegionChoicesMixin:
+    """
+    Mixin for the allocation (or distribution) edit views of a region.
+
+    The union & location choices of the region are loaded once per request
+    & shared by all the forms of the union rows formset. There are no
+    choices until the region is chosen.
+    """
+
+    def get_region(self):
+        """Returns the customer pk of the edited region, if known."""
+        raise NotImplementedError
+
+    def get_region_choices(self):
+        if not hasattr(self, 'region_choices'):
+            region = self.get_region()
+            if region is None:
+                self.region_choices = RegionChoices([], [])
+            else:
+                self.region_choices = get_region_choices(region)
+        return self.region_choices
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['region_choices'] = self.get_region_choices()
+        return kwargs
+
+
+class LetterDownloadMixin(MediaFileMixin):
+    """
+    Mixin for views downloading letters generated by celery tasks.
+
+    Until the letters are ready, a page polling the job status is displayed
+    (or the job id is returned to AJAX requests).
+    """
+    template_name = 'orders/letter_download.html'
+    content_type = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+    letter_title = 'letter'
+
+    def get_status_url(self):
+        """Returns the url of the job status view."""
+        raise NotImplementedError
+
+    def get_back_url(self):
+        """Returns the url to go back to from the pending letter page."""
+        raise NotImplementedError
+
+    def render_job(self, job_id):
+        """Returns the response of a pending letter generation job."""
+        status_url = f'{self.get_status_url()}?job={job_id}'
+        if self.request.is_ajax():
+            return JsonResponse(
+                {'job': job_id, 'status_url': status_url},
+                status=202
+            )
+        context = self.get_context_data(
+            object=self.object,
+            status_url=status_url,
+            back_url=self.get_back_url(),
+            letter_title=self.letter_title
+        )
+        return render(self.request, self.template_name, context, status=202)
+
+
+class ExportMixin:
+    """
+    Mixin for views streaming the union allocations & distributions of
+    delivery orders as a CSV or an Excel file.
+    """
+    export_formats = {
+        'csv': (stream_csv_export, CSV_CONTENT_TYPE),
+        'xlsx': (stream_xlsx_export, XLSX_CONTENT_TYPE),
+    }
+
+    def get_export_queryset(self):
+        """Returns the exported delivery orders."""
+        raise NotImplementedError
+
+    def get_export_name(self):
+        """Returns the exported file name, without extension."""
+        raise NotImplementedError
+
+    def render_export(self, export_format):
+        """Returns the streamed export response in `export_format`."""
+        stream_export, content_type = self.export_formats[export_format]
+        response = StreamingHttpResponse(
+            stream_export(self.get_export_queryset()),
+            content_type=content_type
+        )
+        filename = f'{self.get_export_name()}.{export_format}'
+        response['Content-Disposition'] = f'attachment; filename={filename}'
+        return response
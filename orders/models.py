@@ -5,7 +5,7 @@ from functools import reduce
 
 from django.contrib.auth import get_user_model
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from django.urls import reverse
 from django.utils import timezone
 
@@ -16,6 +16,9 @@ from shared.constants import ADVANCE, RETENTION
 from shared.models import Unit
 from customers.models import Customer, Union, Location
 
+from .managers import BatchQuerySet, DeliveryOrderQuerySet, \
+    AllocationQuerySet, DistributionQuerySet
+
 
 User = settings.AUTH_USER_MODEL
 
@@ -103,11 +106,27 @@ class Batch(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = BatchQuerySet.as_manager()
+
     class Meta:
         default_related_name='batches'
         verbose_name = 'Purchasing Batch'
         verbose_name_plural = 'Purchasing Batches'
         ordering = ('-created_at', )
+        indexes = [
+            models.Index(
+                fields=['status', 'created_at'],
+                name='batch_status_created_idx'
+            ),
+            models.Index(
+                fields=['status', 'supplier', 'created_at'],
+                name='batch_status_supplier_idx'
+            ),
+            models.Index(
+                fields=['status', 'product', 'created_at'],
+                name='batch_status_product_idx'
+            ),
+        ]
         permissions = [
             ('close_batch', 'Close purchasing batch'),
             ('reopen_batch', 'Re-open purchasing batch')
@@ -133,6 +152,9 @@ class Batch(models.Model):
         Return:
             quantity (Decimal): total allocated quantity in product unit
         """
+        if hasattr(self, 'total_allocated_quantity'):
+            return round(self.total_allocated_quantity, 4)
+
         delivery_orders = self.delivery_orders.all()
         quantity = reduce(
             lambda total, order: total + order.get_allocated_quantity(),
@@ -147,6 +169,11 @@ class Batch(models.Model):
         Return:
             amount (Decimal): total allocated amount in USD.
         """
+        # The amounts are rounded per delivery order, not on the batch
+        # quantity, so `with_totals` reads them from the stored totals
+        if getattr(self, 'total_allocated_amount', None) is not None:
+            return self.total_allocated_amount
+
         delivery_orders = self.delivery_orders.all()
         amount = reduce(
             lambda total, order: total + order.get_allocated_amount(),
@@ -161,6 +188,9 @@ class Batch(models.Model):
         Return:
             amount (Decimal): total 90% allocated advance amount in USD.
         """
+        if getattr(self, 'total_advance_amount', None) is not None:
+            return self.total_advance_amount
+
         delivery_orders = self.delivery_orders.all()
         amount = reduce(
             lambda total, order: total + order.get_allocated_advance(),
@@ -175,6 +205,9 @@ class Batch(models.Model):
         Return:
             amount (Decimal): total 10% allocated retention amount in USD.
         """
+        if getattr(self, 'total_retention_amount', None) is not None:
+            return self.total_retention_amount
+
         delivery_orders = self.delivery_orders.all()
         amount = reduce(
             lambda total, order: total + order.get_allocated_retention(),
@@ -189,6 +222,9 @@ class Batch(models.Model):
         Return:
             quantity (Decimal): total distributed quantity in product unit
         """
+        if hasattr(self, 'total_distributed_quantity'):
+            return round(self.total_distributed_quantity, 4)
+
         delivery_orders = self.delivery_orders.all()
         quantity = reduce(
             lambda total, order: total + order.get_distributed_quantity(),
@@ -203,6 +239,9 @@ class Batch(models.Model):
         Return:
             quantity (Decimal): total distributed shortage in product unit
         """
+        if hasattr(self, 'total_distributed_shortage'):
+            return round(self.total_distributed_shortage, 4)
+
         delivery_orders = self.delivery_orders.all()
         quantity = reduce(
             lambda total, order: total + order.get_distributed_shortage(),
@@ -217,6 +256,9 @@ class Batch(models.Model):
         Return:
             amount (Decimal): total distributed amount in USD.
         """
+        if getattr(self, 'total_distributed_amount', None) is not None:
+            return self.total_distributed_amount
+
         delivery_orders = self.delivery_orders.all()
         amount = reduce(
             lambda total, order: total + order.get_distributed_amount(),
@@ -225,6 +267,59 @@ class Batch(models.Model):
         )
         return amount
 
+    def compute_totals(self):
+        """Computes the totals of the batch from its delivery orders.
+
+        Returns:
+            totals (dict): total values keyed by `BaseTotals` field names
+        """
+        values = dict.fromkeys(BaseTotals.TOTAL_FIELDS, Decimal('0'))
+        for order in self.delivery_orders.with_totals():
+            order.batch = self
+            for field, value in order.compute_totals().items():
+                values[field] += value
+        return values
+
+    def get_totals(self):
+        """Returns the materialized totals, computing them when missing.
+
+        The totals row is created with the batch, a missing row is computed
+        in memory but never stored, so that reads don't write.
+
+        Returns:
+            totals (BatchTotals): the stored (or unsaved) totals of the batch
+        """
+        try:
+            return self.totals
+        except BatchTotals.DoesNotExist:
+            self.totals = BatchTotals(batch=self, **self.compute_totals())
+            return self.totals
+
+    def refresh_totals(self, cascade=False):
+        """Recomputes and stores the materialized totals of the batch.
+
+        Args:
+            cascade (bool): also store the totals of each delivery order,
+                            needed when the batch `rate` changes.
+
+        Returns:
+            totals (BatchTotals): the refreshed totals of the batch
+        """
+        with transaction.atomic():
+            if cascade:
+                for order in self.delivery_orders.with_totals():
+                    order.batch = self
+                    DeliveryOrderTotals.objects.update_or_create(
+                        delivery_order=order,
+                        defaults=order.compute_totals()
+                    )
+            totals, _ = BatchTotals.objects.update_or_create(
+                batch=self,
+                defaults=self.compute_totals()
+            )
+        self.totals = totals
+        return totals
+
 
 class DeliveryOrder(models.Model):
     """Product delivery orders."""
@@ -256,9 +351,17 @@ class DeliveryOrder(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = DeliveryOrderQuerySet.as_manager()
+
     class Meta:
         default_related_name = 'delivery_orders'
         ordering = ('created_at', )
+        indexes = [
+            models.Index(
+                fields=['batch', 'created_at'],
+                name='deliveryorder_batch_idx'
+            ),
+        ]
         verbose_name = 'Delivery Order'
         verbose_name_plural = 'Delivery Orders'
 
@@ -280,12 +383,77 @@ class DeliveryOrder(models.Model):
     def touch(self, **kwargs):
         """
         Modifies `updated_at` field to to the current timestamp.
+
+        The batch totals are refreshed too, unless `update_batch` is `False`
+        (e.g. when several orders of the batch are touched at once).
         """
         user = kwargs.get('updated_by')
         if user is not None:
             self.updated_by = user
         self.updated_at = timezone.now()
-        self.save()
+        with transaction.atomic():
+            self.save()
+            self.refresh_totals(
+                update_batch=kwargs.get('update_batch', True)
+            )
+
+    def compute_totals(self):
+        """Computes the allocation & distribution totals of the order.
+
+        Returns:
+            totals (dict): total values keyed by `BaseTotals` field names
+        """
+        return {
+            'allocated_quantity': self.get_allocated_quantity(),
+            'allocated_amount': self.get_allocated_amount(),
+            'advance_amount': self.get_allocated_advance(),
+            'retention_amount': self.get_allocated_retention(),
+            'distributed_quantity': self.get_distributed_quantity(),
+            'distributed_shortage': self.get_distributed_shortage(),
+            'distributed_amount': self.get_distributed_amount()
+        }
+
+    def get_totals(self):
+        """Returns the materialized totals, computing them when missing.
+
+        The totals row is created with the order, a missing row is computed
+        in memory but never stored, so that reads don't write.
+
+        Returns:
+            totals (DeliveryOrderTotals): the stored (or unsaved) totals of
+                the order
+        """
+        try:
+            return self.totals
+        except DeliveryOrderTotals.DoesNotExist:
+            self.totals = DeliveryOrderTotals(
+                delivery_order=self, **self.compute_totals()
+            )
+            return self.totals
+
+    def refresh_totals(self, update_batch=True):
+        """Recomputes and stores the materialized totals of the order.
+
+        Args:
+            update_batch (bool): also refresh the totals of the parent batch
+
+        Returns:
+            totals (DeliveryOrderTotals): the refreshed totals of the order
+        """
+        qs = DeliveryOrder.objects.with_totals().select_related('batch')
+        order = qs.get(pk=self.pk)
+        with transaction.atomic():
+            totals, _ = DeliveryOrderTotals.objects.update_or_create(
+                delivery_order=self,
+                defaults=order.compute_totals()
+            )
+            if update_batch and order.batch is not None:
+                batch_totals = order.batch.refresh_totals()
+                # Keeps the totals of an already loaded batch current
+                if DeliveryOrder.batch.is_cached(self) and self.batch:
+                    self.batch.totals = batch_totals
+        self.totals = totals
+        return totals
 
     def is_fully_allocated(self):
         """Checks if all regions are allocated.
@@ -294,13 +462,12 @@ class DeliveryOrder(models.Model):
             True (bool): If all regions are allocated
             False (bool): If all regions are not fully allocated yet
         """
-        customers = Customer.objects.all()
-        allocated_buyers = self.allocations.values_list('buyer', flat=True)
+        if hasattr(self, 'fully_allocated'):
+            return self.fully_allocated
 
-        for customer in customers:
-            if customer.pk not in allocated_buyers:
-                return False
-        return True
+        # `NOT IN` never matches when the subquery has a `NULL` buyer
+        allocated_buyers = self.allocations.exclude(buyer=None).values('buyer')
+        return not Customer.objects.exclude(pk__in=allocated_buyers).exists()
 
     def is_fully_distributed(self):
         """Checks if distribution data is added to all allocated regions.
@@ -310,13 +477,13 @@ class DeliveryOrder(models.Model):
             False (bool): If some allocated regions are missing distribution
                           data
         """
-        customers = Customer.objects.all()
-        distributed_buyers = self.distributions.values_list('buyer', flat=True)
+        if hasattr(self, 'fully_distributed'):
+            return self.fully_distributed
 
-        for customer in customers:
-            if customer.pk not in distributed_buyers:
-                return False
-        return True
+        distributed_buyers = self.distributions.exclude(
+            buyer=None
+        ).values('buyer')
+        return not Customer.objects.exclude(pk__in=distributed_buyers).exists()
 
     def get_allocated_quantity(self):
         """Returns the total allocated quantity in product unit.
@@ -324,6 +491,9 @@ class DeliveryOrder(models.Model):
         Returns:
             quantity (Decimal): the total allocated quantity
         """
+        if hasattr(self, 'total_allocated_quantity'):
+            return round(self.total_allocated_quantity, 4)
+
         quantity = Decimal('0')
         for allocation in self.allocations.all():
             quantity += allocation.get_total_quantity()
@@ -335,6 +505,9 @@ class DeliveryOrder(models.Model):
         Returns:
             quantity (Decimal): the total distributed quantity
         """
+        if hasattr(self, 'total_distributed_quantity'):
+            return round(self.total_distributed_quantity, 4)
+
         quantity = Decimal('0')
         for distribution in self.distributions.all():
             quantity += distribution.get_total_quantity()
@@ -347,6 +520,9 @@ class DeliveryOrder(models.Model):
         Returns:
             quantity (Decimal): quantity shortage between allocated & delivered
         """
+        if hasattr(self, 'total_distributed_shortage'):
+            return round(self.total_distributed_shortage, 4)
+
         quantity = Decimal('0')
         for distribution in self.distributions.all():
             quantity += distribution.get_total_shortage()
@@ -358,9 +534,7 @@ class DeliveryOrder(models.Model):
         Returns:
             amount (Decimal): the total allocated amount in USD
         """
-        amount = Decimal('0')
-        for allocation in self.allocations.all():
-            amount += allocation.get_amount()
+        amount = self.get_allocated_quantity() * self.batch.rate
         return round(amount, 4)
 
     def get_allocated_advance(self):
@@ -385,9 +559,7 @@ class DeliveryOrder(models.Model):
         Returns:
             amount (Decimal): the total delivered amount in USD
         """
-        amount = Decimal('0')
-        for distribution in self.distributions.all():
-            amount += distribution.get_amount()
+        amount = self.get_distributed_quantity() * self.batch.rate
         return round(amount, 4)
 
 
@@ -415,10 +587,18 @@ class Allocation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = AllocationQuerySet.as_manager()
+
     class Meta:
         default_related_name = 'allocations'
         ordering = ('delivery_order', 'created_at', )
         unique_together = ('delivery_order', 'buyer')
+        indexes = [
+            models.Index(
+                fields=['delivery_order', 'created_at'],
+                name='allocation_order_created_idx'
+            ),
+        ]
         verbose_name = 'Delivery Order Allocation'
         verbose_name_plural = 'Delivery Order Allocations'
 
@@ -431,6 +611,9 @@ class Allocation(models.Model):
         Returns:
             quantity (Decimal): total allocated quantities of the unions
         """
+        if hasattr(self, 'total_quantity'):
+            return round(self.total_quantity, 4)
+
         union_allocations = self.union_allocations.all()
         quantity = reduce(
             lambda total, union: total + union.quantity,
@@ -504,10 +687,18 @@ class Distribution(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = DistributionQuerySet.as_manager()
+
     class Meta:
         default_related_name = 'distributions'
         ordering = ('delivery_order', 'created_at')
         unique_together = ('delivery_order', 'buyer')
+        indexes = [
+            models.Index(
+                fields=['delivery_order', 'created_at'],
+                name='distribution_order_created_idx'
+            ),
+        ]
         verbose_name = 'Delivery Order Distribution'
         verbose_name_plural = 'Delivery Order Distributions'
 
@@ -520,6 +711,9 @@ class Distribution(models.Model):
         Returns:
             quantity (Decimal): received quantity + shortage + over
         """
+        if hasattr(self, 'total_quantity'):
+            return round(self.total_quantity, 4)
+
         union_distributions = self.union_distributions.all()
         quantity = reduce(
             lambda total, union: total + union.get_total_quantity(),
@@ -534,6 +728,9 @@ class Distribution(models.Model):
         Returns:
             shortage quantity (Decimal): received shortage + over
         """
+        if hasattr(self, 'total_shortage'):
+            return round(self.total_shortage, 4)
+
         union_distributions = self.union_distributions.all()
         quantity = reduce(
             lambda total, union: total + union.get_total_shortage(),
@@ -619,3 +816,80 @@ class UnionDistribution(models.Model):
             shortage quantity (Decimal): received shortage + over
         """
         return round(self.shortage + self.over, 4)
+
+
+class BaseTotals(models.Model):
+    """Abstract base class for the materialized totals tables."""
+    TOTAL_FIELDS = (
+        'allocated_quantity', 'allocated_amount', 'advance_amount',
+        'retention_amount', 'distributed_quantity', 'distributed_shortage',
+        'distributed_amount'
+    )
+
+    allocated_quantity = models.DecimalField(
+        max_digits=20, decimal_places=4, default=0
+    )
+    allocated_amount = models.DecimalField(
+        max_digits=24, decimal_places=4, default=0
+    )
+    advance_amount = models.DecimalField(
+        max_digits=24, decimal_places=4, default=0
+    )
+    retention_amount = models.DecimalField(
+        max_digits=24, decimal_places=4, default=0
+    )
+    distributed_quantity = models.DecimalField(
+        max_digits=20, decimal_places=4, default=0
+    )
+    distributed_shortage = models.DecimalField(
+        max_digits=20, decimal_places=4, default=0
+    )
+    distributed_amount = models.DecimalField(
+        max_digits=24, decimal_places=4, default=0
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+    def get_values(self):
+        """Returns the stored totals keyed by field name.
+
+        Returns:
+            totals (dict): stored total values
+        """
+        return {field: getattr(self, field) for field in self.TOTAL_FIELDS}
+
+
+class BatchTotals(BaseTotals):
+    """Materialized allocation & distribution totals of a batch."""
+    batch = models.OneToOneField(
+        Batch,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='totals'
+    )
+
+    class Meta:
+        verbose_name = 'Batch Totals'
+        verbose_name_plural = 'Batch Totals'
+
+    def __str__(self):
+        return f'{self.batch} totals'
+
+
+class DeliveryOrderTotals(BaseTotals):
+    """Materialized allocation & distribution totals of a delivery order."""
+    delivery_order = models.OneToOneField(
+        DeliveryOrder,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='totals'
+    )
+
+    class Meta:
+        verbose_name = 'Delivery Order Totals'
+        verbose_name_plural = 'Delivery Order Totals'
+
+    def __str__(self):
+        return f'{self.delivery_order} totals'
@@ -0,0 +1,34 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from shared.cache import bump_version
+
+from .models import Batch, BatchTotals, DeliveryOrder, DeliveryOrderTotals, \
+    Port
+
+
+# Version of the cached fragments showing the port names
+PORTS_NAMESPACE = 'orders:ports'
+
+
+@receiver(post_save, sender=Port)
+@receiver(post_delete, sender=Port)
+def invalidate_ports(**kwargs):
+    """Invalidates the cached fragments when a port name may have changed."""
+    bump_version(PORTS_NAMESPACE)
+
+
+@receiver(post_save, sender=Batch)
+def create_batch_totals(sender, instance, created, raw, **kwargs):
+    """Creates the zeroed totals of a new batch."""
+    if created and not raw:
+        instance.totals = BatchTotals.objects.create(batch=instance)
+
+
+@receiver(post_save, sender=DeliveryOrder)
+def create_delivery_order_totals(sender, instance, created, raw, **kwargs):
+    """Creates the zeroed totals of a new delivery order."""
+    if created and not raw:
+        instance.totals = DeliveryOrderTotals.objects.create(
+            delivery_order=instance
+        )
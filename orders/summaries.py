@@ -0,0 +1,137 @@
+"""Precomputed, template-ready summaries of the batch tree."""
+from django.db.models import Prefetch
+
+from .models import DeliveryOrder, Allocation, Distribution
+
+
+class Summary:
+    """Wraps a model instance together with its precomputed values.
+
+    Attribute lookups that are not precomputed fall back to the wrapped
+    instance, so templates can use a summary in place of the model object.
+    """
+
+    def __init__(self, instance, **values):
+        self.object = instance
+        self.__dict__.update(values)
+
+    def __getattr__(self, name):
+        return getattr(self.object, name)
+
+
+def prefetch_batch_tree(queryset):
+    """Returns `queryset` loading the whole batch tree in a fixed number
+    of queries.
+
+    Args:
+        queryset (QuerySet): a `Batch` queryset
+
+    Returns:
+        queryset (QuerySet): the batch queryset with related prefetches
+    """
+    delivery_orders = DeliveryOrder.objects.with_completeness().select_related(
+        'port', 'totals'
+    )
+    allocations = Allocation.objects.select_related('buyer')
+    distributions = Distribution.objects.select_related('buyer')
+    return queryset.select_related(
+        'product__unit', 'supplier', 'totals'
+    ).prefetch_related(
+        Prefetch('delivery_orders', queryset=delivery_orders),
+        Prefetch('delivery_orders__allocations', queryset=allocations),
+        'delivery_orders__allocations__union_allocations',
+        Prefetch('delivery_orders__distributions', queryset=distributions),
+        'delivery_orders__distributions__union_distributions'
+    )
+
+
+def get_percentage(quantity, total):
+    """Returns `quantity` as a percentage of `total`."""
+    if total > 0:
+        return round((quantity / total) * 100, 2)
+    return 0
+
+
+def summarize_batch_progress(batch):
+    """Returns the allocation & distribution progress of a batch.
+
+    Args:
+        batch (Batch): batch annotated by `BatchQuerySet.with_totals`
+
+    Returns:
+        summary (Summary): the batch summary, with the allocated & distributed
+            percentages of the batch quantity
+    """
+    allocated_quantity = batch.get_allocated_quantity()
+    distributed_quantity = batch.get_distributed_quantity()
+    return Summary(
+        batch,
+        allocated_quantity=allocated_quantity,
+        allocated_percentage=get_percentage(
+            allocated_quantity, batch.quantity
+        ),
+        allocated_amount=batch.get_allocated_amount(),
+        distributed_quantity=distributed_quantity,
+        distributed_percentage=get_percentage(
+            distributed_quantity, batch.quantity
+        ),
+        distributed_shortage=batch.get_distributed_shortage()
+    )
+
+
+def summarize_delivery_order(delivery_order):
+    """Returns the precomputed summary of a prefetched delivery order.
+
+    Args:
+        delivery_order (DeliveryOrder): order loaded by `prefetch_batch_tree`
+
+    Returns:
+        summary (Summary): the delivery order summary
+    """
+    allocation_rows = [
+        Summary(
+            allocation,
+            quantity=allocation.get_total_quantity(),
+            amount=allocation.get_amount()
+        )
+        for allocation in delivery_order.allocations.all()
+    ]
+    allocated_quantity = sum(row.quantity for row in allocation_rows)
+    for row in allocation_rows:
+        row.percentage = get_percentage(row.quantity, allocated_quantity)
+
+    distribution_rows = [
+        Summary(
+            distribution,
+            quantity=distribution.get_total_quantity(),
+            shortage=distribution.get_total_shortage(),
+            amount=distribution.get_amount()
+        )
+        for distribution in delivery_order.distributions.all()
+    ]
+    distributed_quantity = sum(row.quantity for row in distribution_rows)
+    for row in distribution_rows:
+        row.percentage = get_percentage(row.quantity, distributed_quantity)
+
+    return Summary(
+        delivery_order,
+        allocation_rows=allocation_rows,
+        distribution_rows=distribution_rows,
+        is_fully_allocated=delivery_order.is_fully_allocated(),
+        is_fully_distributed=delivery_order.is_fully_distributed()
+    )
+
+
+def summarize_batch(batch):
+    """Returns the summaries of the delivery orders of a prefetched batch.
+
+    Args:
+        batch (Batch): batch loaded by `prefetch_batch_tree`
+
+    Returns:
+        summaries (list<Summary>): the delivery order summaries
+    """
+    return [
+        summarize_delivery_order(delivery_order)
+        for delivery_order in batch.delivery_orders.all()
+    ]
@@ -0,0 +1,77 @@
+import os
+import uuid
+
+from celery import shared_task
+from celery.result import AsyncResult
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+
+from orders.letters.allocationletter import AllocationLetter
+from orders.models import DeliveryOrder
+
+
+# Seconds an in-flight letter job is reused by the later requests
+LETTER_JOB_TIMEOUT = 60 * 10
+
+
+def get_letter_job_key(name):
+    """Returns the cache key of the in-flight job generating letter `name`."""
+    return f'letters:job:{name}'
+
+
+@shared_task
+def generate_allocation_letter(delivery_order_pk):
+    """Generates & stores the allocation letter of a delivery order.
+
+    The letter is generated only if there is no stored letter for the current
+    version of the delivery order, and older versions are removed. The file
+    is replaced in a single step, so concurrent jobs store the same name.
+
+    Args:
+        delivery_order_pk (str): primary key of the delivery order
+
+    Returns:
+        name (str): storage file name of the letter
+    """
+    delivery_order = DeliveryOrder.objects.select_related(
+        'batch__product__category', 'batch__product__unit', 'batch__supplier',
+        'port'
+    ).get(pk=delivery_order_pk)
+    name = AllocationLetter.get_file_name(delivery_order)
+    if default_storage.exists(name):
+        return name
+
+    name = AllocationLetter(delivery_order).save(name)
+    directory, file_name = os.path.split(name)
+    # The names sort by version, newer letters of concurrent jobs are kept
+    for stale_name in default_storage.listdir(directory)[1]:
+        if stale_name < file_name and not stale_name.endswith('.tmp'):
+            default_storage.delete(f'{directory}/{stale_name}')
+    cache.delete(get_letter_job_key(name))
+    return name
+
+
+def start_allocation_letter(delivery_order_pk, name):
+    """Starts the job generating an allocation letter, unless one is running.
+
+    The job id is kept in the cache by letter name, so the requests made
+    while the letter is generated poll the same job.
+
+    Args:
+        delivery_order_pk (str): primary key of the delivery order
+        name (str): storage file name of the letter version
+
+    Returns:
+        job (AsyncResult): the started or the in-flight job
+    """
+    key = get_letter_job_key(name)
+    job_id = str(uuid.uuid4())
+    if not cache.add(key, job_id, LETTER_JOB_TIMEOUT):
+        running_id = cache.get(key)
+        if running_id is not None and not AsyncResult(running_id).ready():
+            return AsyncResult(running_id)
+        cache.set(key, job_id, LETTER_JOB_TIMEOUT)
+    return generate_allocation_letter.apply_async(
+        (delivery_order_pk, ), task_id=job_id
+    )
@@ -0,0 +1,229 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.tests.factories import AdminUserFactory, GuestUserFactory, \
+    SupplierUserFactory
+from customers.tests.factories import CustomerFactory
+
+from .factories import BatchFactory, DeliveryOrderFactory, AllocationFactory, \
+    UnionAllocationFactory, DistributionFactory, UnionDistributionFactory
+
+
+User = get_user_model()
+
+
+class APITests(TestCase):
+    """
+    Tests for the read-only `api-v1` endpoints.
+    """
+    fixtures = ['roles', 'units', 'ports']
+
+    def setUp(self):
+        self.customers = CustomerFactory.create_batch(2)
+        self.batch = self.create_batch()
+        self.client.force_login(AdminUserFactory(status=User.ACTIVE))
+
+    def create_batch(self, orders=1):
+        """Creates a batch with allocated & distributed delivery orders."""
+        batch = BatchFactory(quantity=1000, rate=5)
+        for _ in range(orders):
+            delivery_order = DeliveryOrderFactory(batch=batch)
+            for customer in self.customers:
+                allocation = AllocationFactory(
+                    delivery_order=delivery_order,
+                    buyer=customer
+                )
+                UnionAllocationFactory(allocation=allocation, quantity=10)
+                UnionAllocationFactory(allocation=allocation, quantity=20)
+                distribution = DistributionFactory(
+                    delivery_order=delivery_order,
+                    buyer=customer
+                )
+                UnionDistributionFactory(
+                    distribution=distribution,
+                    quantity=25, shortage=3, over=2
+                )
+            delivery_order.touch()
+        return batch
+
+    def get(self, name, *args, **params):
+        return self.client.get(
+            reverse(f'api-v1:{name}', args=args),
+            params,
+            HTTP_ACCEPT='application/json'
+        )
+
+    def test_batch_rollups(self):
+        """
+        Ensure the batch rollups are computed from the delivery order tree.
+        """
+        response = self.get('batch-detail', self.batch.pk)
+        data = response.json()
+
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['allocated_quantity'], '60.0000')
+        self.assertEqual(data['allocated_amount'], '300.0000')
+        self.assertEqual(data['advance_amount'], '270.0000')
+        self.assertEqual(data['retention_amount'], '30.0000')
+        self.assertEqual(data['distributed_quantity'], '60.0000')
+        self.assertEqual(data['distributed_shortage'], '10.0000')
+        self.assertEqual(data['agreement_amount'], '5000.0000')
+
+    def test_amounts_match_the_models(self):
+        """
+        Ensure the amounts are rounded per delivery order, like the model
+        methods & the stored totals.
+        """
+        batch = BatchFactory(quantity=100, rate=1)
+        for _ in range(3):
+            delivery_order = DeliveryOrderFactory(batch=batch)
+            allocation = AllocationFactory(delivery_order=delivery_order)
+            UnionAllocationFactory(allocation=allocation, quantity='1.5')
+            delivery_order.touch()
+        batch_data = self.get('batch-detail', batch.pk).json()
+        order_data = self.get('deliveryorder-detail', delivery_order.pk).json()
+
+        # Assertions
+        self.assertEqual(batch_data['advance_amount'], '3.0000')
+        self.assertEqual(
+            batch_data['advance_amount'], f'{batch.get_advance_amount():.4f}'
+        )
+        self.assertEqual(order_data['advance_amount'], '1.0000')
+        self.assertEqual(order_data['allocated_amount'], '1.5000')
+
+    def test_endpoint_queries_do_not_grow_with_rows(self):
+        """
+        Ensure each list endpoint makes the same number of queries for a
+        few or many rows.
+        """
+        # Version aggregate, page & prefetched union rows queries
+        endpoints = {
+            'batch-list': 2,
+            'deliveryorder-list': 2,
+            'allocation-list': 3,
+            'distribution-list': 3,
+        }
+        for name, query_count in endpoints.items():
+            with self.subTest(endpoint=name):
+                with CaptureQueriesContext(connection) as queries:
+                    self.get(name)
+                small_count = len(queries.captured_queries)
+                self.create_batch(orders=3)
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.get(name)
+                large_count = len(queries.captured_queries)
+
+                # Assertions
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(small_count, large_count)
+                # Plus the session, user & role queries
+                self.assertEqual(large_count, query_count + 3)
+
+    def test_sparse_fieldsets(self):
+        """
+        Ensure only the requested fields are returned & the union rows are
+        not fetched when they are left out.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get('allocation-list', fields='id,quantity')
+            query_count = len(queries.captured_queries)
+        full_response = self.get('allocation-list')
+
+        # Assertions
+        self.assertEqual(
+            set(response.json()['results'][0]),
+            {'id', 'quantity'}
+        )
+        self.assertIn('unions', full_response.json()['results'][0])
+        self.assertEqual(query_count, 5)
+
+    def test_cursor_pagination(self):
+        """
+        Ensure the lists are paginated with cursors.
+        """
+        for _ in range(2):
+            self.create_batch()
+        first_page = self.get('batch-list', page_size=2).json()
+        second_page = self.client.get(
+            first_page['next'], HTTP_ACCEPT='application/json'
+        ).json()
+        invalid_response = self.get('batch-list', cursor='invalid')
+
+        # Assertions
+        self.assertEqual(len(first_page['results']), 2)
+        self.assertIsNone(first_page['previous'])
+        self.assertEqual(len(second_page['results']), 1)
+        self.assertIsNone(second_page['next'])
+        self.assertEqual(invalid_response.status_code, 404)
+
+    def test_conditional_get(self):
+        """
+        Ensure current copies get a 304 response, until a delivery order
+        of the batch is updated.
+        """
+        response = self.get('batch-detail', self.batch.pk)
+        with CaptureQueriesContext(connection) as queries:
+            not_modified_response = self.client.get(
+                reverse('api-v1:batch-detail', args=[self.batch.pk]),
+                HTTP_ACCEPT='application/json',
+                HTTP_IF_NONE_MATCH=response['ETag']
+            )
+            query_count = len(queries.captured_queries)
+        self.batch.delivery_orders.first().touch()
+        modified_response = self.client.get(
+            reverse('api-v1:batch-detail', args=[self.batch.pk]),
+            HTTP_ACCEPT='application/json',
+            HTTP_IF_NONE_MATCH=response['ETag']
+        )
+
+        # Assertions
+        self.assertTrue(response.has_header('Last-Modified'))
+        self.assertEqual(not_modified_response.status_code, 304)
+        # Session, user, role & version aggregate queries
+        self.assertEqual(query_count, 4)
+        self.assertEqual(modified_response.status_code, 200)
+        self.assertNotEqual(modified_response['ETag'], response['ETag'])
+
+    def test_filters(self):
+        """
+        Ensure the rows are filtered by their parent & invalid filters
+        are rejected.
+        """
+        self.create_batch()
+        delivery_order = self.batch.delivery_orders.first()
+        orders_response = self.get('deliveryorder-list', batch=self.batch.pk)
+        allocations_response = self.get(
+            'allocation-list', delivery_order=delivery_order.pk
+        )
+
+        # Assertions
+        self.assertEqual(
+            [row['id'] for row in orders_response.json()['results']],
+            [str(delivery_order.pk)]
+        )
+        self.assertEqual(len(allocations_response.json()['results']), 2)
+        self.assertEqual(self.get('batch-list', batch='x').status_code, 200)
+        self.assertEqual(
+            self.get('deliveryorder-list', batch='x').status_code, 400
+        )
+        self.assertEqual(self.get('batch-list', status='x').status_code, 400)
+
+    def test_access_roles(self):
+        """
+        Ensure supplier & anonymous users can't use the API.
+        """
+        self.client.force_login(SupplierUserFactory(status=User.ACTIVE))
+        supplier_response = self.get('batch-list')
+        self.client.force_login(GuestUserFactory(status=User.ACTIVE))
+        guest_response = self.get('batch-list')
+        self.client.logout()
+        anonymous_response = self.get('batch-list')
+
+        # Assertions
+        self.assertEqual(supplier_response.status_code, 403)
+        self.assertEqual(guest_response.status_code, 200)
+        self.assertEqual(anonymous_response.status_code, 403)
@@ -0,0 +1,57 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from orders.models import DeliveryOrderTotals
+from .factories import BatchFactory, DeliveryOrderFactory, AllocationFactory, \
+    UnionAllocationFactory
+
+
+class RebuildTotalsCommandTests(TestCase):
+    """
+    Tests for the `rebuild_totals` management command.
+    """
+    fixtures = ['units']
+
+    def setUp(self):
+        batch = BatchFactory(rate=5)
+        self.delivery_order = DeliveryOrderFactory(batch=batch)
+        allocation = AllocationFactory(delivery_order=self.delivery_order)
+        UnionAllocationFactory(allocation=allocation, quantity=10)
+        self.delivery_order.touch()
+
+    def test_command_without_drift(self):
+        """
+        Ensure the command reports no drift for up to date totals.
+        """
+        out = StringIO()
+        call_command('rebuild_totals', stdout=out)
+        self.assertIn('0 drifted totals found.', out.getvalue())
+
+    def test_command_fixes_drifted_totals(self):
+        """
+        Ensure the command reports & recomputes drifted totals.
+        """
+        DeliveryOrderTotals.objects.update(allocated_quantity=99)
+
+        out = StringIO()
+        call_command('rebuild_totals', stdout=out)
+        totals = DeliveryOrderTotals.objects.get()
+
+        self.assertIn('1 drifted totals found.', out.getvalue())
+        self.assertEqual(totals.allocated_quantity, Decimal('10'))
+
+    def test_command_with_dry_run(self):
+        """
+        Ensure the command does not save totals with the `--dry-run` option.
+        """
+        DeliveryOrderTotals.objects.update(allocated_quantity=99)
+
+        out = StringIO()
+        call_command('rebuild_totals', dry_run=True, stdout=out)
+        totals = DeliveryOrderTotals.objects.get()
+
+        self.assertIn('1 drifted totals found.', out.getvalue())
+        self.assertEqual(totals.allocated_quantity, Decimal('99'))
@@ -0,0 +1,156 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from customers.lookups import get_region_choices
+from customers.tests.factories import CustomerFactory, UnionFactory, \
+    LocationFactory
+from orders.forms import UnionAllocationFormSet, UnionDistributionFormSet
+
+from .factories import BatchFactory, DeliveryOrderFactory, AllocationFactory, \
+    UnionAllocationFactory, DistributionFactory
+
+
+class UnionFormSetTests(TestCase):
+    """
+    Tests for the batched saves of the union allocation & distribution
+    formsets.
+    """
+    fixtures = ['roles', 'units', 'ports']
+
+    def setUp(self):
+        self.customer = CustomerFactory()
+        self.union = UnionFactory(customer=self.customer)
+        self.location = LocationFactory(customer=self.customer)
+        self.delivery_order = DeliveryOrderFactory(batch=BatchFactory())
+        self.allocation = AllocationFactory(
+            delivery_order=self.delivery_order,
+            buyer=self.customer
+        )
+
+    def get_formset(self, formset_class, instance, rows):
+        """Returns a bound formset of the existing & new `rows`.
+
+        Args:
+            rows (list<dict>): the row values, with the `id` of the
+                existing rows first
+        """
+        initial_count = len([row for row in rows if 'id' in row])
+        data = {
+            'formset-TOTAL_FORMS': len(rows),
+            'formset-INITIAL_FORMS': initial_count,
+            'formset-MIN_NUM_FORMS': 1,
+            'formset-MAX_NUM_FORMS': 1000,
+        }
+        for index, row in enumerate(rows):
+            data.update({
+                f'formset-{index}-union': self.union.pk,
+                f'formset-{index}-location': self.location.pk,
+            })
+            data.update({
+                f'formset-{index}-{name}': value
+                for name, value in row.items()
+            })
+        return formset_class(
+            data,
+            instance=instance,
+            prefix='formset',
+            region_choices=get_region_choices(self.customer.pk)
+        )
+
+    def test_create_rows(self):
+        """
+        Ensure new rows are saved with a single insert in the form order.
+        """
+        formset = self.get_formset(
+            UnionAllocationFormSet,
+            self.allocation,
+            [{'quantity': str(n)} for n in range(1, 51)]
+        )
+        self.assertTrue(formset.is_valid())
+        with CaptureQueriesContext(connection) as queries:
+            objects = formset.save()
+            query_count = len(queries.captured_queries)
+
+        # Assertions
+        self.assertEqual(len(objects), 50)
+        self.assertLessEqual(query_count, 3)
+        self.assertEqual(
+            list(self.allocation.union_allocations.values_list(
+                'quantity', flat=True
+            )),
+            list(range(1, 51))
+        )
+
+    def test_update_rows(self):
+        """
+        Ensure changed, deleted & new rows are saved with a handful of
+        queries & the remaining rows keep their order.
+        """
+        union_allocations = [
+            UnionAllocationFactory(
+                allocation=self.allocation, union=self.union,
+                location=self.location, quantity=n
+            )
+            for n in range(50)
+        ]
+        rows = []
+        for n, union_allocation in enumerate(union_allocations):
+            row = {'id': union_allocation.pk, 'quantity': str(n)}
+            if n % 5 == 0:
+                row['DELETE'] = 'on'
+            elif n % 5 == 1:
+                row['quantity'] = str(n + 100)
+            rows.append(row)
+        rows += [{'quantity': '1000'}, {'quantity': '2000'}]
+        formset = self.get_formset(
+            UnionAllocationFormSet, self.allocation, rows
+        )
+        self.assertTrue(formset.is_valid())
+        with CaptureQueriesContext(connection) as queries:
+            formset.save()
+            query_count = len(queries.captured_queries)
+        quantities = [
+            n + 100 if n % 5 == 1 else n
+            for n in range(50) if n % 5
+        ] + [1000, 2000]
+
+        # Assertions
+        self.assertEqual(len(formset.deleted_objects), 10)
+        self.assertEqual(len(formset.changed_objects), 10)
+        self.assertEqual(len(formset.new_objects), 2)
+        self.assertLessEqual(query_count, 6)
+        self.assertEqual(
+            list(self.allocation.union_allocations.values_list(
+                'quantity', flat=True
+            )),
+            quantities
+        )
+
+    def test_create_distribution_rows(self):
+        """
+        Ensure the union distribution rows are saved with their shortage
+        & over quantities.
+        """
+        distribution = DistributionFactory(
+            delivery_order=self.delivery_order,
+            buyer=self.customer
+        )
+        formset = self.get_formset(
+            UnionDistributionFormSet,
+            distribution,
+            [
+                {'quantity': '10', 'shortage': '1', 'over': '0'},
+                {'quantity': '20', 'shortage': '0', 'over': '2'},
+            ]
+        )
+        self.assertTrue(formset.is_valid())
+        formset.save()
+
+        # Assertions
+        self.assertEqual(
+            list(distribution.union_distributions.values_list(
+                'quantity', 'shortage', 'over'
+            )),
+            [(10, 1, 0), (20, 0, 2)]
+        )
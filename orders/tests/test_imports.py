@@ -0,0 +1,179 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from accounts.tests.factories import AdminUserFactory
+from customers.tests.factories import CustomerFactory, UnionFactory, \
+    LocationFactory
+from orders.imports import UnionImporter
+from orders.models import Allocation, UnionAllocation, UnionDistribution
+
+from .factories import BatchFactory, DeliveryOrderFactory, AllocationFactory, \
+    UnionAllocationFactory
+
+
+HEADER = [
+    'Type', 'Bill of Loading', 'Region', 'Union', 'Location', 'Quantity',
+    'Shortage', 'Over'
+]
+
+
+class UnionImporterTests(TestCase):
+    """
+    Tests for the `UnionImporter` bulk import.
+    """
+    fixtures = ['roles', 'units']
+
+    def setUp(self):
+        self.batch = BatchFactory(rate=5)
+        self.delivery_order = DeliveryOrderFactory(
+            batch=self.batch,
+            bill_of_loading='BL-001'
+        )
+        self.customer = CustomerFactory(region='Amhara', code='AMH')
+        self.unions = [
+            UnionFactory(customer=self.customer, name=f'Union {n}')
+            for n in range(3)
+        ]
+        self.location = LocationFactory(customer=self.customer, name='Bahir Dar')
+        self.user = AdminUserFactory()
+
+    def get_rows(self, row_type='Allocation', count=3):
+        """Returns the rows of an import file."""
+        return [HEADER] + [
+            [row_type, 'BL-001', 'Amhara', f'Union {n % 3}', 'Bahir Dar',
+             f'{n + 1},000', '1', '2']
+            for n in range(count)
+        ]
+
+    def test_import_allocations(self):
+        """
+        Ensure the valid rows are saved as union allocations in their
+        order & the delivery order totals are refreshed.
+        """
+        importer = UnionImporter(self.batch, user=self.user)
+        valid = importer.validate([('', self.get_rows())])
+        count = importer.save()
+        allocation = Allocation.objects.get()
+        self.delivery_order.refresh_from_db()
+
+        # Assertions
+        self.assertTrue(valid)
+        self.assertEqual(count, 3)
+        self.assertEqual(allocation.buyer, self.customer)
+        self.assertEqual(allocation.created_by, self.user)
+        self.assertEqual(
+            list(allocation.union_allocations.values_list('quantity', flat=True)),
+            [1000, 2000, 3000]
+        )
+        self.assertEqual(
+            self.delivery_order.get_totals().allocated_quantity,
+            Decimal('6000')
+        )
+        self.assertEqual(self.delivery_order.updated_by, self.user)
+
+    def test_import_replaces_imported_regions(self):
+        """
+        Ensure the existing allocations of an imported region are replaced.
+        """
+        allocation = AllocationFactory(
+            delivery_order=self.delivery_order,
+            buyer=self.customer
+        )
+        UnionAllocationFactory(allocation=allocation, quantity=99)
+        importer = UnionImporter(self.batch, self.delivery_order, self.user)
+        importer.validate([('', [
+            ['Type', 'Region', 'Union', 'Location', 'Quantity'],
+            ['Allocation', 'amhara', 'union 1', 'BAHIR DAR', '10'],
+        ])])
+        importer.save()
+
+        # Assertions
+        self.assertFalse(Allocation.objects.filter(pk=allocation.pk).exists())
+        self.assertEqual(
+            list(UnionAllocation.objects.values_list('quantity', flat=True)),
+            [10]
+        )
+
+    def test_import_distributions_from_sheet_titles(self):
+        """
+        Ensure rows without a type column get the type of their sheet.
+        """
+        rows = [row[1:] for row in self.get_rows(count=2)]
+        importer = UnionImporter(self.batch, user=self.user)
+        importer.validate([('Distributions', rows)])
+        importer.save()
+
+        # Assertions
+        self.assertEqual(
+            list(UnionDistribution.objects.values_list(
+                'quantity', 'shortage', 'over'
+            )),
+            [(1000, 1, 2), (2000, 1, 2)]
+        )
+        self.assertFalse(UnionAllocation.objects.exists())
+
+    def test_invalid_rows(self):
+        """
+        Ensure all the invalid rows are reported & nothing is saved.
+        """
+        rows = self.get_rows(count=1) + [
+            ['Allocation', 'BL-999', 'Amhara', 'Union 1', 'Bahir Dar', '1'],
+            ['Allocation', 'BL-001', 'Oromia', 'Union 1', 'Bahir Dar', '1'],
+            ['Allocation', 'BL-001', 'Amhara', 'Union 9', 'Bahir Dar', '1'],
+            ['Allocation', 'BL-001', 'Amhara', 'Union 1', 'Gondar', '1'],
+            ['Allocation', 'BL-001', 'Amhara', 'Union 1', 'Bahir Dar', 'ten'],
+            ['Allocation', 'BL-001', 'Amhara', 'Union 1', 'Bahir Dar', '-1'],
+            ['Transfer', 'BL-001', 'Amhara', 'Union 1', 'Bahir Dar', '1'],
+        ]
+        importer = UnionImporter(self.batch, user=self.user)
+        valid = importer.validate([('', rows)])
+
+        # Assertions
+        self.assertFalse(valid)
+        self.assertEqual(
+            [(error.row, error.message) for error in importer.errors],
+            [
+                (3, 'Unknown bill of loading "BL-999".'),
+                (4, 'Unknown region "Oromia".'),
+                (5, 'Unknown union "Union 9" in Amhara.'),
+                (6, 'Unknown location "Gondar" in Amhara.'),
+                (7, 'Invalid quantity "ten".'),
+                (8, 'The quantity can\'t be negative.'),
+                (9, 'Unknown type "Transfer".'),
+            ]
+        )
+
+    def test_missing_columns(self):
+        """
+        Ensure files without the required columns are rejected.
+        """
+        importer = UnionImporter(self.batch, user=self.user)
+        valid = importer.validate([('', [['Region', 'Union', 'Quantity']])])
+
+        # Assertions
+        self.assertFalse(valid)
+        self.assertEqual(
+            importer.errors[0].message,
+            'Missing column(s): location, bill of loading, type.'
+        )
+
+    def test_import_queries_do_not_grow_with_rows(self):
+        """
+        Ensure the rows are validated & saved without a query per row.
+        The first import creates the totals, the next ones replace the
+        imported allocations.
+        """
+        counts = []
+        for count in (3, 3, 300):
+            importer = UnionImporter(self.batch, user=self.user)
+            with CaptureQueriesContext(connection) as queries:
+                importer.validate([('', self.get_rows(count=count))])
+                importer.save()
+            counts.append(len(queries.captured_queries))
+
+        # Assertions
+        self.assertEqual(counts[1], counts[2])
+        self.assertEqual(UnionAllocation.objects.count(), 300)
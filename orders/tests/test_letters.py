@@ -0,0 +1,87 @@
+import io
+
+from docx import Document
+from django.test import TestCase
+
+from customers.models import Customer
+from orders.letters.allocationletter import AllocationLetter, \
+    AllocationLetterLayout
+from orders.models import Port
+
+from .factories import BatchFactory, DeliveryOrderFactory, AllocationFactory, \
+    UnionAllocationFactory
+
+
+class AllocationLetterTests(TestCase):
+    """
+    Tests for the template based `AllocationLetter` letter.
+    """
+    fixtures = ['units', 'ports', 'customers']
+
+    def setUp(self):
+        self.delivery_order = DeliveryOrderFactory(
+            batch=BatchFactory(rate=5),
+            port=Port.objects.first()
+        )
+        for code, quantity in (('AMH', 1250), ('TIG', 300), ('ORO', 75.5)):
+            allocation = AllocationFactory(
+                delivery_order=self.delivery_order,
+                buyer=Customer.objects.get(code=code)
+            )
+            UnionAllocationFactory(allocation=allocation, quantity=quantity)
+        self.delivery_order.touch()
+
+    def get_paragraphs(self, content):
+        """Returns the paragraph texts of the docx file `content`."""
+        document = Document(io.BytesIO(content))
+        return [paragraph.text for paragraph in document.paragraphs]
+
+    def test_letter_matches_layout(self):
+        """
+        Ensure the template letter has the same content as the letter
+        built with python-docx.
+        """
+        letter = AllocationLetter(self.delivery_order)
+        template_content = letter.generate(io.BytesIO()).getvalue()
+        layout = AllocationLetterLayout(
+            letter.get_context(), letter.get_sections()
+        )
+        layout_content = layout.generate(io.BytesIO()).getvalue()
+        paragraphs = self.get_paragraphs(template_content)
+        text = '\n'.join(paragraphs)
+
+        # Assertions
+        self.assertEqual(paragraphs, self.get_paragraphs(layout_content))
+        self.assertNotIn('{{', text)
+        self.assertIn('1,625.50', text)
+        self.assertIn('Amhara Region Agricultural Bureau account', text)
+        self.assertIn(
+            f'bank account no. {AllocationLetter.BANK_ACCOUNT}', text
+        )
+        self.assertEqual(
+            sum('for the value of' in p for p in paragraphs), 3
+        )
+
+    def test_letter_without_tig_allocation(self):
+        """
+        Ensure the EABC customer is only looked up for TIG allocations.
+        """
+        self.delivery_order.allocations.filter(buyer__code='TIG').delete()
+        letter = AllocationLetter(self.delivery_order)
+        letter.get_context()
+
+        # Assertions
+        with self.assertNumQueries(1):
+            sections = letter.get_sections()
+        self.assertEqual(len(sections['allocations']), 2)
+
+    def test_template_is_built_once(self):
+        """
+        Ensure the docx template is shared by all the letters.
+        """
+        AllocationLetter(self.delivery_order).generate(io.BytesIO())
+        template = AllocationLetter.get_template()
+        AllocationLetter(self.delivery_order).generate(io.BytesIO())
+
+        # Assertions
+        self.assertIs(AllocationLetter.get_template(), template)
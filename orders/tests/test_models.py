@@ -1,9 +1,15 @@
 from decimal import Decimal
+from importlib import import_module
 
+from django.apps import apps
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from customers.tests.factories import CustomerFactory
 from purchases.tests.factories import ProductFactory
+from orders.models import Batch, BatchTotals, DeliveryOrder, \
+    DeliveryOrderTotals
 from .factories import BatchFactory, DeliveryOrderFactory, AllocationFactory, \
     UnionAllocationFactory, DistributionFactory, UnionDistributionFactory
 
@@ -145,6 +151,122 @@ class BatchModelTests(TestCase):
         expected_amount = Decimal('7200.0000')
         self.assertEqual(self.batch.get_distributed_amount(), expected_amount)
 
+    def test_with_totals_queryset_method(self):
+        """
+        Ensure `with_totals` annotated batches return the same totals as
+        the per-instance model methods using a single query.
+        """
+        self.batch.refresh_totals()
+        with self.assertNumQueries(1):
+            batch = Batch.objects.with_totals().get(pk=self.batch.pk)
+            self.assertEqual(batch.get_allocated_quantity(), Decimal('360'))
+            self.assertEqual(batch.get_allocated_amount(), Decimal('18000'))
+            self.assertEqual(batch.get_advance_amount(), Decimal('16200'))
+            self.assertEqual(batch.get_retention_amount(), Decimal('1800'))
+            self.assertEqual(batch.get_distributed_quantity(), Decimal('144'))
+            self.assertEqual(batch.get_distributed_shortage(), Decimal('24'))
+            self.assertEqual(batch.get_distributed_amount(), Decimal('7200'))
+
+    def test_amounts_are_rounded_per_delivery_order(self):
+        """
+        Ensure the plain, annotated & stored batch amounts add up the
+        rounded amounts of each delivery order.
+        """
+        batch = BatchFactory(quantity=100, rate=1)
+        for _ in range(3):
+            allocation = AllocationFactory(
+                delivery_order=DeliveryOrderFactory(batch=batch)
+            )
+            UnionAllocationFactory(allocation=allocation, quantity='1.5')
+        totals = batch.refresh_totals()
+        annotated_batch = Batch.objects.with_totals().get(pk=batch.pk)
+
+        # Assertions
+        for advance_amount in (
+                batch.get_advance_amount(),
+                annotated_batch.get_advance_amount(),
+                totals.advance_amount):
+            self.assertEqual(advance_amount, Decimal('3'))
+        self.assertEqual(
+            annotated_batch.get_retention_amount(),
+            batch.get_retention_amount()
+        )
+
+    def test_with_totals_queryset_method_without_stored_totals(self):
+        """
+        Ensure annotated batches without a totals row compute the amounts
+        from the delivery orders without storing them.
+        """
+        BatchTotals.objects.all().delete()
+        batch = Batch.objects.with_totals().get(pk=self.batch.pk)
+        with CaptureQueriesContext(connection) as queries:
+            advance_amount = batch.get_advance_amount()
+
+        # Assertions
+        self.assertEqual(advance_amount, Decimal('16200'))
+        self.assertFalse(any(
+            query['sql'].lstrip().upper().startswith(('INSERT', 'UPDATE'))
+            for query in queries.captured_queries
+        ))
+        self.assertFalse(BatchTotals.objects.exists())
+
+    def test_delivery_order_with_totals_queryset_method(self):
+        """
+        Ensure `with_totals` annotated delivery orders return the same totals
+        as the per-instance model methods using a single query.
+        """
+        expected = [
+            (order.get_allocated_quantity(), order.get_allocated_amount(),
+             order.get_distributed_quantity(), order.get_distributed_shortage(),
+             order.get_distributed_amount())
+            for order in self.batch.delivery_orders.all()
+        ]
+        with self.assertNumQueries(1):
+            delivery_orders = self.batch.delivery_orders.with_totals()
+            delivery_orders = delivery_orders.select_related('batch')
+            totals = [
+                (order.get_allocated_quantity(), order.get_allocated_amount(),
+                 order.get_distributed_quantity(),
+                 order.get_distributed_shortage(),
+                 order.get_distributed_amount())
+                for order in delivery_orders
+            ]
+        self.assertEqual(totals, expected)
+
+    def test_refresh_totals_method(self):
+        """
+        Ensure `refresh_totals` stores the batch totals of all delivery orders.
+        """
+        totals = self.batch.refresh_totals()
+
+        self.assertEqual(totals.allocated_quantity, Decimal('360'))
+        self.assertEqual(totals.allocated_amount, Decimal('18000'))
+        self.assertEqual(totals.advance_amount, Decimal('16200'))
+        self.assertEqual(totals.retention_amount, Decimal('1800'))
+        self.assertEqual(totals.distributed_quantity, Decimal('144'))
+        self.assertEqual(totals.distributed_shortage, Decimal('24'))
+        self.assertEqual(totals.distributed_amount, Decimal('7200'))
+
+    def test_refresh_totals_method_with_cascade(self):
+        """
+        Ensure `refresh_totals` with `cascade` also stores the totals of
+        each delivery order, e.g. after the batch `rate` changes.
+        """
+        self.batch.get_totals()
+        self.batch.rate = 100
+        self.batch.save()
+        totals = self.batch.refresh_totals(cascade=True)
+
+        self.assertEqual(totals.allocated_amount, Decimal('36000'))
+        self.assertEqual(
+            sorted(
+                DeliveryOrderTotals.objects.values_list(
+                    'allocated_amount', flat=True
+                )
+            ),
+            [Decimal('10000'), Decimal('26000')]
+        )
+
 
 class DeliveryOrderTests(TestCase):
     """
@@ -161,6 +283,95 @@ class DeliveryOrderTests(TestCase):
         self.customer_2 = CustomerFactory()
         self.customer_3 = CustomerFactory()
 
+    def test_touch_method_refreshes_totals(self):
+        """
+        Ensure `touch` method stores the delivery order & batch totals.
+        """
+        allocation_1 = AllocationFactory(delivery_order=self.delivery_order)
+        UnionAllocationFactory(allocation=allocation_1, quantity=10)
+        UnionAllocationFactory(allocation=allocation_1, quantity=20)
+        self.delivery_order.touch()
+
+        totals = DeliveryOrderTotals.objects.get(
+            delivery_order=self.delivery_order
+        )
+        self.assertEqual(totals.allocated_quantity, Decimal('30'))
+        self.assertEqual(totals.allocated_amount, Decimal('150'))
+        self.assertEqual(
+            self.delivery_order.batch.totals.allocated_quantity,
+            Decimal('30')
+        )
+
+    def test_new_delivery_order_has_zeroed_totals(self):
+        """
+        Ensure the totals of a new delivery order & batch are stored.
+        """
+        # Assertions
+        self.assertEqual(
+            DeliveryOrderTotals.objects.get(
+                delivery_order=self.delivery_order
+            ).allocated_quantity,
+            Decimal('0')
+        )
+        self.assertTrue(
+            BatchTotals.objects.filter(batch=self.delivery_order.batch).exists()
+        )
+
+    def test_get_totals_method_computes_missing_totals(self):
+        """
+        Ensure `get_totals` method computes the missing totals without
+        storing them.
+        """
+        allocation_1 = AllocationFactory(delivery_order=self.delivery_order)
+        UnionAllocationFactory(allocation=allocation_1, quantity=10)
+        DeliveryOrderTotals.objects.all().delete()
+        BatchTotals.objects.all().delete()
+        delivery_order = DeliveryOrder.objects.get(pk=self.delivery_order.pk)
+        batch = Batch.objects.get(pk=self.delivery_order.batch.pk)
+
+        with CaptureQueriesContext(connection) as queries:
+            order_totals = delivery_order.get_totals()
+            batch_totals = batch.get_totals()
+
+        # Assertions
+        self.assertEqual(order_totals.allocated_quantity, Decimal('10'))
+        self.assertEqual(batch_totals.allocated_amount, Decimal('50'))
+        self.assertFalse(any(
+            query['sql'].lstrip().upper().startswith(('INSERT', 'UPDATE'))
+            for query in queries.captured_queries
+        ))
+        self.assertFalse(DeliveryOrderTotals.objects.exists())
+        self.assertFalse(BatchTotals.objects.exists())
+
+    def test_backfill_totals_migration(self):
+        """
+        Ensure the backfill migration stores the missing totals only.
+        """
+        allocation_1 = AllocationFactory(delivery_order=self.delivery_order)
+        UnionAllocationFactory(allocation=allocation_1, quantity='1.5')
+        DeliveryOrderTotals.objects.all().delete()
+        BatchTotals.objects.all().delete()
+        BatchFactory()
+        backfill_totals = import_module(
+            'orders.migrations.0020_backfill_totals'
+        ).backfill_totals
+        backfill_totals(apps, None)
+        backfill_totals(apps, None)
+
+        # Assertions
+        totals = DeliveryOrderTotals.objects.get()
+        self.assertEqual(
+            totals.get_values(),
+            self.delivery_order.compute_totals()
+        )
+        self.assertEqual(
+            BatchTotals.objects.get(
+                batch=self.delivery_order.batch
+            ).get_values(),
+            self.delivery_order.batch.compute_totals()
+        )
+        self.assertEqual(BatchTotals.objects.count(), 2)
+
     def test_is_fully_allocated_method_no_allocation(self):
         """
         Ensure `is_fully_allocated` method returns `False` when a
@@ -236,6 +447,50 @@ class DeliveryOrderTests(TestCase):
         )
         self.assertTrue(self.delivery_order.is_fully_distributed())
 
+    def test_is_fully_allocated_method_makes_a_single_query(self):
+        """
+        Ensure `is_fully_allocated` method checks all the customers with
+        a single query.
+        """
+        for customer in (self.customer_1, self.customer_2):
+            AllocationFactory(
+                delivery_order=self.delivery_order,
+                buyer=customer
+            )
+        with self.assertNumQueries(1):
+            self.assertFalse(self.delivery_order.is_fully_allocated())
+
+    def test_with_completeness_queryset_method(self):
+        """
+        Ensure `with_completeness` annotates the fully allocated &
+        distributed orders, which `incomplete` leaves out.
+        """
+        complete_order = DeliveryOrderFactory(batch=self.delivery_order.batch)
+        for customer in (self.customer_1, self.customer_2, self.customer_3):
+            AllocationFactory(delivery_order=complete_order, buyer=customer)
+            DistributionFactory(delivery_order=complete_order, buyer=customer)
+            AllocationFactory(
+                delivery_order=self.delivery_order,
+                buyer=customer
+            )
+        orders = DeliveryOrder.objects.with_completeness()
+        with self.assertNumQueries(1):
+            completeness = {
+                order.pk: (order.is_fully_allocated(),
+                           order.is_fully_distributed())
+                for order in orders
+            }
+
+        # Assertions
+        self.assertEqual(completeness, {
+            complete_order.pk: (True, True),
+            self.delivery_order.pk: (True, False)
+        })
+        self.assertEqual(
+            list(DeliveryOrder.objects.incomplete()),
+            [self.delivery_order]
+        )
+
     def test_get_allocated_quantity_method(self):
         """
         Ensure `get_allocated_quantity` method returns the total allocated
@@ -380,6 +635,23 @@ class AllocationTests(TestCase):
         UnionAllocationFactory(allocation=allocation, quantity=20)
         self.assertEqual(allocation.get_total_quantity(), Decimal('30'))
 
+    def test_with_totals_queryset_method(self):
+        """
+        Ensure `with_totals` annotates the total union allocation quantity
+        without querying the union allocations per instance.
+        """
+        allocation = AllocationFactory(delivery_order=self.delivery_order)
+        UnionAllocationFactory(allocation=allocation, quantity=10)
+        UnionAllocationFactory(allocation=allocation, quantity=20)
+        AllocationFactory(delivery_order=self.delivery_order)
+
+        with self.assertNumQueries(1):
+            quantities = [
+                a.get_total_quantity()
+                for a in self.delivery_order.allocations.with_totals()
+            ]
+        self.assertEqual(quantities, [Decimal('30'), Decimal('0')])
+
     def test_get_percentage_method(self):
         """
         Ensure `get_percentage` method returns the percentage of the allocation
@@ -429,6 +701,26 @@ class DistributionTests(TestCase):
         UnionDistributionFactory(**kwargs_2)
         self.assertEqual(distribution.get_total_quantity(), Decimal('40'))
 
+    def test_with_totals_queryset_method(self):
+        """
+        Ensure `with_totals` annotates the total union distribution quantity
+        and shortage without querying the union distributions per instance.
+        """
+        distribution = DistributionFactory(delivery_order=self.delivery_order)
+        UnionDistributionFactory(
+            distribution=distribution,
+            quantity=10, shortage=1, over=2
+        )
+        UnionDistributionFactory(
+            distribution=distribution,
+            quantity=20, shortage=3, over=4
+        )
+
+        with self.assertNumQueries(1):
+            distribution = self.delivery_order.distributions.with_totals()[0]
+            self.assertEqual(distribution.get_total_quantity(), Decimal('40'))
+            self.assertEqual(distribution.get_total_shortage(), Decimal('10'))
+
     def test_get_percentage_method(self):
         """
         Ensure `get_percentage` method returns the percentage of the
@@ -0,0 +1,1200 @@
+import csv
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.shortcuts import get_object_or_404
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.tests.factories import AdminUserFactory, GuestUserFactory
+from customers.tests.factories import CustomerFactory, UnionFactory, \
+    LocationFactory
+from orders.letters.allocationletter import AllocationLetter
+from orders.models import Allocation, DeliveryOrder, Port, \
+    UnionAllocation, UnionDistribution
+from orders.tasks import generate_allocation_letter, get_letter_job_key, \
+    start_allocation_letter
+
+from .factories import BatchFactory, DeliveryOrderFactory, AllocationFactory, \
+    UnionAllocationFactory, DistributionFactory, UnionDistributionFactory
+
+
+User = get_user_model()
+
+XLSX_MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+
+XLSX_RELS_NS = (
+    'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+)
+
+
+class BatchDetailViewTests(TestCase):
+    """
+    Tests for the `BatchDetailView` view.
+    """
+    fixtures = ['roles', 'units', 'ports']
+
+    def setUp(self):
+        self.template = 'orders/batch_detail.html'
+        self.batch = BatchFactory(quantity=1000, rate=5)
+        self.url = reverse('orders:batch-detail', args=[self.batch.pk])
+        self.customers = CustomerFactory.create_batch(3)
+        self.admin = AdminUserFactory(status=User.ACTIVE)
+
+    def create_delivery_order(self):
+        """Creates a fully allocated & distributed delivery order."""
+        delivery_order = DeliveryOrderFactory(batch=self.batch)
+        for customer in self.customers:
+            allocation = AllocationFactory(
+                delivery_order=delivery_order,
+                buyer=customer
+            )
+            UnionAllocationFactory(allocation=allocation, quantity=10)
+            UnionAllocationFactory(allocation=allocation, quantity=20)
+
+            distribution = DistributionFactory(
+                delivery_order=delivery_order,
+                buyer=customer
+            )
+            UnionDistributionFactory(
+                distribution=distribution,
+                quantity=25, shortage=2, over=1
+            )
+        delivery_order.touch()
+        return delivery_order
+
+    def get_query_count(self):
+        """Returns the number of queries to render the batch detail page."""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_request_with_activated_user_with_admin_role(self):
+        """
+        Ensure activated users with assigned `ADMIN` role can access
+        the `BatchDetailView` view with precomputed delivery order figures.
+        """
+        self.create_delivery_order()
+        self.client.force_login(self.admin)
+        response = self.client.get(self.url)
+        delivery_order = response.context['delivery_order_list'][0]
+        allocation = delivery_order.allocation_rows[0]
+        distribution = delivery_order.distribution_rows[0]
+
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, self.template)
+        self.assertTrue(delivery_order.is_fully_allocated)
+        self.assertTrue(delivery_order.is_fully_distributed)
+        self.assertEqual(allocation.quantity, 30)
+        self.assertEqual(allocation.amount, 150)
+        self.assertEqual(allocation.percentage, Decimal('33.33'))
+        self.assertEqual(distribution.quantity, 28)
+        self.assertEqual(distribution.shortage, 3)
+
+    def test_query_count_is_constant(self):
+        """
+        Ensure the number of queries doesn't grow with the number
+        of delivery orders.
+        """
+        self.create_delivery_order()
+        self.client.force_login(self.admin)
+        query_count = self.get_query_count()
+
+        for _ in range(5):
+            self.create_delivery_order()
+
+        self.assertEqual(self.get_query_count(), query_count)
+
+    def test_current_copy_is_not_modified(self):
+        """
+        Ensure a browser with a current copy gets a `304 Not Modified`
+        response without rendering the page.
+        """
+        self.create_delivery_order()
+        self.client.force_login(self.admin)
+        response = self.client.get(self.url)
+        with CaptureQueriesContext(connection) as context:
+            not_modified_response = self.client.get(
+                self.url, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+            query_count = len(context.captured_queries)
+        if_modified_response = self.client.get(
+            self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+
+        # Assertions
+        self.assertIn('private', response['Cache-Control'])
+        self.assertEqual(not_modified_response.status_code, 304)
+        self.assertEqual(not_modified_response['ETag'], response['ETag'])
+        # Session, user, role & version aggregate queries
+        self.assertEqual(query_count, 4)
+        self.assertEqual(if_modified_response.status_code, 304)
+
+    def test_changed_batch_tree_is_modified(self):
+        """
+        Ensure the page is rendered again once a delivery order of the
+        batch is changed or added.
+        """
+        delivery_order = self.create_delivery_order()
+        self.client.force_login(self.admin)
+        etag = self.client.get(self.url)['ETag']
+        delivery_order.touch()
+        touched_response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        etag = touched_response['ETag']
+        DeliveryOrderFactory(batch=self.batch)
+        added_response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        # Assertions
+        self.assertEqual(touched_response.status_code, 200)
+        self.assertEqual(added_response.status_code, 200)
+
+    def test_version_depends_on_user_role(self):
+        """
+        Ensure the copy of a user with another role isn't reused.
+        """
+        self.client.force_login(self.admin)
+        etag = self.client.get(self.url)['ETag']
+        guest = GuestUserFactory(status=User.ACTIVE)
+        self.client.force_login(guest)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class BatchListViewTests(TestCase):
+    """
+    Tests for the `OpenBatchListView` & `ClosedBatchListView` views.
+    """
+    fixtures = ['roles', 'units', 'ports']
+
+    def setUp(self):
+        self.url = reverse('orders:open-batch-list')
+        self.customer = CustomerFactory()
+        self.client.force_login(GuestUserFactory(status=User.ACTIVE))
+
+    def create_batch(self):
+        """Creates a partly allocated & distributed batch."""
+        batch = BatchFactory(quantity=1000, rate=5)
+        delivery_order = DeliveryOrderFactory(batch=batch)
+        allocation = AllocationFactory(
+            delivery_order=delivery_order,
+            buyer=self.customer
+        )
+        UnionAllocationFactory(allocation=allocation, quantity=400)
+        distribution = DistributionFactory(
+            delivery_order=delivery_order,
+            buyer=self.customer
+        )
+        UnionDistributionFactory(
+            distribution=distribution,
+            quantity=240, shortage=8, over=2
+        )
+        delivery_order.touch()
+        return batch
+
+    def get_query_count(self):
+        """Returns the number of queries to render the batch list page."""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_batch_progress(self):
+        """
+        Ensure the batch rows show their allocation & distribution
+        progress.
+        """
+        self.create_batch()
+        response = self.client.get(self.url)
+        batch = response.context['object_list'][0]
+
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(batch.allocated_percentage, 40)
+        self.assertEqual(batch.allocated_amount, 2000)
+        self.assertEqual(batch.distributed_percentage, 25)
+        self.assertEqual(batch.distributed_shortage, 10)
+        self.assertContains(response, '2,000.00')
+
+    def test_query_count_is_constant(self):
+        """
+        Ensure the progress of the page rows is computed without a query
+        per batch.
+        """
+        self.create_batch()
+        query_count = self.get_query_count()
+
+        for _ in range(5):
+            self.create_batch()
+
+        self.assertEqual(self.get_query_count(), query_count)
+
+    def test_incomplete_delivery_orders_filter(self):
+        """
+        Ensure the `incomplete` filter only lists the batches with a
+        delivery order missing a region allocation or distribution.
+        """
+        complete_batch = self.create_batch()
+        incomplete_batch = self.create_batch()
+        customer = CustomerFactory()
+        delivery_order = complete_batch.delivery_orders.get()
+        AllocationFactory(delivery_order=delivery_order, buyer=customer)
+        DistributionFactory(delivery_order=delivery_order, buyer=customer)
+        response = self.client.get(self.url, {'incomplete': 1})
+
+        # Assertions
+        self.assertEqual(
+            [batch.pk for batch in response.context['object_list']],
+            [incomplete_batch.pk]
+        )
+
+
+class AllocationCreateViewTests(TestCase):
+    """
+    Tests for the `AllocationCreateView` view.
+    """
+    fixtures = ['roles', 'units', 'ports']
+
+    def setUp(self):
+        self.delivery_order = DeliveryOrderFactory(batch=BatchFactory())
+        self.url = reverse(
+            'orders:order-allocation-create', args=[self.delivery_order.pk]
+        )
+        self.allocated_customer, self.customer = CustomerFactory.create_batch(2)
+        AllocationFactory(
+            delivery_order=self.delivery_order,
+            buyer=self.allocated_customer
+        )
+        self.client.force_login(AdminUserFactory(status=User.ACTIVE))
+
+    def get_data(self, buyer):
+        """Returns the POST data of an allocation with a single union."""
+        return {
+            'buyer': buyer.pk,
+            'formset-TOTAL_FORMS': 1,
+            'formset-INITIAL_FORMS': 0,
+            'formset-MIN_NUM_FORMS': 1,
+            'formset-MAX_NUM_FORMS': 1000,
+            'formset-0-union': UnionFactory(customer=buyer).pk,
+            'formset-0-location': LocationFactory(customer=buyer).pk,
+            'formset-0-quantity': '100',
+        }
+
+    def test_buyer_choices(self):
+        """
+        Ensure only the regions without an allocation can be chosen.
+        """
+        response = self.client.get(self.url)
+
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            list(response.context['buyer_choices']), [self.customer]
+        )
+
+    def test_create_allocation(self):
+        """
+        Ensure a valid allocation is saved & the delivery order is only
+        fetched once.
+        """
+        data = self.get_data(self.customer)
+        with mock.patch(
+                'orders.mixins.get_object_or_404',
+                wraps=get_object_or_404) as get_delivery_order:
+            response = self.client.post(self.url, data)
+
+        # Assertions
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(self.delivery_order.allocations.filter(
+            buyer=self.customer
+        ).exists())
+        self.assertEqual(get_delivery_order.call_count, 1)
+
+    def test_allocated_buyer_is_rejected(self):
+        """
+        Ensure a region can't be allocated twice.
+        """
+        response = self.client.post(
+            self.url, self.get_data(self.allocated_customer)
+        )
+
+        # Assertions
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.delivery_order.allocations.count(), 1)
+
+
+    def test_region_choices(self):
+        """
+        Ensure the unions & locations of another region are rejected.
+        """
+        data = self.get_data(self.customer)
+        data['formset-0-union'] = UnionFactory(
+            customer=self.allocated_customer
+        ).pk
+        response = self.client.post(self.url, data)
+
+        # Assertions
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('union', response.context['formset'].errors[0])
+        self.assertEqual(
+            list(response.context['union_choices']),
+            list(self.customer.unions.all())
+        )
+
+    def test_validation_queries_do_not_grow_with_rows(self):
+        """
+        Ensure the union rows are validated against the choices of the
+        region without a query per row.
+        """
+        counts = []
+        for row_count in (1, 30):
+            data = self.get_data(self.customer)
+            data['formset-TOTAL_FORMS'] = row_count
+            for index in range(row_count):
+                data.update({
+                    f'formset-{index}-union': data['formset-0-union'],
+                    f'formset-{index}-location': data['formset-0-location'],
+                    f'formset-{index}-quantity': 'invalid',
+                })
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(self.url, data)
+                counts.append(len(queries.captured_queries))
+
+            # Assertions
+            self.assertEqual(response.status_code, 400)
+
+        # Assertions
+        self.assertEqual(counts[0], counts[1])
+
+@override_settings(DELIVERY_ORDER_PANE_TIMEOUT=60)
+class DeliveryOrderPaneCacheTests(TestCase):
+    """
+    Tests for the cached delivery order panes of the `BatchDetailView` view.
+    """
+    fixtures = ['roles', 'units', 'ports']
+
+    def setUp(self):
+        self.batch = BatchFactory(quantity=1000, rate=5)
+        self.delivery_order = DeliveryOrderFactory(
+            batch=self.batch, vessel='Old Star', port=Port.objects.first()
+        )
+        self.url = reverse('orders:batch-detail', args=[self.batch.pk])
+        self.client.force_login(AdminUserFactory(status=User.ACTIVE))
+        cache.clear()
+
+    def rename_vessel(self):
+        """Renames the vessel without touching the delivery order."""
+        DeliveryOrder.objects.filter(pk=self.delivery_order.pk).update(
+            vessel='New Star'
+        )
+
+    def test_unchanged_pane_is_cached(self):
+        """
+        Ensure the pane is served from the cache until the order changes.
+        """
+        self.client.get(self.url)
+        self.rename_vessel()
+        response = self.client.get(self.url)
+
+        # Assertions
+        self.assertContains(response, 'Old Star Vessel Summary')
+        self.assertNotContains(response, 'New Star Vessel Summary')
+
+    def test_touch_invalidates_pane(self):
+        """
+        Ensure touching the delivery order renders the pane again.
+        """
+        self.client.get(self.url)
+        self.rename_vessel()
+        DeliveryOrder.objects.get(pk=self.delivery_order.pk).touch()
+        response = self.client.get(self.url)
+
+        # Assertions
+        self.assertContains(response, 'New Star Vessel Summary')
+
+    def test_batch_rate_edit_invalidates_pane(self):
+        """
+        Ensure editing the batch (e.g. its rate) renders the pane again.
+        """
+        self.client.get(self.url)
+        self.rename_vessel()
+        self.batch.rate = 6
+        self.batch.save()
+        response = self.client.get(self.url)
+
+        # Assertions
+        self.assertContains(response, 'New Star Vessel Summary')
+
+    def test_port_edit_invalidates_pane(self):
+        """
+        Ensure editing a port (e.g. its name) renders the pane again.
+        """
+        self.client.get(self.url)
+        self.rename_vessel()
+        port = self.delivery_order.port
+        port.name = 'New Port'
+        port.save()
+        response = self.client.get(self.url)
+
+        # Assertions
+        self.assertContains(response, 'New Star Vessel Summary')
+        self.assertContains(response, 'New Port')
+
+    def test_customer_edit_invalidates_pane(self):
+        """
+        Ensure editing a customer (e.g. its name) renders the pane again.
+        """
+        self.client.get(self.url)
+        self.rename_vessel()
+        customer = CustomerFactory()
+        customer.name = 'New Buyer'
+        customer.save()
+        response = self.client.get(self.url)
+
+        # Assertions
+        self.assertContains(response, 'New Star Vessel Summary')
+
+    def test_pane_is_cached_per_role(self):
+        """
+        Ensure the cached pane of a role is not served to another role.
+        """
+        edit_url = reverse('orders:order-update', args=[self.delivery_order.pk])
+        admin_response = self.client.get(self.url)
+        self.client.force_login(GuestUserFactory(status=User.ACTIVE))
+        guest_response = self.client.get(self.url)
+
+        # Assertions
+        self.assertContains(admin_response, edit_url)
+        self.assertNotContains(guest_response, edit_url)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), MEDIA_X_ACCEL_REDIRECT='')
+class AllocationLetterViewTests(TestCase):
+    """
+    Tests for the `AllocationLetterView` view.
+    """
+    fixtures = ['roles', 'units', 'ports', 'customers']
+
+    def setUp(self):
+        self.delivery_order = DeliveryOrderFactory(
+            batch=BatchFactory(rate=5),
+            port=Port.objects.first()
+        )
+        allocation = AllocationFactory(delivery_order=self.delivery_order)
+        UnionAllocationFactory(allocation=allocation, quantity=10)
+        self.delivery_order.touch()
+        self.url = reverse(
+            'orders:order-allocation-letter', args=[self.delivery_order.pk]
+        )
+        self.client.force_login(AdminUserFactory(status=User.ACTIVE))
+
+    def tearDown(self):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+
+    def get_letter_name(self):
+        """Returns the stored letter name of the current delivery order."""
+        self.delivery_order.refresh_from_db()
+        return AllocationLetter.get_file_name(self.delivery_order)
+
+    def test_letter_is_generated_and_stored(self):
+        """
+        Ensure the letter is generated by the task & stored on the first
+        download.
+        """
+        response = self.client.get(self.url)
+
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response['Content-Disposition'],
+            'attachment; filename="allocation.docx"'
+        )
+        self.assertTrue(b''.join(response.streaming_content))
+        self.assertTrue(default_storage.exists(self.get_letter_name()))
+
+    def test_stored_letter_is_served(self):
+        """
+        Ensure repeated downloads serve the stored letter without
+        generating it again.
+        """
+        self.client.get(self.url)
+        with mock.patch(
+                'orders.views.allocations.start_allocation_letter') as start:
+            response = self.client.get(self.url)
+
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        start.assert_not_called()
+
+    def test_touched_delivery_order_regenerates_letter(self):
+        """
+        Ensure touching the delivery order invalidates the stored letter.
+        """
+        self.client.get(self.url)
+        old_name = self.get_letter_name()
+        self.delivery_order.touch()
+        self.client.get(self.url)
+        new_name = self.get_letter_name()
+
+        # Assertions
+        self.assertNotEqual(old_name, new_name)
+        self.assertFalse(default_storage.exists(old_name))
+        self.assertTrue(default_storage.exists(new_name))
+
+    @override_settings(MEDIA_X_ACCEL_REDIRECT='/protected-media/')
+    def test_letter_is_served_by_nginx(self):
+        """
+        Ensure the letter is sent through `X-Accel-Redirect` when enabled.
+        """
+        response = self.client.get(self.url)
+
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response['X-Accel-Redirect'],
+            f'/protected-media/{self.get_letter_name()}'
+        )
+        self.assertEqual(response.content, b'')
+
+    def test_pending_letter_renders_status_page(self):
+        """
+        Ensure a pending job renders the page polling the job status.
+        """
+        job = mock.Mock(id='job-id', **{
+            'ready.return_value': False,
+            'successful.return_value': False
+        })
+        with mock.patch(
+                'orders.views.allocations.start_allocation_letter',
+                return_value=job):
+            response = self.client.get(self.url)
+            ajax_response = self.client.get(
+                self.url, HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+            )
+        status_url = reverse(
+            'orders:order-allocation-letter-status',
+            args=[self.delivery_order.pk]
+        )
+
+        # Assertions
+        self.assertEqual(response.status_code, 202)
+        self.assertTemplateUsed(response, 'orders/letter_download.html')
+        self.assertEqual(response.context['status_url'], f'{status_url}?job=job-id')
+        self.assertEqual(ajax_response.status_code, 202)
+        self.assertEqual(ajax_response.json()['job'], 'job-id')
+
+    def test_failed_letter_renders_status_page(self):
+        """
+        Ensure a failed job renders the page polling the job status, which
+        reports the failure.
+        """
+        job = mock.Mock(id='job-id', state='FAILURE', **{
+            'ready.return_value': True,
+            'successful.return_value': False
+        })
+        with mock.patch(
+                'orders.views.allocations.start_allocation_letter',
+                return_value=job), \
+                mock.patch(
+                    'orders.views.allocations.AsyncResult', return_value=job):
+            response = self.client.get(self.url)
+            status_response = self.client.get(response.context['status_url'])
+
+        # Assertions
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(status_response.json(), {'status': 'FAILURE'})
+
+    def test_status_view_with_stored_letter(self):
+        """
+        Ensure the status view returns the download url of a stored letter.
+        """
+        self.client.get(self.url)
+        status_url = reverse(
+            'orders:order-allocation-letter-status',
+            args=[self.delivery_order.pk]
+        )
+        response = self.client.get(status_url)
+
+        # Assertions
+        self.assertEqual(
+            response.json(),
+            {'status': 'SUCCESS', 'download_url': self.url}
+        )
+
+    def test_in_flight_job_is_reused(self):
+        """
+        Ensure the requests made while the letter is generated poll the
+        same job instead of starting another one.
+        """
+        def get_job(job_id):
+            return mock.Mock(id=job_id, **{
+                'ready.return_value': False,
+                'successful.return_value': False
+            })
+
+        with mock.patch.object(
+                generate_allocation_letter, 'apply_async',
+                side_effect=lambda args, task_id: get_job(task_id)
+                ) as apply_async, \
+                mock.patch('orders.tasks.AsyncResult', side_effect=get_job):
+            first_response = self.client.get(
+                self.url, HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+            )
+            second_response = self.client.get(
+                self.url, HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+            )
+        cache.delete(get_letter_job_key(self.get_letter_name()))
+
+        # Assertions
+        self.assertEqual(apply_async.call_count, 1)
+        self.assertEqual(
+            first_response.json()['job'], second_response.json()['job']
+        )
+
+    def test_status_view_serves_job_letter(self):
+        """
+        Ensure the status view returns the letter stored by the job, even
+        if the delivery order was touched since.
+        """
+        self.client.get(self.url)
+        name = self.get_letter_name()
+        self.delivery_order.touch()
+        status_url = reverse(
+            'orders:order-allocation-letter-status',
+            args=[self.delivery_order.pk]
+        )
+        job = mock.Mock(result=name, **{'successful.return_value': True})
+        with mock.patch(
+                'orders.views.allocations.AsyncResult', return_value=job):
+            response = self.client.get(f'{status_url}?job=job-id')
+        download_url = response.json()['download_url']
+        with mock.patch(
+                'orders.views.allocations.start_allocation_letter') as start:
+            download_response = self.client.get(download_url)
+
+        # Assertions
+        self.assertEqual(
+            download_url, f'{self.url}?letter={os.path.basename(name)}'
+        )
+        self.assertEqual(download_response.status_code, 200)
+        start.assert_not_called()
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), MEDIA_X_ACCEL_REDIRECT='')
+class BatchLetterViewTests(TestCase):
+    """
+    Tests for the `BatchLetterView` view.
+    """
+    fixtures = ['roles', 'units', 'ports', 'customers']
+
+    def setUp(self):
+        self.batch = BatchFactory(rate=5, name='LOT 1')
+        self.delivery_orders = []
+        for vessel in ['Ocean Star', 'Sea Breeze']:
+            delivery_order = DeliveryOrderFactory(
+                batch=self.batch,
+                vessel=vessel,
+                port=Port.objects.first()
+            )
+            allocation = AllocationFactory(delivery_order=delivery_order)
+            UnionAllocationFactory(allocation=allocation, quantity=10)
+            delivery_order.touch()
+            self.delivery_orders.append(delivery_order)
+
+        # Delivery order without allocations
+        DeliveryOrderFactory(batch=self.batch)
+
+        self.url = reverse('orders:batch-letter', args=[self.batch.pk])
+        self.client.force_login(AdminUserFactory(status=User.ACTIVE))
+
+    def tearDown(self):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+
+    def get_archive(self, response):
+        """Returns the streamed zip archive of `response`."""
+        content = b''.join(response.streaming_content)
+        return zipfile.ZipFile(io.BytesIO(content))
+
+    def test_letters_are_streamed_as_zip(self):
+        """
+        Ensure the letters of all the allocated delivery orders are
+        streamed as a single zip file.
+        """
+        response = self.client.get(self.url)
+        archive = self.get_archive(response)
+
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        self.assertEqual(
+            response['Content-Disposition'],
+            'attachment; filename=lot-1-allocation-letters.zip'
+        )
+        self.assertEqual(
+            archive.namelist(),
+            ['01-ocean-star.docx', '02-sea-breeze.docx']
+        )
+        for delivery_order, name in zip(self.delivery_orders, archive.namelist()):
+            delivery_order.refresh_from_db()
+            letter_name = AllocationLetter.get_file_name(delivery_order)
+            with default_storage.open(letter_name) as f:
+                self.assertEqual(archive.read(name), f.read())
+
+    def test_stored_letters_are_reused(self):
+        """
+        Ensure only the letters which are not stored yet are generated.
+        """
+        self.client.get(self.url)
+        self.delivery_orders[1].touch()
+        with mock.patch(
+                'orders.views.batches.start_allocation_letter',
+                wraps=start_allocation_letter) as start:
+            response = self.client.get(self.url)
+            self.get_archive(response)
+
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        start.assert_called_once_with(
+            self.delivery_orders[1].pk,
+            AllocationLetter.get_file_name(self.delivery_orders[1])
+        )
+
+    def test_in_flight_jobs_are_reused(self):
+        """
+        Ensure repeated downloads while the letters are generated poll the
+        running jobs instead of starting new ones.
+        """
+        def get_job(job_id):
+            return mock.Mock(id=job_id, **{
+                'ready.return_value': False,
+                'successful.return_value': False
+            })
+
+        with mock.patch.object(
+                generate_allocation_letter, 'apply_async',
+                side_effect=lambda args, task_id: get_job(task_id)
+                ) as apply_async, \
+                mock.patch('orders.tasks.AsyncResult', side_effect=get_job), \
+                mock.patch('orders.views.batches.GroupResult') as group:
+            first_response = self.client.get(self.url)
+            second_response = self.client.get(self.url)
+        for delivery_order in self.delivery_orders:
+            delivery_order.refresh_from_db()
+            cache.delete(get_letter_job_key(
+                AllocationLetter.get_file_name(delivery_order)
+            ))
+        first_jobs, second_jobs = [
+            [job.id for job in call[0][1]] for call in group.call_args_list
+        ]
+
+        # Assertions
+        self.assertEqual(first_response.status_code, 202)
+        self.assertEqual(second_response.status_code, 202)
+        self.assertEqual(apply_async.call_count, 2)
+        self.assertEqual(first_jobs, second_jobs)
+
+    def test_letters_are_opened_before_streaming(self):
+        """
+        Ensure a letter removed after the response is returned (e.g. by a
+        newer version) is still streamed.
+        """
+        self.client.get(self.url)
+        response = self.client.get(self.url)
+        for delivery_order in self.delivery_orders:
+            delivery_order.refresh_from_db()
+            default_storage.delete(
+                AllocationLetter.get_file_name(delivery_order)
+            )
+        archive = self.get_archive(response)
+
+        # Assertions
+        self.assertEqual(
+            archive.namelist(),
+            ['01-ocean-star.docx', '02-sea-breeze.docx']
+        )
+        self.assertTrue(archive.read('01-ocean-star.docx'))
+
+    def test_batch_without_allocations(self):
+        """
+        Ensure batches without allocated delivery orders return 404.
+        """
+        batch = BatchFactory()
+        DeliveryOrderFactory(batch=batch)
+        url = reverse('orders:batch-letter', args=[batch.pk])
+
+        # Assertions
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_status_view_with_stored_letters(self):
+        """
+        Ensure the status view returns the download url once all the
+        letters are stored.
+        """
+        status_url = reverse('orders:batch-letter-status', args=[self.batch.pk])
+        pending_response = self.client.get(status_url)
+        self.client.get(self.url)
+        response = self.client.get(status_url)
+
+        # Assertions
+        self.assertEqual(pending_response.json(), {'status': 'PENDING'})
+        self.assertEqual(
+            response.json(),
+            {'status': 'SUCCESS', 'download_url': self.url}
+        )
+
+
+class ExportViewTests(TestCase):
+    """
+    Tests for the `BatchExportView` & `ExportView` views.
+    """
+    fixtures = ['roles', 'units', 'ports']
+
+    def setUp(self):
+        self.batch = BatchFactory(rate=5, name='LOT 1')
+        self.customers = CustomerFactory.create_batch(2)
+        self.delivery_order = self.create_delivery_order(
+            arrival_date=date(2021, 3, 10)
+        )
+        self.client.force_login(AdminUserFactory(status=User.ACTIVE))
+
+    def create_delivery_order(self, unions=2, **kwargs):
+        """Creates an allocated & distributed delivery order."""
+        delivery_order = DeliveryOrderFactory(batch=self.batch, **kwargs)
+        for customer in self.customers:
+            allocation = AllocationFactory(
+                delivery_order=delivery_order,
+                buyer=customer
+            )
+            distribution = DistributionFactory(
+                delivery_order=delivery_order,
+                buyer=customer
+            )
+            for _ in range(unions):
+                UnionAllocationFactory(allocation=allocation, quantity=10)
+                UnionDistributionFactory(
+                    distribution=distribution,
+                    quantity=8, shortage=1, over=1
+                )
+        return delivery_order
+
+    def get_csv_rows(self, response):
+        """Returns the rows of the streamed CSV file of `response`."""
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        return list(csv.reader(io.StringIO(content)))
+
+    def test_batch_csv_export(self):
+        """
+        Ensure the union allocations & distributions of a batch are
+        exported as CSV rows.
+        """
+        url = reverse('orders:batch-export', args=[self.batch.pk])
+        response = self.client.get(url, {'format': 'csv'})
+        rows = self.get_csv_rows(response)
+        allocation_rows = [row for row in rows if row[0] == 'Allocation']
+        distribution_rows = [row for row in rows if row[0] == 'Distribution']
+
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(
+            response['Content-Disposition'],
+            'attachment; filename=lot-1-allocations.csv'
+        )
+        self.assertEqual(rows[0][:2], ['Type', 'Batch'])
+        self.assertEqual(len(allocation_rows), 4)
+        self.assertEqual(len(distribution_rows), 4)
+        self.assertEqual(allocation_rows[0][5], '2021-03-10')
+        self.assertEqual(
+            [Decimal(value) for value in allocation_rows[0][9:]],
+            [10, 0, 0, 50, 45, 5]
+        )
+        self.assertEqual(
+            [Decimal(value) for value in distribution_rows[0][9:]],
+            [8, 1, 1, 50, 45, 5]
+        )
+
+    def test_batch_xlsx_export(self):
+        """
+        Ensure the batch export is an Excel workbook by default, with a
+        worksheet for the allocations & one for the distributions.
+        """
+        url = reverse('orders:batch-export', args=[self.batch.pk])
+        response = self.client.get(url)
+        content = b''.join(response.streaming_content)
+        archive = zipfile.ZipFile(io.BytesIO(content))
+        allocations = archive.read('xl/worksheets/sheet1.xml').decode()
+
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response['Content-Disposition'],
+            'attachment; filename=lot-1-allocations.xlsx'
+        )
+        self.assertIn('name="Distributions"', archive.read('xl/workbook.xml').decode())
+        self.assertEqual(allocations.count('<row>'), 5)
+        self.assertIn('<t>LOT 1</t>', allocations)
+
+    def test_batch_export_with_unknown_format(self):
+        """
+        Ensure unknown export formats return 404.
+        """
+        url = reverse('orders:batch-export', args=[self.batch.pk])
+        response = self.client.get(url, {'format': 'pdf'})
+
+        # Assertions
+        self.assertEqual(response.status_code, 404)
+
+    def test_export_queries_do_not_grow_with_rows(self):
+        """
+        Ensure the export reads the union rows without a query per row.
+        """
+        url = reverse('orders:batch-export', args=[self.batch.pk])
+        with CaptureQueriesContext(connection) as small_export:
+            b''.join(self.client.get(url).streaming_content)
+        small_count = len(small_export.captured_queries)
+        self.create_delivery_order(unions=5)
+        with CaptureQueriesContext(connection) as large_export:
+            b''.join(self.client.get(url).streaming_content)
+
+        # Assertions
+        self.assertEqual(len(large_export.captured_queries), small_count)
+
+    def test_date_range_export(self):
+        """
+        Ensure only the delivery orders arrived in the date range are
+        exported.
+        """
+        self.create_delivery_order(arrival_date=date(2021, 5, 1))
+        response = self.client.get(reverse('orders:export'), {
+            'start_date': '2021-03-01',
+            'end_date': '2021-03-31',
+            'format': 'csv'
+        })
+        rows = self.get_csv_rows(response)
+
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response['Content-Disposition'],
+            'attachment; filename=allocations-2021-03-01-2021-03-31.csv'
+        )
+        self.assertEqual(len(rows), 9)
+        self.assertEqual({row[5] for row in rows[1:]}, {'2021-03-10'})
+
+    def test_date_range_export_form(self):
+        """
+        Ensure the export form is displayed without query parameters and
+        invalid date ranges are rejected.
+        """
+        url = reverse('orders:export')
+        form_response = self.client.get(url)
+        invalid_response = self.client.get(url, {
+            'start_date': '2021-04-01',
+            'end_date': '2021-03-01',
+            'format': 'xlsx'
+        })
+
+        # Assertions
+        self.assertEqual(form_response.status_code, 200)
+        self.assertTemplateUsed(form_response, 'orders/modals/export_form.html')
+        self.assertEqual(invalid_response.status_code, 400)
+        self.assertContains(
+            invalid_response,
+            'The start date must be before the end date.',
+            status_code=400
+        )
+
+
+class ImportViewTests(TestCase):
+    """
+    Tests for the `OrderImportView` & `BatchImportView` views.
+    """
+    fixtures = ['roles', 'units', 'ports']
+
+    def setUp(self):
+        self.batch = BatchFactory(rate=5)
+        self.delivery_order = DeliveryOrderFactory(
+            batch=self.batch,
+            bill_of_loading='BL-001'
+        )
+        self.customer = CustomerFactory(region='Amhara', code='AMH')
+        self.union = UnionFactory(customer=self.customer, name='Merkeb')
+        self.location = LocationFactory(customer=self.customer, name='Bahir Dar')
+        self.url = reverse('orders:order-import', args=[self.delivery_order.pk])
+        self.client.force_login(AdminUserFactory(status=User.ACTIVE))
+
+    def get_file(self, content, name='allocations.csv'):
+        """Returns an uploaded file of `content`."""
+        return SimpleUploadedFile(name, content.encode('utf-8'))
+
+    def test_import_csv_file(self):
+        """
+        Ensure the rows of an uploaded CSV file are imported.
+        """
+        response = self.client.post(self.url, {'file': self.get_file(
+            'Type,Region,Union,Location,Quantity,Shortage,Over\n'
+            'Allocation,Amhara,Merkeb,Bahir Dar,"1,250",,\n'
+            'Distribution,Amhara,Merkeb,Bahir Dar,1200,30,20\n'
+        )})
+        batch_url = reverse('orders:batch-detail', args=[self.batch.pk])
+
+        # Assertions
+        self.assertRedirects(
+            response,
+            f'{batch_url}?active_delivery_order={self.delivery_order.pk}'
+        )
+        self.assertEqual(
+            list(UnionAllocation.objects.values_list('quantity', flat=True)),
+            [1250]
+        )
+        self.assertEqual(
+            list(UnionDistribution.objects.values_list(
+                'quantity', 'shortage', 'over'
+            )),
+            [(1200, 30, 20)]
+        )
+
+    def test_import_invalid_rows(self):
+        """
+        Ensure the row errors are displayed & nothing is imported.
+        """
+        response = self.client.post(self.url, {'file': self.get_file(
+            'Type,Region,Union,Location,Quantity\n'
+            'Allocation,Amhara,Merkeb,Bahir Dar,10\n'
+            'Allocation,Amhara,Merkeb,Gondar,10\n'
+        )})
+
+        # Assertions
+        self.assertContains(
+            response,
+            'row 3: Unknown location &quot;Gondar&quot; in Amhara.',
+            status_code=400
+        )
+        self.assertFalse(UnionAllocation.objects.exists())
+
+    def test_import_invalid_quantity(self):
+        """
+        Ensure quantities that are not finite numbers are row errors.
+        """
+        response = self.client.post(self.url, {'file': self.get_file(
+            'Type,Region,Union,Location,Quantity\n'
+            'Allocation,Amhara,Merkeb,Bahir Dar,NaN\n'
+            'Allocation,Amhara,Merkeb,Bahir Dar,Infinity\n'
+        )})
+
+        # Assertions
+        self.assertContains(
+            response, 'row 2: Invalid quantity &quot;NaN&quot;.',
+            status_code=400
+        )
+        self.assertContains(
+            response, 'row 3: Invalid quantity &quot;Infinity&quot;.',
+            status_code=400
+        )
+
+    def test_import_invalid_xlsx_file(self):
+        """
+        Ensure Excel cells referring to a missing shared string are
+        reported as a file error.
+        """
+        content = io.BytesIO()
+        with zipfile.ZipFile(content, 'w') as archive:
+            archive.writestr('xl/workbook.xml', (
+                f'<workbook xmlns="{XLSX_MAIN_NS}" xmlns:r="{XLSX_RELS_NS}">'
+                '<sheets><sheet name="Allocations" r:id="rId1"/></sheets>'
+                '</workbook>'
+            ))
+            archive.writestr('xl/_rels/workbook.xml.rels', (
+                '<Relationships xmlns="http://schemas.openxmlformats.org/'
+                'package/2006/relationships">'
+                '<Relationship Id="rId1" Target="worksheets/sheet1.xml"/>'
+                '</Relationships>'
+            ))
+            archive.writestr('xl/worksheets/sheet1.xml', (
+                f'<worksheet xmlns="{XLSX_MAIN_NS}"><sheetData>'
+                '<row r="1"><c r="A1" t="s"><v>5</v></c></row>'
+                '</sheetData></worksheet>'
+            ))
+        response = self.client.post(self.url, {'file': SimpleUploadedFile(
+            'allocations.xlsx', content.getvalue()
+        )})
+
+        # Assertions
+        self.assertContains(
+            response, 'Invalid Excel shared string &quot;5&quot;.',
+            status_code=400
+        )
+
+    def test_import_unsupported_file(self):
+        """
+        Ensure files other than CSV & Excel files are rejected.
+        """
+        response = self.client.post(self.url, {
+            'file': self.get_file('allocations', name='allocations.txt')
+        })
+
+        # Assertions
+        self.assertContains(
+            response,
+            'Only CSV &amp; Excel (.xlsx) files are supported.',
+            status_code=400
+        )
+
+    def test_import_exported_batch(self):
+        """
+        Ensure the Excel export of a batch can be imported back.
+        """
+        allocation = AllocationFactory(
+            delivery_order=self.delivery_order,
+            buyer=self.customer
+        )
+        UnionAllocationFactory(
+            allocation=allocation, union=self.union,
+            location=self.location, quantity=10
+        )
+        export_url = reverse('orders:batch-export', args=[self.batch.pk])
+        content = b''.join(self.client.get(export_url).streaming_content)
+        import_url = reverse('orders:batch-import', args=[self.batch.pk])
+        response = self.client.post(
+            import_url,
+            {'file': SimpleUploadedFile('export.xlsx', content)},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+
+        # Assertions
+        self.assertEqual(
+            response.json(),
+            {'success_url': reverse('orders:batch-detail', args=[self.batch.pk])}
+        )
+        self.assertFalse(Allocation.objects.filter(pk=allocation.pk).exists())
+        self.assertEqual(
+            list(UnionAllocation.objects.values_list('union', 'quantity')),
+            [(self.union.pk, 10)]
+        )
+
+    def test_guest_users_can_not_import(self):
+        """
+        Ensure only admin & staff users can import.
+        """
+        self.client.force_login(GuestUserFactory(status=User.ACTIVE))
+        response = self.client.get(self.url)
+
+        # Assertions
+        self.assertEqual(response.status_code, 403)
@@ -2,14 +2,17 @@ from django.urls import path
 
 from .views.batches import OpenBatchListView, ClosedBatchListView, \
     BatchCreateView, BatchUpdateView, BatchCloseView, BatchReopenView, \
-    BatchDeleteView, BatchDetailView, SupplierPopupView
+    BatchDeleteView, BatchDetailView, BatchLetterView, BatchLetterStatusView, \
+    BatchExportView, SupplierPopupView
 from .views.deliveryorders import OrderCreateView, \
     OrderUpdateView, OrderDetailView, OrderDeleteView
 from .views.allocations import AllocationCreateView, AllocationUpdateView, \
     AllocationDeleteView, LetterFormView, AllocationLetterView, \
-    AllocationDetailView
+    AllocationLetterStatusView, AllocationDetailView
 from .views.distributions import DistributionCreateView, \
     DistributionUpdateView, DistributionDeleteView, DistributionDetailView
+from .views.exports import ExportView
+from .views.imports import BatchImportView, OrderImportView
 
 
 app_name = 'orders'
@@ -23,6 +26,27 @@ urlpatterns = [
     ),
     path('batches/create/', BatchCreateView.as_view(), name='batch-create'),
     path('batches/<uuid:pk>/', BatchDetailView.as_view(), name='batch-detail'),
+    path(
+        'batches/<uuid:pk>/allocation-letters/',
+        BatchLetterView.as_view(),
+        name='batch-letter'
+    ),
+    path(
+        'batches/<uuid:pk>/allocation-letters/status/',
+        BatchLetterStatusView.as_view(),
+        name='batch-letter-status'
+    ),
+    path(
+        'batches/<uuid:pk>/export/',
+        BatchExportView.as_view(),
+        name='batch-export'
+    ),
+    path('exports/', ExportView.as_view(), name='export'),
+    path(
+        'batches/<uuid:pk>/import/',
+        BatchImportView.as_view(),
+        name='batch-import'
+    ),
     path(
         'batches/<uuid:pk>/update/',
         BatchUpdateView.as_view(),
@@ -68,6 +92,11 @@ urlpatterns = [
         OrderDeleteView.as_view(),
         name='order-delete'
     ),
+    path(
+        'delivery-orders/<uuid:pk>/import/',
+        OrderImportView.as_view(),
+        name='order-import'
+    ),
     path(
         'delivery-orders/<uuid:pk>/letter-form/',
         LetterFormView.as_view(),
@@ -78,6 +107,11 @@ urlpatterns = [
         AllocationLetterView.as_view(),
         name='order-allocation-letter'
     ),
+    path(
+        'delivery-orders/<uuid:pk>/allocation-letter/status/',
+        AllocationLetterStatusView.as_view(),
+        name='order-allocation-letter-status'
+    ),
     path(
         'allocations/<uuid:pk>/',
         AllocationDetailView.as_view(),
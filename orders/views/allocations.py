@@ -1,5 +1,10 @@
+import posixpath
+
+from celery.result import AsyncResult
+
+from django.core.files.storage import default_storage
 from django.forms import modelform_factory
-from django.http import HttpResponse
+from django.http import JsonResponse
 from django.shortcuts import redirect, get_object_or_404
 from django.views.generic import CreateView, UpdateView, DeleteView, \
     DetailView, FormView
@@ -7,13 +12,14 @@ from django.views.generic.detail import BaseDetailView
 from django.urls import reverse
 
 from shared.constants import ROLE_SUPPLIER, ROLE_ADMIN, ROLE_STAFF
-from customers.models import Customer, Union, Location
 
 from orders.forms import AllocationForm, LetterDownloadForm, \
     UnionAllocationFormSet
-from orders.mixins import BaseOrderView
+from orders.mixins import BaseOrderView, BuyerChoicesMixin, \
+    LetterDownloadMixin, RegionChoicesMixin
 from orders.models import DeliveryOrder, Allocation
 from orders.letters.allocationletter import AllocationLetter
+from orders.tasks import start_allocation_letter
 
 
 class AllocationDetailView(BaseOrderView, DetailView):
@@ -23,7 +29,7 @@ class AllocationDetailView(BaseOrderView, DetailView):
     access_roles = '__all__'
 
 
-class BaseAllocationEditView(BaseOrderView):
+class BaseAllocationEditView(RegionChoicesMixin, BaseOrderView):
     """Abstract base class for allocation create & update people."""
     model = Allocation
     form_class = UnionAllocationFormSet
@@ -36,51 +42,43 @@ class BaseAllocationEditView(BaseOrderView):
         return response
 
 
-class AllocationCreateView(BaseAllocationEditView, CreateView):
+class AllocationCreateView(BaseAllocationEditView, BuyerChoicesMixin,
+                           CreateView):
     """Creates an allocation for delivery order."""
     template_name = 'orders/modals/allocations/allocation_create_form.html'
+    buyer_model = Allocation
 
-    def get_delivery_order(self):
-        order_pk = self.kwargs.get('pk')
-        order = get_object_or_404(DeliveryOrder,  pk=order_pk)
-        return order
+    def get_region(self):
+        buyer = self.request.POST.get('buyer', self.request.GET.get('buyer'))
+        try:
+            return int(buyer)
+        except (TypeError, ValueError):
+            return None
 
     def get_context_data(self, **kwargs):
-        customers = Customer.objects.all()
-        order = self.get_delivery_order()
-        allocated_buyers = order.allocations.values_list('buyer', flat=True)
-        buyer_choices = [c for c in customers if c.pk not in allocated_buyers]
+        region_choices = self.get_region_choices()
 
-        try:
-            buyer_pk = int(self.request.GET.get('buyer'))
-            union_choices = Union.objects.filter(customer__pk=buyer_pk)
-            location_choices = Location.objects.filter(customer__pk=buyer_pk)
-        except TypeError:
-            union_choices = Union.objects.all()
-            location_choices = Location.objects.all()
-
-        AllocationForm = modelform_factory(Allocation, fields=('buyer', ))
+        # The invalid formset is passed by `form_invalid`
+        if 'form' not in kwargs:
+            kwargs['form'] = self.get_form()
         kwargs.update({
-            'buyer_choices': buyer_choices,
-            'union_choices': union_choices,
-            'location_choices': location_choices,
-            'order': order,
-            'formset': self.get_form(),
-            'allocation_form': AllocationForm(self.request.POST or None)
+            'buyer_choices': self.get_buyer_choices(),
+            'union_choices': region_choices.unions,
+            'location_choices': region_choices.locations,
+            'order': self.get_delivery_order(),
+            'formset': kwargs['form'],
+            'allocation_form': self.get_buyer_form()
         })
         return super().get_context_data(**kwargs)
 
     def get_success_url(self):
-        order_pk = self.kwargs.get('pk')
-        delivery_order = get_object_or_404(DeliveryOrder, pk=order_pk)
-        batch_id = delivery_order.batch.pk
-        url = reverse('orders:batch-detail', args=[batch_id])
+        delivery_order = self.get_delivery_order()
+        url = reverse('orders:batch-detail', args=[delivery_order.batch.pk])
         url = f'{url}?active_delivery_order={delivery_order.pk}'
         return url
 
     def form_valid(self, formset):
-        context = self.get_context_data()
-        allocation_form = context['allocation_form']
+        allocation_form = self.get_buyer_form()
         if allocation_form.is_valid():
             self.object = allocation_form.save(commit=False)
             self.object.delivery_order = self.get_delivery_order()
@@ -88,8 +86,11 @@ class AllocationCreateView(BaseAllocationEditView, CreateView):
             self.object.save()
 
             formset.instance = self.object
+            redirect_url = super().form_valid(formset)
+            # `form_valid` sets the object to the saved union rows
+            self.object = formset.instance
             self.object.delivery_order.touch(updated_by=self.request.user)
-            return super().form_valid(formset)
+            return redirect_url
         return super().form_invalid(formset)
 
 
@@ -97,13 +98,15 @@ class AllocationUpdateView(BaseAllocationEditView, UpdateView):
     """Updates an allocation for delivery order."""
     template_name = 'orders/modals/allocations/allocation_update_form.html'
 
+    def get_region(self):
+        return self.object.buyer_id
+
     def get_context_data(self, **kwargs):
-        union_choices = Union.objects.filter(customer=self.object.buyer)
-        location_choices = Location.objects.filter(customer=self.object.buyer)
+        region_choices = self.get_region_choices()
         AllocationForm = modelform_factory(Allocation, fields=('buyer', ))
         kwargs.update({
-            'union_choices': union_choices,
-            'location_choices': location_choices,
+            'union_choices': region_choices.unions,
+            'location_choices': region_choices.locations,
             'order': self.object.delivery_order,
             'formset': self.get_form(),
             'allocation_form': AllocationForm(
@@ -168,17 +171,66 @@ class LetterFormView(BaseOrderView, FormView):
         return
 
 
-class AllocationLetterView(BaseOrderView, BaseDetailView):
-    """Generates delivery order allocation letter."""
+class AllocationLetterView(BaseOrderView, LetterDownloadMixin, BaseDetailView):
+    """Downloads delivery order allocation letter.
+
+    The letter is generated by a celery task & stored until the delivery
+    order is touched again.
+    """
     model = DeliveryOrder
+    queryset = DeliveryOrder.objects.select_related('batch')
     access_roles = '__all__'
+    letter_title = 'allocation letter'
 
     def get(self, request, *args, **kwargs):
         self.object = self.get_object()
-        letter = AllocationLetter(self.object)
-        response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+        # The version of a finished job, the order may be touched since
+        name = AllocationLetter.get_version_name(
+            self.object, request.GET.get('letter')
         )
-        response['Content-Disposition'] = 'attachment; filename=allocation.docx'
-        letter.generate(response)
-        return response
+        if name is None or not default_storage.exists(name):
+            name = AllocationLetter.get_file_name(self.object)
+        if not default_storage.exists(name):
+            job = start_allocation_letter(self.object.pk, name)
+            # A failed job is shown with its status by the polling page
+            if not job.successful():
+                return self.render_job(job.id)
+            name = job.result
+        return self.get_file_response(name, 'allocation.docx')
+
+    def get_status_url(self):
+        return reverse(
+            'orders:order-allocation-letter-status', args=[self.object.pk]
+        )
+
+    def get_back_url(self):
+        url = reverse('orders:batch-detail', args=[self.object.batch.pk])
+        return f'{url}?active_delivery_order={self.object.pk}'
+
+
+class AllocationLetterStatusView(BaseOrderView, BaseDetailView):
+    """Returns the status of an allocation letter generation job."""
+    model = DeliveryOrder
+    queryset = DeliveryOrder.objects.select_related('batch')
+    access_roles = '__all__'
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        name = AllocationLetter.get_file_name(self.object)
+        job_id = request.GET.get('job')
+        job = AsyncResult(job_id) if job_id else None
+        if not default_storage.exists(name) and job is not None:
+            # Serve the letter of the job, even if the order was touched since
+            if job.successful():
+                name = job.result
+        if default_storage.exists(name):
+            download_url = reverse(
+                'orders:order-allocation-letter', args=[self.object.pk]
+            )
+            if name != AllocationLetter.get_file_name(self.object):
+                file_name = posixpath.basename(name)
+                download_url = f'{download_url}?letter={file_name}'
+            return JsonResponse({'status': 'SUCCESS', 'download_url': download_url})
+
+        status = job.state if job is not None else 'PENDING'
+        return JsonResponse({'status': status})
@@ -1,27 +1,45 @@
+import uuid
 from collections import namedtuple, Counter
 
+from celery.result import GroupResult
+
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.messages.views import SuccessMessageMixin
-from django.db.models import Q
-from django.http import JsonResponse
+from django.core.files.storage import default_storage
+from django.db.models import Count, Q
+from django.http import JsonResponse, StreamingHttpResponse, Http404
 from django.shortcuts import redirect
-from django.urls import reverse_lazy
+from django.urls import reverse_lazy, reverse
+from django.utils.text import slugify
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView, \
     DetailView
+from django.views.generic.detail import BaseDetailView
 
+from shared.cache import get_version
 from shared.constants import ROLE_ADMIN, ROLE_MANAGEMENT, ROLE_STAFF, \
     ROLE_SUPPLIER, ROLE_GUEST
+from shared.mixins import ConditionalPageMixin
+from shared.pagination import CursorPaginationMixin
+from shared.zipstream import stream_zip, iter_storage_file
 from purchases.models import Supplier, Product
+from customers.lookups import LOOKUPS_NAMESPACE
 
 from orders.forms import BatchForm
-from orders.mixins import BaseBatchesView
-from orders.models import Batch, Port
+from orders.letters.allocationletter import AllocationLetter
+from orders.mixins import BaseBatchesView, ExportMixin, LetterDownloadMixin
+from orders.models import Batch, DeliveryOrder, Port
+from orders.signals import PORTS_NAMESPACE
+from orders.summaries import prefetch_batch_tree, summarize_batch, \
+    summarize_batch_progress
+from orders.tasks import start_allocation_letter
 
 
-class BaseBatchListView(BaseBatchesView, ListView):
+class BaseBatchListView(BaseBatchesView, CursorPaginationMixin, ListView):
     """Abstract base class for open & closed batch list views."""
     model = Batch
     paginate_by = 10
+    cursor_ordering = ('-created_at', )
     page_name = 'batches'
     status = None
 
@@ -30,6 +48,7 @@ class BaseBatchListView(BaseBatchesView, ListView):
         product_pk = self.request.GET.get('product')
         supplier_pk = self.request.GET.get('supplier')
         search_query = self.request.GET.get('search')
+        incomplete = self.request.GET.get('incomplete')
         user = self.request.user
         if user.role and user.role.name == ROLE_SUPPLIER:
             qs = qs.filter(supplier=user.supplier)
@@ -39,26 +58,39 @@ class BaseBatchListView(BaseBatchesView, ListView):
             qs = qs.filter(supplier__pk=supplier_pk)
         if search_query is not None:
             qs = self.get_search_result(search_query)
-        return qs
+        if incomplete:
+            qs = qs.filter(
+                pk__in=DeliveryOrder.objects.incomplete().values('batch')
+            )
+        # The progress rollups are only computed for the rows of the page
+        return qs.select_related('product', 'supplier').with_totals()
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator, page, batches, is_paginated = super().paginate_queryset(
+            queryset, page_size
+        )
+        object_list = [summarize_batch_progress(batch) for batch in batches]
+        return paginator, page, object_list, is_paginated
 
     def get_context_data(self, **kwargs):
         user = self.request.user
-        supplier_list = Supplier.objects.filter(
-            batches__status=self.status
-        ).distinct()
-        product_list = Product.objects.filter(
-            batches__status=self.status
-        ).distinct()
+        supplier_list = Supplier.objects.filter(batches__status=self.status)
+        product_list = Product.objects.filter(batches__status=self.status)
         if user.role is not None and user.role.name == ROLE_SUPPLIER:
             supplier_list = supplier_list.filter(pk=user.supplier.pk)
-            product_list = product_list.filter(
+            product_list = Product.objects.filter(
+                batches__status=self.status,
                 batches__supplier__pk=user.supplier.pk
             )
+        # The batches are counted on the filtered join, in the same query
+        supplier_list = supplier_list.annotate(batch_count=Count('batches'))
+        product_list = product_list.annotate(batch_count=Count('batches'))
         kwargs.update({
             'product_list': product_list,
             'selected_product': self.request.GET.get('product'),
             'supplier_list': supplier_list,
             'selected_supplier': self.request.GET.get('supplier'),
+            'selected_incomplete': bool(self.request.GET.get('incomplete')),
             'batch_count': self.queryset.count(),
             'search_query': self.request.GET.get('search', '').strip()
         })
@@ -87,19 +119,42 @@ class ClosedBatchListView(BaseBatchListView):
     access_roles = '__all__'
 
 
-class BatchDetailView(BaseBatchesView, DetailView):
+class BatchDetailView(BaseBatchesView, ConditionalPageMixin, DetailView):
     """Detail view for a purchasing batch instance."""
     template_name = 'orders/batch_detail.html'
     model = Batch
-    queryset = Batch.objects.all()
+    queryset = prefetch_batch_tree(Batch.objects.all())
     page_name = 'batches'
     access_roles = [ROLE_ADMIN, ROLE_MANAGEMENT, ROLE_STAFF, ROLE_GUEST]
+    # Allocation & distribution changes touch their delivery order
+    version_fields = ('updated_at', 'delivery_orders__updated_at')
+    version_counts = ('delivery_orders', )
 
     def get_context_data(self, **kwargs):
+        delivery_order_list = summarize_batch(self.object)
+        kwargs['delivery_order_list'] = delivery_order_list
+        kwargs['has_allocations'] = any(
+            order.allocation_rows for order in delivery_order_list
+        )
         kwargs['active_pk'] = self.get_active_tab()
         kwargs['port_list'] = Port.objects.all()
+        kwargs['pane_cache_timeout'] = settings.DELIVERY_ORDER_PANE_TIMEOUT
+        kwargs['pane_cache_version'] = self.get_name_versions()
         return super().get_context_data(**kwargs)
 
+    def get_name_versions(self):
+        """
+        Returns the versions of the customers & ports shown by the delivery
+        order panes (names, count of buyers to allocate), which change
+        without touching the orders.
+        """
+        return (
+            f'{get_version(LOOKUPS_NAMESPACE)}.{get_version(PORTS_NAMESPACE)}'
+        )
+
+    def get_version_extra(self):
+        return super().get_version_extra() + [self.get_name_versions()]
+
     def get_active_tab(self):
         """
         Returns the id of the delivery order that should be
@@ -107,13 +162,125 @@ class BatchDetailView(BaseBatchesView, DetailView):
         """
         active_pk = self.request.GET.get('active_delivery_order')
         if active_pk is None:
-            batch = self.get_object()
-            default_delivery_order = batch.delivery_orders.first()
-            if default_delivery_order is not None:
-                active_pk = default_delivery_order.pk
+            delivery_orders = self.object.delivery_orders.all()
+            if delivery_orders:
+                active_pk = delivery_orders[0].pk
         return active_pk
 
 
+class BatchExportView(BaseBatchesView, ExportMixin, BaseDetailView):
+    """
+    Exports the union allocations & distributions of all the batch
+    delivery orders, as an Excel file unless the `format` is `csv`.
+    """
+    model = Batch
+    access_roles = [ROLE_ADMIN, ROLE_MANAGEMENT, ROLE_STAFF, ROLE_GUEST]
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        export_format = request.GET.get('format', 'xlsx')
+        if export_format not in self.export_formats:
+            raise Http404('Unknown export format.')
+        return self.render_export(export_format)
+
+    def get_export_queryset(self):
+        return self.object.delivery_orders.all()
+
+    def get_export_name(self):
+        return f'{slugify(self.object.name)}-allocations'
+
+
+class BaseBatchLetterView(BaseBatchesView, BaseDetailView):
+    """Abstract base class for the batch allocation letters views."""
+    model = Batch
+    access_roles = [ROLE_ADMIN, ROLE_MANAGEMENT, ROLE_STAFF, ROLE_GUEST]
+
+    def get_letters(self):
+        """
+        Returns the allocated delivery orders of the batch with the
+        storage file names of their allocation letters.
+        """
+        delivery_orders = self.object.delivery_orders.filter(
+            allocations__isnull=False
+        ).distinct()
+        letters = []
+        for delivery_order in delivery_orders:
+            delivery_order.batch = self.object
+            name = AllocationLetter.get_file_name(delivery_order)
+            letters.append((delivery_order, name))
+        if not letters:
+            raise Http404('The batch has no allocated delivery orders.')
+        return letters
+
+    def get_stale_letters(self, letters):
+        """Returns the `(delivery order, name)` of the letters not stored."""
+        return [
+            (delivery_order, name) for delivery_order, name in letters
+            if not default_storage.exists(name)
+        ]
+
+
+class BatchLetterView(LetterDownloadMixin, BaseBatchLetterView):
+    """
+    Downloads the allocation letters of all the batch delivery orders
+    as a single zip file.
+
+    Letters which are not stored yet are generated in parallel by celery
+    jobs, reusing the jobs already generating them, while stored letters
+    are reused as they are.
+    """
+    letter_title = 'allocation letters'
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        letters = self.get_letters()
+        stale_letters = self.get_stale_letters(letters)
+        if stale_letters:
+            jobs = [
+                start_allocation_letter(order.pk, name)
+                for order, name in stale_letters
+            ]
+            if not all(job.successful() for job in jobs):
+                job = GroupResult(str(uuid.uuid4()), jobs)
+                job.save()
+                return self.render_job(job.id)
+
+        # The letters are opened before streaming, so that a newer version
+        # removing them can't break the archive midway
+        entries = [
+            (f'{n:02d}-{slugify(order.vessel)}.docx', iter_storage_file(name))
+            for n, (order, name) in enumerate(letters, start=1)
+        ]
+        response = StreamingHttpResponse(
+            stream_zip(entries),
+            content_type='application/zip'
+        )
+        filename = f'{slugify(self.object.name)}-allocation-letters.zip'
+        response['Content-Disposition'] = f'attachment; filename={filename}'
+        return response
+
+    def get_status_url(self):
+        return reverse('orders:batch-letter-status', args=[self.object.pk])
+
+    def get_back_url(self):
+        return reverse('orders:batch-detail', args=[self.object.pk])
+
+
+class BatchLetterStatusView(BaseBatchLetterView):
+    """Returns the status of a batch allocation letters generation job."""
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        if not self.get_stale_letters(self.get_letters()):
+            download_url = reverse('orders:batch-letter', args=[self.object.pk])
+            return JsonResponse({'status': 'SUCCESS', 'download_url': download_url})
+
+        job_id = request.GET.get('job')
+        job = GroupResult.restore(job_id) if job_id else None
+        status = 'FAILURE' if job is not None and job.failed() else 'PENDING'
+        return JsonResponse({'status': status})
+
+
 class BatchCreateView(BaseBatchesView, SuccessMessageMixin, CreateView):
     """Create view for creating purchasing batch."""
     template_name = 'orders/modals/batches/batch_form.html'
@@ -161,6 +328,12 @@ class BatchUpdateView(BaseBatchesView, SuccessMessageMixin, UpdateView):
         })
         return super().get_context_data(**kwargs)
 
+    def form_valid(self, form):
+        redirect_url = super().form_valid(form)
+        if 'rate' in form.changed_data:
+            self.object.refresh_totals(cascade=True)
+        return redirect_url
+
     def form_invalid(self, form):
         response = super().form_invalid(form)
         response.status_code = 400
@@ -7,9 +7,9 @@ from django.views.generic import ListView, CreateView, UpdateView, DeleteView, \
 from django.urls import reverse_lazy, reverse
 
 from shared.constants import ROLE_SUPPLIER, ROLE_ADMIN, ROLE_STAFF, ROLE_GUEST
-from customers.models import Customer
 from purchases.models import Product
 
+from orders.buyers import get_remaining_buyers
 from orders.forms import DeliveryOrderForm
 from orders.mixins import BaseOrderView
 from orders.models import Batch, DeliveryOrder, Allocation, Port, Distribution
@@ -35,11 +35,7 @@ class OrderDetailView(BaseOrderDetailView, DetailView):
         return qs
 
     def get_context_data(self, **kwargs):
-        customers = Customer.objects.all()
-        distributed_buyers = self.object.distributions.values_list(
-            'buyer', flat=True
-        )
-        buyer_choices = [c for c in customers if c.pk not in distributed_buyers]
+        buyer_choices = get_remaining_buyers(self.object, Distribution)
         kwargs.update({'buyer_choices': buyer_choices,})
         return super().get_context_data(**kwargs)
 
@@ -121,3 +117,10 @@ class OrderDeleteView(BaseOrderDetailView, DeleteView):
         delivery_order = self.get_object()
         batch_pk = delivery_order.batch.pk
         return reverse_lazy('orders:batch-detail', args=[batch_pk])
+
+    def delete(self, request, *args, **kwargs):
+        batch = self.get_object().batch
+        redirect_url = super().delete(request, *args, **kwargs)
+        if batch is not None:
+            batch.refresh_totals()
+        return redirect_url
@@ -1,14 +1,13 @@
 from django.forms import modelform_factory
-from django.shortcuts import get_object_or_404
 from django.urls import reverse
 from django.views.generic import CreateView, UpdateView, DeleteView, DetailView
 
 from shared.constants import ROLE_SUPPLIER, ROLE_ADMIN, ROLE_STAFF
-from customers.models import Customer, Union, Location
 
 from orders.forms import UnionDistributionFormSet, DistributionForm
-from orders.mixins import BaseOrderView
-from orders.models import DeliveryOrder, Distribution
+from orders.mixins import BaseOrderView, BuyerChoicesMixin, \
+    RegionChoicesMixin
+from orders.models import Distribution
 
 
 class DistributionDetailView(BaseOrderView, DetailView):
@@ -18,7 +17,7 @@ class DistributionDetailView(BaseOrderView, DetailView):
     access_roles = '__all__'
 
 
-class BaseDistributionEditView(BaseOrderView):
+class BaseDistributionEditView(RegionChoicesMixin, BaseOrderView):
     """Base abstract class for Distribution Create & Update views."""
     model = Distribution
     form_class = UnionDistributionFormSet
@@ -31,51 +30,43 @@ class BaseDistributionEditView(BaseOrderView):
         return response
 
 
-class DistributionCreateView(BaseDistributionEditView, CreateView):
+class DistributionCreateView(BaseDistributionEditView, BuyerChoicesMixin,
+                             CreateView):
     """Creates a distribution report for delivery order."""
     template_name = 'orders/modals/distributions/distribution_create_form.html'
+    buyer_model = Distribution
 
-    def get_delivery_order(self):
-        order_pk = self.kwargs.get('pk')
-        order = get_object_or_404(DeliveryOrder,  pk=order_pk)
-        return order
+    def get_region(self):
+        buyer = self.request.POST.get('buyer', self.request.GET.get('buyer'))
+        try:
+            return int(buyer)
+        except (TypeError, ValueError):
+            return None
 
     def get_context_data(self, **kwargs):
-        customers = Customer.objects.all()
-        order = self.get_delivery_order()
-        distributed_buyers = order.distributions.values_list('buyer', flat=True)
-        buyer_choices = [c for c in customers if c.pk not in distributed_buyers]
-
-        try:
-            buyer_pk = int(self.request.GET.get('buyer'))
-            union_choices = Union.objects.filter(customer__pk=buyer_pk)
-            location_choices = Location.objects.filter(customer__pk=buyer_pk)
-        except TypeError:
-            union_choices = Union.objects.all()
-            location_choices = Location.objects.all()
+        region_choices = self.get_region_choices()
 
-        DistributionForm = modelform_factory(Distribution, fields=('buyer', ))
+        # The invalid formset is passed by `form_invalid`
+        if 'form' not in kwargs:
+            kwargs['form'] = self.get_form()
         kwargs.update({
-            'buyer_choices': buyer_choices,
-            'union_choices': union_choices,
-            'location_choices': location_choices,
-            'order': order,
-            'formset': self.get_form(),
-            'distribution_form': DistributionForm(self.request.POST or None)
+            'buyer_choices': self.get_buyer_choices(),
+            'union_choices': region_choices.unions,
+            'location_choices': region_choices.locations,
+            'order': self.get_delivery_order(),
+            'formset': kwargs['form'],
+            'distribution_form': self.get_buyer_form()
         })
         return super().get_context_data(**kwargs)
 
     def get_success_url(self):
-        order_pk = self.kwargs.get('pk')
-        delivery_order = get_object_or_404(DeliveryOrder, pk=order_pk)
-        batch_id = delivery_order.batch.pk
-        url = reverse('orders:batch-detail', args=[batch_id])
+        delivery_order = self.get_delivery_order()
+        url = reverse('orders:batch-detail', args=[delivery_order.batch.pk])
         url = f'{url}?active_delivery_order={delivery_order.pk}'
         return url
 
     def form_valid(self, formset):
-        context = self.get_context_data()
-        distribution_form = context['distribution_form']
+        distribution_form = self.get_buyer_form()
         if distribution_form.is_valid():
             self.object = distribution_form.save(commit=False)
             self.object.delivery_order = self.get_delivery_order()
@@ -83,8 +74,11 @@ class DistributionCreateView(BaseDistributionEditView, CreateView):
             self.object.save()
 
             formset.instance = self.object
+            redirect_url = super().form_valid(formset)
+            # `form_valid` sets the object to the saved union rows
+            self.object = formset.instance
             self.object.delivery_order.touch(updated_by=self.request.user)
-            return super().form_valid(formset)
+            return redirect_url
         return super().form_invalid(formset)
 
 
@@ -92,13 +86,15 @@ class DistributionUpdateView(BaseDistributionEditView, UpdateView):
     """Updates a distribution for delivery order."""
     template_name = 'orders/modals/distributions/distribution_update_form.html'
 
+    def get_region(self):
+        return self.object.buyer_id
+
     def get_context_data(self, **kwargs):
-        union_choices = Union.objects.filter(customer=self.object.buyer)
-        location_choices = Location.objects.filter(customer=self.object.buyer)
+        region_choices = self.get_region_choices()
         DistributionForm = modelform_factory(Distribution, fields=('buyer', ))
         kwargs.update({
-            'union_choices': union_choices,
-            'location_choices': location_choices,
+            'union_choices': region_choices.unions,
+            'location_choices': region_choices.locations,
             'order': self.object.delivery_order,
             'formset': self.get_form(),
             'distribution_form': DistributionForm(
@@ -0,0 +1,46 @@
+from django.views.generic import FormView
+
+from shared.constants import ROLE_ADMIN, ROLE_MANAGEMENT, ROLE_STAFF, \
+    ROLE_GUEST
+
+from orders.forms import ExportForm
+from orders.mixins import BaseOrderView, ExportMixin
+from orders.models import DeliveryOrder
+
+
+class ExportView(BaseOrderView, ExportMixin, FormView):
+    """
+    Exports the union allocations & distributions of the delivery orders
+    arrived in a period.
+
+    Without query parameters the modal form selecting the period is
+    displayed, otherwise the export is streamed.
+    """
+    template_name = 'orders/modals/export_form.html'
+    form_class = ExportForm
+    access_roles = [ROLE_ADMIN, ROLE_MANAGEMENT, ROLE_STAFF, ROLE_GUEST]
+
+    def get(self, request, *args, **kwargs):
+        if not request.GET:
+            return super().get(request, *args, **kwargs)
+
+        form = self.form_class(request.GET)
+        if not form.is_valid():
+            return self.render_to_response(
+                self.get_context_data(form=form),
+                status=400
+            )
+        self.cleaned_data = form.cleaned_data
+        return self.render_export(form.cleaned_data['format'])
+
+    def get_export_queryset(self):
+        return DeliveryOrder.objects.filter(
+            batch__isnull=False,
+            arrival_date__gte=self.cleaned_data['start_date'],
+            arrival_date__lte=self.cleaned_data['end_date']
+        )
+
+    def get_export_name(self):
+        start_date = self.cleaned_data['start_date'].isoformat()
+        end_date = self.cleaned_data['end_date'].isoformat()
+        return f'allocations-{start_date}-{end_date}'
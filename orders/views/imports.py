@@ -0,0 +1,92 @@
+from django.contrib import messages
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.urls import reverse
+from django.views.generic import FormView
+
+from shared.constants import ROLE_ADMIN, ROLE_STAFF
+from shared.spreadsheets import SpreadsheetError, read_spreadsheet
+
+from orders.forms import ImportForm
+from orders.imports import UnionImporter
+from orders.mixins import BaseOrderView
+from orders.models import Batch, DeliveryOrder
+
+
+class BaseImportView(BaseOrderView, FormView):
+    """
+    Abstract base class for the union allocations & distributions
+    import views.
+    """
+    template_name = 'orders/modals/import_form.html'
+    form_class = ImportForm
+    access_roles = [ROLE_ADMIN, ROLE_STAFF]
+
+    def get_importer(self):
+        """Returns the `UnionImporter` of the imported rows."""
+        raise NotImplementedError
+
+    def get_context_data(self, **kwargs):
+        kwargs['import_url'] = self.request.path
+        return super().get_context_data(**kwargs)
+
+    def form_valid(self, form):
+        importer = self.get_importer()
+        try:
+            sheets = read_spreadsheet(form.cleaned_data['file'])
+        except SpreadsheetError as e:
+            form.add_error('file', str(e))
+            return self.form_invalid(form)
+
+        if not importer.validate(sheets):
+            return self.form_invalid(form, row_errors=importer.errors)
+
+        count = importer.save()
+        messages.success(self.request, f'{count} union rows are imported.')
+        if self.request.is_ajax():
+            return JsonResponse({'success_url': self.get_success_url()})
+        return redirect(self.get_success_url())
+
+    def form_invalid(self, form, row_errors=None):
+        context = self.get_context_data(form=form, row_errors=row_errors)
+        return self.render_to_response(context, status=400)
+
+
+class OrderImportView(BaseImportView):
+    """Imports the union allocations & distributions of a delivery order."""
+
+    def get_delivery_order(self):
+        return get_object_or_404(
+            DeliveryOrder.objects.select_related('batch'),
+            pk=self.kwargs.get('pk'),
+            batch__isnull=False
+        )
+
+    def get_importer(self):
+        delivery_order = self.get_delivery_order()
+        return UnionImporter(
+            delivery_order.batch,
+            delivery_order=delivery_order,
+            user=self.request.user
+        )
+
+    def get_success_url(self):
+        delivery_order = self.get_delivery_order()
+        url = reverse('orders:batch-detail', args=[delivery_order.batch.pk])
+        return f'{url}?active_delivery_order={delivery_order.pk}'
+
+
+class BatchImportView(BaseImportView):
+    """
+    Imports the union allocations & distributions of the batch delivery
+    orders, matched by their bill of loading.
+    """
+
+    def get_batch(self):
+        return get_object_or_404(Batch, pk=self.kwargs.get('pk'))
+
+    def get_importer(self):
+        return UnionImporter(self.get_batch(), user=self.request.user)
+
+    def get_success_url(self):
+        return reverse('orders:batch-detail', args=[self.kwargs.get('pk')])
@@ -0,0 +1,23 @@
+from django.db import migrations
+
+from shared.fulltext import AddFullTextIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('purchases', '0012_auto_20200614_0016'),
+    ]
+
+    operations = [
+        AddFullTextIndex(
+            model_name='supplier',
+            name='purchases_supplier_search_ft',
+            fields=['name', 'short_name'],
+        ),
+        AddFullTextIndex(
+            model_name='product',
+            name='purchases_product_search_ft',
+            fields=['name'],
+        ),
+    ]
@@ -10,17 +10,19 @@ from django.views.generic import ListView, CreateView, UpdateView, DeleteView, \
 
 from shared.constants import ROLE_ADMIN, ROLE_MANAGEMENT, ROLE_STAFF, ROLE_GUEST
 from shared.models import Unit
+from shared.pagination import CursorPaginationMixin
 
 from .forms import SupplierForm
 from .mixins import BasePurchasesView
 from .models import ProductCategory, Product, Supplier
 
 
-class ProductListView(BasePurchasesView, ListView):
+class ProductListView(BasePurchasesView, CursorPaginationMixin, ListView):
     """List view of fertilier products."""
     template_name = 'purchases/product_list.html'
     model = Product
     paginate_by = 10
+    cursor_ordering = ('name', )
     page_name = 'products'
     queryset = Product.objects.all()
     access_roles = [ROLE_STAFF, ROLE_MANAGEMENT, ROLE_ADMIN, ROLE_GUEST]
@@ -114,11 +116,12 @@ class ProductDeleteView(BasePurchasesView, SuccessMessageMixin, DeleteView):
         return redirect(success_url)
 
 
-class SupplierListView(BasePurchasesView, ListView):
+class SupplierListView(BasePurchasesView, CursorPaginationMixin, ListView):
     """List view of fertilier suppliers."""
     template_name = 'purchases/supplier_list.html'
     model = Supplier
     paginate_by = 10
+    cursor_ordering = ('name', )
     page_name = 'suppliers'
     queryset = Supplier.objects.all()
     access_roles = [ROLE_STAFF, ROLE_MANAGEMENT, ROLE_ADMIN, ROLE_GUEST]
@@ -0,0 +1,190 @@
+"""Building blocks of the REST API views & serializers."""
+from collections import OrderedDict
+
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.permissions import BasePermission
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .mixins import get_version, has_access
+from .pagination import CursorPaginator, InvalidCursor
+
+
+class HasAccessRole(BasePermission):
+    """Allows the active users with one of the view `access_roles`.
+
+    Views without `access_roles` (e.g. the API root) allow any role.
+    """
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not user or not user.is_authenticated:
+            return False
+        return has_access(user, getattr(view, 'access_roles', '__all__'))
+
+
+class CursorPagination(BasePagination):
+    """Keyset pagination of the API lists, using `CursorPaginator`.
+
+    Views set the ordering of the pages with `cursor_ordering`. The page
+    size can be changed with the `page_size` query parameter.
+    """
+    page_size = 50
+    max_page_size = 500
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    ordering = ('-created_at', )
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = getattr(view, 'cursor_ordering', None) or self.ordering
+        paginator = CursorPaginator(
+            queryset, self.get_page_size(request), ordering
+        )
+        try:
+            self.page = paginator.page(
+                request.query_params.get(self.cursor_query_param)
+            )
+        except InvalidCursor:
+            raise NotFound('Invalid cursor.')
+        self.request = request
+        return list(self.page)
+
+    def get_link(self, cursor):
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_link(self.page.next_cursor)),
+            ('previous', self.get_link(self.page.previous_cursor)),
+            ('results', data),
+        ]))
+
+
+class SparseFieldsetMixin:
+    """Serializer mixin keeping only the fields of the `fields` parameter.
+
+    e.g. `?fields=id,name` returns the `id` & `name` fields only. Unknown
+    field names are ignored.
+    """
+    fields_query_param = 'fields'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        names = get_requested_fields(
+            self.context.get('request'), self.fields_query_param
+        )
+        if names:
+            for name in set(self.fields) - names:
+                self.fields.pop(name)
+
+
+def get_requested_fields(request, query_param='fields'):
+    """Returns the field names of the sparse fieldset, if any.
+
+    Returns:
+        names (set<str>): the requested field names, `None` for all fields
+    """
+    if request is None:
+        return None
+    value = request.query_params.get(query_param, '')
+    names = {name.strip() for name in value.split(',') if name.strip()}
+    return names or None
+
+
+class ConditionalGetMixin:
+    """Read-only API view mixin answering conditional GET requests.
+
+    The `ETag` & `Last-Modified` headers are derived from the latest
+    `version_fields` timestamps (e.g. `updated_at`) & the `version_counts`
+    row counts of the requested rows, computed with a single aggregate
+    query. Clients with a current copy get a `304 Not Modified` response
+    before any row is fetched.
+
+    The rollup annotations of `annotate_queryset` are only added to the
+    queryset of the full response, so the aggregate query stays cheap.
+    """
+    version_fields = ('updated_at', )
+    version_counts = ('pk', )
+
+    def annotate_queryset(self, queryset):
+        """Returns `queryset` with the fields needed by the serializer."""
+        return queryset
+
+    def get_version(self, queryset):
+        """Returns the ETag & the last modification time of `queryset`.
+
+        Returns:
+            version (tuple): `(etag, last_modified)`, the time is `None`
+                for an empty queryset
+        """
+        request = self.request
+        return get_version(
+            queryset,
+            self.version_fields,
+            self.version_counts,
+            extra=[
+                remove_query_param(request.get_full_path(), 'format'),
+                request.accepted_renderer.format
+            ]
+        )
+
+    def get_conditional_response(self, queryset):
+        """Returns the `304` response of a current copy, else `None`.
+
+        The headers of the full response are kept in `self.version`.
+        """
+        etag, last_modified = self.get_version(queryset)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        self.version = (quote_etag(etag), timestamp)
+        return get_conditional_response(
+            self.request, etag=self.version[0], last_modified=timestamp
+        )
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        version = getattr(self, 'version', None)
+        if version is not None and response.status_code in (200, 304):
+            etag, timestamp = version
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        response = self.get_conditional_response(queryset)
+        if response is not None:
+            return response
+
+        page = self.paginate_queryset(self.annotate_queryset(queryset))
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        lookup = {self.lookup_field: kwargs[lookup_url_kwarg]}
+        queryset = self.filter_queryset(self.get_queryset()).filter(**lookup)
+        response = self.get_conditional_response(queryset)
+        if response is not None:
+            return response
+
+        instance = get_object_or_404(self.annotate_queryset(queryset))
+        self.check_object_permissions(request, instance)
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class SharedConfig(AppConfig):
     name = 'shared'
+
+    def ready(self):
+        from . import signals  # noqa
@@ -0,0 +1,4 @@
+"""Query count, wall time & memory benchmarks of the main views.
+
+Run them with `python manage.py benchmark`.
+"""
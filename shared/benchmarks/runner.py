@@ -0,0 +1,204 @@
+import json
+import math
+import os
+import time
+import tracemalloc
+from collections import namedtuple
+
+from django.db import connection, reset_queries
+from django.db.backends.signals import connection_created
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from customers.models import Union
+from orders.models import Batch
+from shared.pagination import CursorPaginator
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+ViewCase = namedtuple('ViewCase', ['name', 'url'])
+
+
+class BenchmarkError(Exception):
+    """Raised when a benchmarked view doesn't respond successfully."""
+
+
+def get_view_cases():
+    """Returns the benchmarked views of the seeded database.
+
+    `OrderDetailView` has no template of its own; delivery orders are
+    rendered as panes of `BatchDetailView`, which covers them. The last page
+    of the union list checks that deep cursor pages cost the same as the
+    first one.
+
+    Returns:
+        cases (list<ViewCase>): the view names & urls to benchmark
+    """
+    batch = Batch.objects.order_by('created_at').first()
+    delivery_order = batch.delivery_orders.first()
+    unions = Union.objects.order_by('name', 'pk')
+    last_union = unions[max(unions.count() - 11, 0)]
+    cursor = CursorPaginator(unions, 10, ['name']).encode_cursor(last_union)
+    return [
+        ViewCase('OpenBatchListView', reverse('orders:open-batch-list')),
+        ViewCase(
+            'BatchDetailView',
+            reverse('orders:batch-detail', args=[batch.pk])
+        ),
+        ViewCase(
+            'AllocationCreateView',
+            reverse('orders:order-allocation-create', args=[delivery_order.pk])
+        ),
+        ViewCase('UnionListView', reverse('customers:union-list')),
+        ViewCase(
+            'UnionListView:last-page',
+            f'{reverse("customers:union-list")}?cursor={cursor}'
+        ),
+        ViewCase('SupplierListView', reverse('purchases:supplier-list')),
+        ViewCase('UserListView', reverse('users:user-list')),
+        ViewCase('SearchView', f'{reverse("shared:search")}?q=union'),
+    ]
+
+
+def get_percentile(values, percent):
+    """Returns the nearest-rank percentile of `values`."""
+    values = sorted(values)
+    rank = math.ceil(len(values) * percent / 100)
+    return values[max(rank, 1) - 1]
+
+
+def measure(client, url, repeat):
+    """Measures the query count, wall time & peak memory of a GET request.
+
+    The first request warms up the template loaders & caches and is not
+    measured. Memory is traced on a separate request, so that `tracemalloc`
+    doesn't inflate the timings.
+
+    Args:
+        client (Client): a logged in test client
+        url (str): the url to request
+        repeat (int): number of timed requests
+
+    Returns:
+        result (dict): the `queries`, `p95_ms` & `peak_kb` of the view
+    """
+    get(client, url)
+
+    timings, queries = [], 0
+    for _ in range(repeat):
+        reset_queries()
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            get(client, url)
+            timings.append(time.perf_counter() - start)
+        queries = max(queries, len(context.captured_queries))
+
+    tracemalloc.start()
+    try:
+        get(client, url)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'queries': queries,
+        'p95_ms': round(get_percentile(timings, 95) * 1000, 1),
+        'peak_kb': round(peak / 1024),
+    }
+
+
+def measure_throughput(client, url, repeat):
+    """Measures the requests per second & database work of a GET request.
+
+    Args:
+        client (Client): a logged in test client
+        url (str): the url to request
+        repeat (int): number of timed requests
+
+    Returns:
+        result (dict): the `rps`, `queries` per request & the number of
+            database `connections` opened
+    """
+    opened = []
+
+    def count_connection(**kwargs):
+        opened.append(kwargs['connection'].alias)
+
+    get(client, url)
+    connection_created.connect(count_connection)
+    try:
+        queries = 0
+        start = time.perf_counter()
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as context:
+                get(client, url)
+            queries += len(context.captured_queries)
+        elapsed = time.perf_counter() - start
+    finally:
+        connection_created.disconnect(count_connection)
+
+    return {
+        'rps': round(repeat / elapsed, 1),
+        'queries': round(queries / repeat, 1),
+        'connections': len(opened),
+    }
+
+
+def get(client, url):
+    """Requests `url` & ensures the view responds successfully."""
+    response = client.get(url)
+    if response.status_code != 200:
+        raise BenchmarkError(f'GET {url} returned {response.status_code}.')
+    return response
+
+
+def compare(results, baseline, time_tolerance):
+    """Returns the regressions of `results` against the stored `baseline`.
+
+    Query counts must not grow at all, while p95 wall times may exceed the
+    baseline by `time_tolerance` (a fraction) to absorb machine noise. Peak
+    memory is reported only.
+
+    Args:
+        results (dict): measured results keyed by view name
+        baseline (dict): stored results keyed by view name
+        time_tolerance (float|None): allowed p95 slowdown, `None` to skip
+
+    Returns:
+        regressions (list<str>): description of each regression
+    """
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+
+        if result['queries'] > expected['queries']:
+            regressions.append(
+                f'{name}: {result["queries"]} queries, '
+                f'baseline is {expected["queries"]}'
+            )
+
+        limit = expected['p95_ms'] * (1 + (time_tolerance or 0))
+        if time_tolerance is not None and result['p95_ms'] > limit:
+            regressions.append(
+                f'{name}: p95 {result["p95_ms"]}ms, '
+                f'baseline is {expected["p95_ms"]}ms'
+            )
+    return regressions
+
+
+def load_baseline(path=BASELINE_PATH):
+    """Returns the stored baselines keyed by scale, `{}` when missing."""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(baseline, path=BASELINE_PATH):
+    """Stores the baselines keyed by scale."""
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write('\n')
@@ -0,0 +1,154 @@
+import random
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import transaction
+
+from accounts.tests.factories import AdminUserFactory, StaffUserFactory, \
+    GuestUserFactory, SupplierUserFactory
+from customers.models import Customer, Location, Union
+from customers.tests.factories import CustomerFactory
+from orders.models import DeliveryOrder, Allocation, UnionAllocation, \
+    Distribution, UnionDistribution
+from orders.tests.factories import BatchFactory, DeliveryOrderFactory
+from purchases.tests.factories import ProductFactory, SupplierFactory
+
+
+User = get_user_model()
+
+
+# Data volumes of each benchmark scale. `ci` is small enough to run on every
+# build, `full` matches the production volume the baseline should guard.
+SCALES = {
+    'ci': {
+        'batches': 10,
+        'delivery_orders': 5,
+        'regions': 12,
+        'unions': 30,
+        'union_rows': 3,
+        'users': 40,
+    },
+    'full': {
+        'batches': 200,
+        'delivery_orders': 20,
+        'regions': 12,
+        'unions': 30,
+        'union_rows': 5,
+        'users': 200,
+    },
+}
+
+
+def seed(scale):
+    """Populates the database with the data volume of a benchmark scale.
+
+    Batches are built by the test factories and saved with `bulk_create`, so
+    seeding the `full` scale stays within minutes.
+
+    Args:
+        scale (str): name of the scale in `SCALES`
+
+    Returns:
+        admin (User): an active user with `Admin` role
+    """
+    volume = SCALES[scale]
+    rng = random.Random(scale)
+    call_command('loaddata', 'roles', 'units', 'ports', 'customers', verbosity=0)
+
+    with transaction.atomic():
+        customers = seed_regions(volume)
+        suppliers = SupplierFactory.create_batch(5)
+        products = ProductFactory.create_batch(5)
+        seed_users(volume, suppliers)
+
+        for _ in range(volume['batches']):
+            batch = BatchFactory(
+                product=rng.choice(products),
+                supplier=rng.choice(suppliers),
+                quantity=volume['delivery_orders'] * 100000,
+                rate=rng.randint(400, 900)
+            )
+            seed_delivery_orders(batch, customers, volume, rng)
+            batch.refresh_totals(cascade=True)
+
+    return AdminUserFactory(status=User.ACTIVE)
+
+
+def seed_regions(volume):
+    """Creates the regions (customers) with their unions & locations."""
+    customers = list(Customer.objects.all()[:volume['regions']])
+    missing = volume['regions'] - len(customers)
+    customers += CustomerFactory.create_batch(max(missing, 0))
+
+    for customer in customers:
+        customer.union_choices = [
+            Union(customer=customer, name=f'{customer.region} union {n}')
+            for n in range(volume['unions'])
+        ]
+        customer.location_choices = [
+            Location(customer=customer, name=f'{customer.region} location {n}')
+            for n in range(3)
+        ]
+        Union.objects.bulk_create(customer.union_choices)
+        Location.objects.bulk_create(customer.location_choices)
+    return customers
+
+
+def seed_users(volume, suppliers):
+    """Creates users of every role & status."""
+    factories = [AdminUserFactory, StaffUserFactory, GuestUserFactory]
+    statuses = [User.PENDING, User.ACTIVE, User.DISABLED]
+    for n in range(volume['users']):
+        status = statuses[n % len(statuses)]
+        if n % 4 == 3:
+            SupplierUserFactory(status=status, supplier=suppliers[n % 5])
+        else:
+            factories[n % len(factories)](status=status)
+
+
+def seed_delivery_orders(batch, customers, volume, rng):
+    """Creates fully allocated & distributed delivery orders of `batch`."""
+    delivery_orders = DeliveryOrderFactory.build_batch(
+        volume['delivery_orders'], batch=batch
+    )
+    DeliveryOrder.objects.bulk_create(delivery_orders)
+
+    allocations, union_allocations = [], []
+    distributions, union_distributions = [], []
+    for delivery_order in delivery_orders:
+        for customer in customers:
+            allocation = Allocation(
+                delivery_order=delivery_order, buyer=customer
+            )
+            distribution = Distribution(
+                delivery_order=delivery_order, buyer=customer
+            )
+            allocations.append(allocation)
+            distributions.append(distribution)
+
+            unions = rng.sample(customer.union_choices, volume['union_rows'])
+            for order, union in enumerate(unions):
+                location = rng.choice(customer.location_choices)
+                quantity = rng.randint(100, 1000)
+                shortage = rng.randint(0, 10)
+                union_allocations.append(UnionAllocation(
+                    allocation=allocation,
+                    union=union,
+                    location=location,
+                    quantity=quantity,
+                    _order=order
+                ))
+                union_distributions.append(UnionDistribution(
+                    distribution=distribution,
+                    union=union,
+                    location=location,
+                    quantity=quantity - shortage,
+                    shortage=shortage,
+                    over=0,
+                    _order=order
+                ))
+
+    Allocation.objects.bulk_create(allocations)
+    Distribution.objects.bulk_create(distributions)
+    UnionAllocation.objects.bulk_create(union_allocations)
+    UnionDistribution.objects.bulk_create(union_distributions)
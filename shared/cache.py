@@ -0,0 +1,109 @@
+"""Project cache helpers.
+
+The cache is shared by all the gunicorn & celery workers through Redis (the
+`django-redis` backend). The helpers work with any configured cache (e.g.
+`LocMemCache` in the tests):
+
+- `get_or_compute` returns a cached value or computes & stores it, with a
+  probabilistic early expiry to avoid cache stampedes on hot keys.
+- `make_key` & `bump_version` build versioned keys, so a whole namespace
+  is invalidated by bumping its version.
+- `get_stats` returns the per-process hit & miss counts of each namespace.
+"""
+import math
+import random
+import time
+from collections import Counter
+
+from django.core.cache import caches
+
+
+# Hit & miss counts of each namespace, per process
+STATS = Counter()
+
+
+def get_stats():
+    """Returns the hit & miss counts of each namespace.
+
+    Returns:
+        stats (dict<str, dict>): `hits` & `misses` counts by namespace
+    """
+    stats = {}
+    for (namespace, outcome), count in STATS.items():
+        stats.setdefault(namespace, {'hits': 0, 'misses': 0})[outcome] = count
+    return stats
+
+
+def reset_stats():
+    """Resets the hit & miss counts."""
+    STATS.clear()
+
+
+def get_version(namespace, alias='default'):
+    """Returns the current version of the `namespace` keys.
+
+    A missing (e.g. evicted) version restarts from the current time in
+    milliseconds, so it never goes back to a version used before.
+    """
+    cache = caches[alias]
+    key = f'{namespace}:version'
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(namespace, alias='default'):
+    """Invalidates all the keys of `namespace` by bumping its version."""
+    try:
+        return caches[alias].incr(f'{namespace}:version')
+    except ValueError:
+        return get_version(namespace, alias)
+
+
+def make_key(namespace, *parts, alias='default'):
+    """Returns a versioned key of `namespace` made of `parts`."""
+    version = get_version(namespace, alias)
+    return ':'.join([namespace, f'v{version}', *map(str, parts)])
+
+
+def get_or_compute(namespace, key, compute, timeout, value_type=None,
+                   alias='default', beta=1.0):
+    """Returns the cached value of `key`, computing & caching it on a miss.
+
+    The value is also recomputed a little before it expires, with a
+    probability growing as the expiry gets closer & the longer `compute`
+    takes (the "XFetch" algorithm). Usually a single worker then refreshes
+    a hot key, instead of all the workers missing it at the same time.
+
+    Args:
+        namespace (str): name of the cached values, used in the stats
+        key (str): the cache key, usually built with `make_key`
+        compute (callable): computes the value when it isn't cached
+        timeout (int): seconds to cache the value, 0 to skip the cache
+        value_type (type): cached values of another type are recomputed
+        beta (float): > 1 favors earlier recomputations, < 1 later ones
+
+    Returns:
+        value (object): the cached or the computed value
+    """
+    if not timeout:
+        return compute()
+
+    cache = caches[alias]
+    entry = cache.get(key)
+    if entry is not None:
+        value, delta, expiry = entry
+        early = delta * beta * math.log(random.random() or 1e-12)
+        if ((value_type is None or isinstance(value, value_type)) and
+                time.time() - early < expiry):
+            STATS[namespace, 'hits'] += 1
+            return value
+
+    STATS[namespace, 'misses'] += 1
+    start = time.time()
+    value = compute()
+    delta = time.time() - start
+    cache.set(key, (value, delta, time.time() + timeout), timeout)
+    return value
@@ -0,0 +1,100 @@
+"""Query plan helpers to make sure the hot queries use an index."""
+import json
+import re
+
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+
+
+SQLITE_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\w+)(.*)$')
+
+
+def get_full_scans(queryset):
+    """Returns the tables read by a full table scan in the queryset plan.
+
+    Supports the `EXPLAIN` output of MySQL (`access_type` "ALL") and SQLite
+    (a `SCAN` step without an index).
+
+    Returns:
+        tables (list<str>): the fully scanned tables
+    """
+    if connections[queryset.db].vendor == 'mysql':
+        plan = json.loads(queryset.explain(format='json'))
+        return list(_iter_mysql_full_scans(plan))
+    return _get_sqlite_full_scans(queryset.explain().splitlines())
+
+
+def get_sql_full_scans(sql, using='default'):
+    """Returns the tables read by a full table scan in the plan of `sql`.
+
+    Used on the statements captured from a view, with their parameters
+    already inlined (e.g. by `CaptureQueriesContext`).
+
+    Returns:
+        tables (list<str>): the fully scanned tables
+    """
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute(f'EXPLAIN FORMAT=JSON {sql}')
+            plan = json.loads(cursor.fetchone()[0])
+            return list(_iter_mysql_full_scans(plan))
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        lines = [' '.join(map(str, row)) for row in cursor.fetchall()]
+    return _get_sqlite_full_scans(lines)
+
+
+def _get_sqlite_full_scans(lines):
+    """Returns the tables of the SQLite plan lines with a full scan."""
+    tables = []
+    for line in lines:
+        match = SQLITE_SCAN.search(line)
+        if match and 'INDEX' not in match.group(2):
+            tables.append(match.group(1))
+    return tables
+
+
+def _iter_mysql_full_scans(node):
+    """Yields the tables of the MySQL JSON plan with a full scan."""
+    if isinstance(node, dict):
+        if node.get('access_type') == 'ALL':
+            yield node.get('table_name')
+        for value in node.values():
+            yield from _iter_mysql_full_scans(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _iter_mysql_full_scans(value)
+
+
+class QueryPlanMixin:
+    """TestCase mixin asserting the query plans of querysets."""
+
+    def assertUsesIndex(self, queryset, table=None):
+        """Asserts `queryset` (or its `table`) is not read by a full scan."""
+        table = table or queryset.model._meta.db_table
+        full_scans = get_full_scans(queryset)
+        self.assertNotIn(
+            table, full_scans,
+            f'{table} is fully scanned by: {queryset.query}'
+        )
+
+    def assertViewUsesIndexes(self, url, tables):
+        """Asserts none of the queries of a GET on `url` fully scans `tables`.
+
+        The plans are those of the statements the view actually executes,
+        so a view drifting off its indexes fails the assertion.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        statements = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].lstrip().upper().startswith('SELECT')
+        ]
+        for sql in statements:
+            full_scans = set(get_sql_full_scans(sql)) & set(tables)
+            self.assertFalse(
+                full_scans,
+                f'{", ".join(sorted(full_scans))} fully scanned by: {sql}'
+            )
+        return statements
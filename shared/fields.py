@@ -1,4 +1,5 @@
 from django import forms
+from django.core.exceptions import ValidationError
 
 
 class FormattedNumberField(forms.DecimalField):
@@ -7,3 +8,45 @@ class FormattedNumberField(forms.DecimalField):
     def to_python(self, value):
         value = value.replace(',', '')
         return super().to_python(value)
+
+
+class PrefetchedModelChoiceField(forms.ModelChoiceField):
+    """Model choice field validated against prefetched objects.
+
+    Once `set_objects` is called, the submitted value is looked up in the
+    given objects instead of querying the `queryset`. The objects can be
+    loaded once & shared by the fields of all the forms of a formset.
+    """
+    objects = None
+
+    def set_objects(self, objects):
+        """Sets the valid choices.
+
+        Args:
+            objects (dict): the model instances by primary key string
+        """
+        self.objects = objects
+        self.widget.choices = self.choices
+
+    def _get_choices(self):
+        if self.objects is None:
+            return super()._get_choices()
+        choices = [(obj.pk, self.label_from_instance(obj))
+                   for obj in self.objects.values()]
+        if self.empty_label is not None:
+            choices.insert(0, ('', self.empty_label))
+        return choices
+
+    choices = property(_get_choices, forms.ChoiceField._set_choices)
+
+    def to_python(self, value):
+        if self.objects is None:
+            return super().to_python(value)
+        if value in self.empty_values:
+            return None
+        try:
+            return self.objects[str(value)]
+        except KeyError:
+            raise ValidationError(
+                self.error_messages['invalid_choice'], code='invalid_choice'
+            )
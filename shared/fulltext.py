@@ -0,0 +1,100 @@
+"""MySQL FULLTEXT index support.
+
+Other database backends (e.g. SQLite used by the tests) don't get the
+indexes, so searches on them fall back to `icontains` filters.
+"""
+import re
+
+from django.db.migrations.operations.base import Operation
+from django.db.models import FloatField, Func, Q
+
+
+TERM_PATTERN = re.compile(r'\w+')
+
+
+def get_terms(query):
+    """Returns the words of a search query, without boolean operators."""
+    return TERM_PATTERN.findall(query or '')
+
+
+def supports_fulltext(connection):
+    """Returns `True` if the database connection has FULLTEXT indexes."""
+    return connection.vendor == 'mysql'
+
+
+class Match(Func):
+    """Relevance of the matched FULLTEXT index in boolean mode.
+
+    Each term of the query is required & matched as a prefix, so that
+    partial vessel names or B/L numbers are found as well.
+    """
+    function = 'MATCH'
+    output_field = FloatField()
+
+    def __init__(self, *fields, query):
+        super().__init__(*fields)
+        self.query = ' '.join(f'+{term}*' for term in get_terms(query))
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sql, params = super().as_sql(compiler, connection, **extra_context)
+        return f'{sql} AGAINST (%s IN BOOLEAN MODE)', params + [self.query]
+
+
+def get_fallback_filter(fields, query):
+    """Returns a filter matching all the query terms on any of `fields`."""
+    condition = Q()
+    for term in get_terms(query):
+        term_condition = Q()
+        for field in fields:
+            term_condition |= Q(**{f'{field}__icontains': term})
+        condition &= term_condition
+    return condition
+
+
+class AddFullTextIndex(Operation):
+    """Migration operation creating a FULLTEXT index on MySQL only.
+
+    The index isn't part of the model state, since Django 2.2 indexes can't
+    be FULLTEXT.
+    """
+    reduces_to_sql = True
+    reversible = True
+
+    def __init__(self, model_name, name, fields):
+        self.model_name = model_name
+        self.name = name
+        self.fields = fields
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if not supports_fulltext(schema_editor.connection):
+            return
+        model = to_state.apps.get_model(app_label, self.model_name)
+        quote_name = schema_editor.quote_name
+        columns = ', '.join(
+            quote_name(model._meta.get_field(field).column)
+            for field in self.fields
+        )
+        schema_editor.execute(
+            f'ALTER TABLE {quote_name(model._meta.db_table)} '
+            f'ADD FULLTEXT INDEX {quote_name(self.name)} ({columns})'
+        )
+
+    def database_backwards(self, app_label, schema_editor, from_state,
+                           to_state):
+        if not supports_fulltext(schema_editor.connection):
+            return
+        model = from_state.apps.get_model(app_label, self.model_name)
+        quote_name = schema_editor.quote_name
+        schema_editor.execute(
+            f'ALTER TABLE {quote_name(model._meta.db_table)} '
+            f'DROP INDEX {quote_name(self.name)}'
+        )
+
+    def describe(self):
+        return (
+            f'Create FULLTEXT index {self.name} on field(s) '
+            f'{", ".join(self.fields)} of model {self.model_name}'
+        )
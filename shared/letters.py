@@ -1,7 +1,57 @@
 """Module for generating letters in MS-Word docx file format."""
+import copy
+import os
+import re
+import tempfile
+import zipfile
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
 from docx import Document
 from docx.shared import Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml.ns import qn
+from lxml import etree
+
+
+# Mode of the replaced files, when the storage doesn't set one, so that
+# the web server can still serve them
+DEFAULT_FILE_MODE = 0o644
+
+
+def replace_file(storage, name, content):
+    """Stores `content` as `name`, replacing the stored file if any.
+
+    `Storage.save` picks another name when `name` already exists, e.g. when
+    two jobs generate the same letter. Local files are written to a
+    temporary file which is then renamed to `name`, so readers never see
+    a partial file. Other storages delete the stored file first.
+
+    Returns:
+        name (str): the name of the stored file, always `name`
+    """
+    try:
+        path = storage.path(name)
+    except NotImplementedError:
+        storage.delete(name)
+        return storage.save(name, content)
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in content.chunks():
+                f.write(chunk)
+        mode = getattr(storage, 'file_permissions_mode', None)
+        os.chmod(temp_path, mode or DEFAULT_FILE_MODE)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return name
 
 
 class Text:
@@ -150,3 +200,153 @@ class LetterTemplate:
         self._build()
         self.document.save(response)
         return response
+
+    def save(self, name, storage=default_storage):
+        """Generate docx letter file & store it in the file storage.
+
+        Args:
+            name (str): file name of the letter in the storage
+            storage (Storage): the file storage, default is the media storage
+
+        Returns:
+            name (str): the name of the stored letter, always `name`
+        """
+        content = BytesIO()
+        self.generate(content)
+        return replace_file(storage, name, ContentFile(content.getvalue()))
+
+
+class DocxTemplate:
+    """A docx package rendered by filling the placeholders of its content.
+
+    Placeholders are written as `{{ name }}` inside a single run. Paragraphs
+    with `{{ section.name }}` placeholders are repeated once for each item of
+    the `section` list passed to `render`.
+
+    Only the main document part is parsed & copied per render, the other
+    package parts (styles, numbering, theme...) are written as they are.
+    """
+    DOCUMENT_PART = 'word/document.xml'
+    PLACEHOLDER = re.compile(r'{{ ?([\w.]+) ?}}')
+
+    def __init__(self, document):
+        """Initialize the instance object.
+
+        Args:
+            document (Document object): python-docx document with placeholders
+        """
+        content = BytesIO()
+        document.save(content)
+        with zipfile.ZipFile(content) as package:
+            self.parts = [
+                (info, package.read(info)) for info in package.infolist()
+            ]
+        self.root = copy.deepcopy(document.element)
+
+    def render(self, output, context, sections=None):
+        """Writes the docx file with the filled placeholders to `output`.
+
+        Args:
+            output (file object): writable binary file object
+            context (dict): values of the placeholders
+            sections (dict<str, list<dict>>): values of the repeated paragraphs
+        """
+        root = copy.deepcopy(self.root)
+        for section, items in (sections or {}).items():
+            self._repeat(root, section, items)
+        self._fill(root, context)
+        content = etree.tostring(
+            root, xml_declaration=True, encoding='UTF-8', standalone=True
+        )
+
+        with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as package:
+            for info, data in self.parts:
+                if info.filename == self.DOCUMENT_PART:
+                    data = content
+                package.writestr(info, data)
+
+    def _repeat(self, root, section, items):
+        """Clones the paragraphs of `section` for each of the `items`."""
+        prefix = f'{section}.'
+        for paragraph in list(root.iter(qn('w:p'))):
+            text = ''.join(paragraph.itertext())
+            if '{{ ' + prefix not in text and '{{' + prefix not in text:
+                continue
+            for item in items:
+                clone = copy.deepcopy(paragraph)
+                self._fill(clone, {f'{prefix}{k}': v for k, v in item.items()})
+                paragraph.addprevious(clone)
+            paragraph.getparent().remove(paragraph)
+
+    def _fill(self, element, context):
+        """Replaces the placeholders of the text nodes of `element`."""
+        def replace(match):
+            return str(context.get(match.group(1), match.group(0)))
+
+        for text in element.iter(qn('w:t')):
+            if text.text and '{{' in text.text:
+                text.text = self.PLACEHOLDER.sub(replace, text.text)
+                text.set(qn('xml:space'), 'preserve')
+
+
+class TemplateLetter:
+    """Base class for letters rendered from a docx template.
+
+    The template is built once per process by the `layout_class` letter
+    (a `LetterTemplate` subclass) with placeholders as its values, so each
+    letter only fills the placeholders instead of building the document.
+
+    Attributes:
+        layout_class: `LetterTemplate` subclass taking `context` & `sections`
+        placeholders: names of the placeholders
+        sections: names of the placeholders of each repeated paragraph
+    """
+    layout_class = None
+    placeholders = []
+    sections = {}
+    _template = None
+
+    @classmethod
+    def get_template(cls):
+        """Returns the docx template of the letter class."""
+        if cls.__dict__.get('_template') is None:
+            context = {name: f'{{{{ {name} }}}}' for name in cls.placeholders}
+            sections = {
+                section: [{
+                    name: f'{{{{ {section}.{name} }}}}' for name in names
+                }]
+                for section, names in cls.sections.items()
+            }
+            layout = cls.layout_class(context, sections)
+            layout._build()
+            cls._template = DocxTemplate(layout.document)
+        return cls._template
+
+    def get_context(self):
+        """Returns the values of the placeholders."""
+        raise NotImplementedError
+
+    def get_sections(self):
+        """Returns the placeholder values of each repeated paragraph."""
+        return {}
+
+    def generate(self, response, *args, **kwargs):
+        """Generate docx letter file.
+
+        Returns:
+            response (HttpResponse): HTTP response object with generated file
+        """
+        self.get_template().render(
+            response, self.get_context(), self.get_sections()
+        )
+        return response
+
+    def save(self, name, storage=default_storage):
+        """Generate docx letter file & store it in the file storage.
+
+        Returns:
+            name (str): the name of the stored letter, always `name`
+        """
+        content = BytesIO()
+        self.generate(content)
+        return replace_file(storage, name, ContentFile(content.getvalue()))
@@ -0,0 +1,99 @@
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import get_runner, setup_test_environment, \
+    teardown_test_environment
+
+from shared.benchmarks.runner import BenchmarkError, get_view_cases, measure, \
+    compare, load_baseline, save_baseline
+from shared.benchmarks.seed import SCALES, seed
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the main views on a seeded test database and fail when '
+        'a query count or p95 time regresses beyond the stored baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            choices=sorted(SCALES),
+            default='ci',
+            help='Data volume to seed before benchmarking.'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Number of timed requests per view.'
+        )
+        parser.add_argument(
+            '--time-tolerance',
+            type=float,
+            default=0.5,
+            help='Allowed p95 slowdown over the baseline as a fraction.'
+        )
+        parser.add_argument(
+            '--queries-only',
+            action='store_true',
+            help='Only fail on query count regressions.'
+        )
+        parser.add_argument(
+            '--update-baseline',
+            action='store_true',
+            help='Store the results as the new baseline of the scale.'
+        )
+
+    def handle(self, *args, **options):
+        scale = options['scale']
+        test_runner = get_runner(settings)(verbosity=0, interactive=False)
+        setup_test_environment(debug=False)
+        old_config = test_runner.setup_databases()
+        try:
+            results = self.run_benchmarks(scale, options['repeat'])
+        except BenchmarkError as e:
+            raise CommandError(e)
+        finally:
+            test_runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+        baseline = load_baseline()
+        if options['update_baseline']:
+            baseline[scale] = results
+            save_baseline(baseline)
+            self.stdout.write(f'Baseline of `{scale}` scale is updated.')
+            return
+
+        if scale not in baseline:
+            self.stdout.write(f'There is no baseline for `{scale}` scale.')
+
+        time_tolerance = options['time_tolerance']
+        if options['queries_only']:
+            time_tolerance = None
+        regressions = compare(results, baseline.get(scale, {}), time_tolerance)
+        if regressions:
+            raise CommandError(
+                'Performance regressions found:\n' + '\n'.join(regressions)
+            )
+        self.stdout.write('No performance regressions found.')
+
+    def run_benchmarks(self, scale, repeat):
+        """Seeds the test database & measures every benchmarked view."""
+        self.stdout.write(f'Seeding `{scale}` scale data...')
+        admin = seed(scale)
+        client = Client()
+        client.force_login(admin)
+
+        results = {}
+        self.stdout.write(
+            f'{"View":<24}{"Queries":>8}{"p95 (ms)":>12}{"Peak (KB)":>12}'
+        )
+        for case in get_view_cases():
+            result = measure(client, case.url, repeat)
+            results[case.name] = result
+            self.stdout.write(
+                f'{case.name:<24}{result["queries"]:>8}'
+                f'{result["p95_ms"]:>12}{result["peak_kb"]:>12}'
+            )
+        return results
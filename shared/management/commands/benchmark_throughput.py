@@ -0,0 +1,95 @@
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import get_runner, setup_test_environment, \
+    teardown_test_environment
+from django.urls import reverse
+
+from shared.benchmarks.runner import BenchmarkError, measure_throughput
+from shared.benchmarks.seed import SCALES, seed
+
+
+# Session engine & persistent connection settings of each profile
+PROFILES = {
+    'default': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+        'CONN_MAX_AGE': 0,
+        'CONN_HEALTH_CHECKS': False,
+    },
+    'production': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db',
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the requests per second of the open batch list with the '
+        'default & the production session and connection settings.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            choices=sorted(SCALES),
+            default='ci',
+            help='Data volume to seed before benchmarking.'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=200,
+            help='Number of timed requests per profile.'
+        )
+
+    def handle(self, *args, **options):
+        test_runner = get_runner(settings)(verbosity=0, interactive=False)
+        setup_test_environment(debug=False)
+        old_config = test_runner.setup_databases()
+        try:
+            self.stdout.write(f'Seeding `{options["scale"]}` scale data...')
+            admin = seed(options['scale'])
+            self.stdout.write(
+                f'{"Profile":<12}{"Req/s":>8}{"Queries":>9}{"Connects":>10}'
+            )
+            for name, profile in PROFILES.items():
+                result = self.run_profile(admin, profile, options['repeat'])
+                self.stdout.write(
+                    f'{name:<12}{result["rps"]:>8}{result["queries"]:>9}'
+                    f'{result["connections"]:>10}'
+                )
+        except BenchmarkError as e:
+            raise CommandError(e)
+        finally:
+            test_runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+        if connection.vendor == 'sqlite':
+            self.stdout.write(
+                'SQLite in-memory databases are never reconnected, run '
+                'against MySQL to measure the persistent connections.'
+            )
+
+    def run_profile(self, user, profile, repeat):
+        """Measures the open batch list with the `profile` settings."""
+        settings_dict = connection.settings_dict
+        old_values = {
+            key: settings_dict.get(key)
+            for key in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS')
+        }
+        settings_dict['CONN_MAX_AGE'] = profile['CONN_MAX_AGE']
+        settings_dict['CONN_HEALTH_CHECKS'] = profile['CONN_HEALTH_CHECKS']
+        connection.close()
+        try:
+            with override_settings(SESSION_ENGINE=profile['SESSION_ENGINE']):
+                client = Client()
+                client.force_login(user)
+                return measure_throughput(
+                    client, reverse('orders:open-batch-list'), repeat
+                )
+        finally:
+            settings_dict.update(old_values)
+            connection.close()
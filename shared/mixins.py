@@ -1,14 +1,76 @@
+import hashlib
+
 from django.conf import settings
+from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth.models import Group
+from django.core.files.storage import default_storage
+from django.db.models import Count, Max
+from django.http import FileResponse, HttpResponse
+from django.middleware.csrf import get_token
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.encoding import escape_uri_path
+from django.utils.http import http_date, quote_etag
 from django.views.generic.base import ContextMixin
 
 
 User = get_user_model()
 
 
+def has_access(user, access_roles):
+    """Returns `True` if the user is active & has one of `access_roles`.
+
+    Args:
+        user (User): the authenticated user
+        access_roles (list|str): role names, or `'__all__'` for any role
+    """
+    if user.is_superuser:
+        return True
+
+    if user.status != User.ACTIVE or user.role is None:
+        return False
+
+    return access_roles == '__all__' or user.role.name in access_roles
+
+
+def get_version(queryset, fields=('updated_at', ), counts=(), extra=()):
+    """Returns the version stamp of the rows of `queryset`.
+
+    The stamp is computed with a single aggregate query, from the latest
+    `fields` timestamps & the distinct `counts` row counts (which catch
+    deleted rows).
+
+    Args:
+        queryset (QuerySet): the rows a response is built from
+        fields (tuple<str>): the timestamp fields, e.g. `updated_at`
+        counts (tuple<str>): the counted related rows, e.g. `delivery_orders`
+        extra (iterable<str>): other values the response depends on, e.g.
+            the request path
+
+    Returns:
+        version (tuple): `(etag, last_modified)`, the time is `None` for an
+            empty queryset
+    """
+    aggregates = {f'updated_{n}': Max(field) for n, field in enumerate(fields)}
+    aggregates.update({
+        f'count_{n}': Count(field, distinct=True)
+        for n, field in enumerate(counts)
+    })
+    values = queryset.order_by().aggregate(**aggregates)
+    timestamps = [values[f'updated_{n}'] for n in range(len(fields))]
+    timestamps = [value for value in timestamps if value is not None]
+    last_modified = max(timestamps) if timestamps else None
+    fingerprint = '|'.join([
+        *extra,
+        *(str(values[f'count_{n}']) for n in range(len(counts))),
+        *(value.isoformat() for value in timestamps)
+    ])
+    etag = hashlib.md5(fingerprint.encode()).hexdigest()
+    return etag, last_modified
+
+
 class BaseViewMixin(ContextMixin):
     """
     Base view for all views.
@@ -31,16 +93,7 @@ class BaseAccessMixin(LoginRequiredMixin, UserPassesTestMixin, BaseViewMixin):
     access_roles = []
 
     def test_func(self):
-        user = self.request.user
-        if user.is_superuser:
-            return True
-
-        if user.status != User.ACTIVE or user.role is None:
-            return False
-
-        elif (self.access_roles == '__all__' or
-                user.role.name in self.access_roles or user.is_superuser):
-            return True
+        return has_access(self.request.user, self.access_roles)
 
     def get_permission_denied_message(self):
         user = self.request.user
@@ -52,6 +105,67 @@ class BaseAccessMixin(LoginRequiredMixin, UserPassesTestMixin, BaseViewMixin):
             return "You don't have the right permission to access this page."
 
 
+class ConditionalPageMixin:
+    """
+    Mixin answering the conditional GET requests of detail pages.
+
+    The `ETag` & `Last-Modified` headers are derived from the `version_fields`
+    timestamps of the viewed object tree, the page URL & the user role. A
+    browser revalidating a current copy gets a `304 Not Modified` response
+    after a single aggregate query, before the page is rendered.
+    """
+    version_fields = ('updated_at', )
+    version_counts = ()
+
+    def get_version_queryset(self):
+        """Returns the queryset of the object the page is rendered from."""
+        pk = self.kwargs.get(self.pk_url_kwarg)
+        return self.get_queryset().filter(pk=pk)
+
+    def get_version_extra(self):
+        """Returns the request values the rendered page depends on."""
+        request = self.request
+        user = request.user
+        # The page forms embed the CSRF token, which is rotated on login
+        get_token(request)
+        return [
+            request.get_full_path(),
+            str(user.pk),
+            user.role.name if user.role is not None else '',
+            request.META['CSRF_COOKIE'],
+        ]
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = get_version(
+            self.get_version_queryset(),
+            self.version_fields,
+            self.version_counts,
+            self.get_version_extra()
+        )
+        etag = quote_etag(etag)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        # Missing objects get their 404 & pending messages a full render
+        if timestamp is not None and not len(messages.get_messages(request)):
+            response = get_conditional_response(
+                request, etag=etag, last_modified=timestamp
+            )
+            if response is not None:
+                return self.set_version_headers(response, etag, timestamp)
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200 and timestamp is not None:
+            self.set_version_headers(response, etag, timestamp)
+        return response
+
+    def set_version_headers(self, response, etag, timestamp):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(timestamp)
+        # Browsers must revalidate the page, shared caches can't store it
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
 class BaseSettingsMixin(BaseAccessMixin):
     """
     Base view for all settings pages.
@@ -62,3 +176,28 @@ class BaseSettingsMixin(BaseAccessMixin):
     def get_context_data(self, **kwargs):
         kwargs.update(setting_name=self.setting_name)
         return super().get_context_data(**kwargs)
+
+
+class MediaFileMixin:
+    """
+    Mixin to serve files of the media storage as attachments.
+
+    When `MEDIA_X_ACCEL_REDIRECT` is set, the file is sent by nginx through
+    the `X-Accel-Redirect` header instead of streaming it from Django.
+    """
+    content_type = None
+
+    def get_file_response(self, name, filename):
+        """Returns a response serving the media file `name` as `filename`."""
+        prefix = settings.MEDIA_X_ACCEL_REDIRECT
+        if prefix:
+            response = HttpResponse(content_type=self.content_type)
+            response['X-Accel-Redirect'] = escape_uri_path(f'{prefix}{name}')
+            response['Content-Disposition'] = f'attachment; filename={filename}'
+            return response
+        return FileResponse(
+            default_storage.open(name, 'rb'),
+            as_attachment=True,
+            filename=filename,
+            content_type=self.content_type
+        )
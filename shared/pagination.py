@@ -0,0 +1,191 @@
+"""Keyset (cursor) pagination for the list views.
+
+Unlike the offset paginator, a page is fetched by filtering on the ordering
+values of the last (or first) row of the adjacent page, so deep pages cost
+the same as the first one and no `COUNT(*)` query is needed.
+"""
+import base64
+import binascii
+import datetime
+import json
+import uuid
+from decimal import Decimal
+
+from django.db.models import Q
+from django.http import Http404
+
+
+class InvalidCursor(Exception):
+    """Raised when a cursor can't be decoded."""
+
+
+class CursorPage:
+    """A page of objects fetched with a `CursorPaginator`.
+
+    Attributes:
+        object_list (list): objects of the page
+        paginator (CursorPaginator): the paginator of the page
+        next_cursor (str): cursor of the next page, `None` on the last page
+        previous_cursor (str): cursor of the previous page, `None` on the
+            first page
+    """
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self)} objects>'
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Paginates a queryset on the values of its (non-null) ordering fields.
+
+    The primary key is always added as the last ordering field, so the
+    position of each row (and therefore each cursor) is unique & stable.
+
+    Attributes:
+        queryset (QuerySet): the objects to paginate
+        per_page (int): maximum number of objects of each page
+        ordering (tuple): field names, prefixed with `-` for descending order
+    """
+
+    def __init__(self, queryset, per_page, ordering):
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        if not any(field.lstrip('-') == 'pk' for field in self.ordering):
+            self.ordering += ('pk', )
+        self.queryset = queryset.order_by(*self.ordering)
+
+    def page(self, cursor=None):
+        """Returns the page starting after (or ending before) `cursor`.
+
+        Raises:
+            InvalidCursor: if the cursor is not a valid cursor of the ordering
+        """
+        if cursor:
+            values, reverse = self.decode_cursor(cursor)
+        else:
+            values, reverse = None, False
+
+        queryset = self.queryset
+        if reverse:
+            queryset = queryset.reverse()
+        if values is not None:
+            queryset = queryset.filter(self.get_position_filter(values, reverse))
+
+        # One extra row tells whether there is a page beyond this one
+        object_list = list(queryset[:self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+        if reverse:
+            object_list.reverse()
+
+        next_cursor = previous_cursor = None
+        if object_list:
+            if has_more or reverse:
+                next_cursor = self.encode_cursor(object_list[-1])
+            if values is not None and (has_more or not reverse):
+                previous_cursor = self.encode_cursor(
+                    object_list[0], reverse=True
+                )
+        return CursorPage(object_list, self, next_cursor, previous_cursor)
+
+    def get_position_filter(self, values, reverse=False):
+        """Returns a filter matching the rows after the `values` position.
+
+        For an ordering `(a, -b, pk)` the rows after `(x, y, z)` are the ones
+        with `a > x`, or `a = x and b < y`, or `a = x and b = y and pk > z`.
+        """
+        position = Q()
+        equal = {}
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            lookup = f'{name}__lt' if descending else f'{name}__gt'
+            position |= Q(**equal, **{lookup: value})
+            equal[name] = value
+        return position
+
+    def encode_cursor(self, obj, reverse=False):
+        """Returns the opaque cursor of the `obj` position.
+
+        Returns:
+            cursor (str): URL-safe base64 encoded ordering values
+        """
+        values = [
+            self.encode_value(getattr(obj, field.lstrip('-')))
+            for field in self.ordering
+        ]
+        data = json.dumps({'v': values, 'r': reverse}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """Returns the ordering values & direction of `cursor`.
+
+        Raises:
+            InvalidCursor: if the cursor is not a valid cursor of the ordering
+        """
+        try:
+            padding = '=' * (-len(cursor) % 4)
+            data = json.loads(base64.urlsafe_b64decode(cursor + padding))
+            values, reverse = data['v'], data['r']
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise InvalidCursor(cursor)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise InvalidCursor(cursor)
+        return values, bool(reverse)
+
+    def encode_value(self, value):
+        """Returns a JSON serializable version of an ordering value.
+
+        Unlike `DjangoJSONEncoder`, datetimes keep their microseconds so that
+        rows created in the same millisecond are not skipped.
+        """
+        if isinstance(value, (datetime.date, datetime.time)):
+            return value.isoformat()
+        if isinstance(value, (uuid.UUID, Decimal)):
+            return str(value)
+        return value
+
+
+class CursorPaginationMixin:
+    """List view mixin paginating with cursors instead of page numbers.
+
+    Views opt in by setting `cursor_ordering`. The cursor of the requested
+    page is read from the `cursor_kwarg` query parameter.
+    """
+    cursor_ordering = None
+    cursor_kwarg = 'cursor'
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.cursor_ordering is None:
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = CursorPaginator(queryset, page_size, self.cursor_ordering)
+        cursor = self.request.GET.get(self.cursor_kwarg)
+        try:
+            page = paginator.page(cursor)
+        except InvalidCursor:
+            raise Http404('Invalid cursor.')
+        return (paginator, page, page.object_list, page.has_other_pages())
@@ -0,0 +1,180 @@
+"""Global search across batches, delivery orders, suppliers, unions and
+products.
+
+On MySQL each source is matched against its FULLTEXT index & ranked by
+relevance; the results of all the sources are then merged by score.
+"""
+from collections import namedtuple
+from urllib.parse import urlencode
+
+from django.db import connections
+from django.db.models import Case, FloatField, When
+from django.urls import reverse
+
+from customers.models import Union
+from orders.models import Batch, DeliveryOrder
+from purchases.models import Product, Supplier
+from shared.fulltext import Match, get_fallback_filter, get_terms, \
+    supports_fulltext
+
+
+SEARCH_RESULT_LIMIT = 100
+
+SearchResult = namedtuple(
+    'SearchResult', ['label', 'title', 'description', 'url', 'score']
+)
+
+
+class SearchSource:
+    """Base class of the searchable models.
+
+    Attributes:
+        label: the result type shown to the users
+        model: the searched model
+        fields: the searched fields, covered by the model FULLTEXT index
+    """
+    label = None
+    model = None
+    fields = []
+
+    def get_queryset(self):
+        return self.model.objects.all()
+
+    def search(self, query, limit=SEARCH_RESULT_LIMIT):
+        """Returns the `limit` most relevant results matching `query`.
+
+        Returns:
+            results (list<SearchResult>): the results, most relevant first
+        """
+        queryset = self.get_queryset()
+        if supports_fulltext(connections[queryset.db]):
+            queryset = queryset.annotate(
+                score=Match(*self.fields, query=query)
+            ).filter(score__gt=0)
+        else:
+            # Prefix matches of the main field come first
+            queryset = queryset.filter(
+                get_fallback_filter(self.fields, query)
+            ).annotate(
+                score=Case(
+                    When(**{f'{self.fields[0]}__istartswith': query}, then=2),
+                    default=1,
+                    output_field=FloatField()
+                )
+            )
+        return [
+            SearchResult(
+                label=self.label,
+                title=self.get_title(obj),
+                description=self.get_description(obj),
+                url=self.get_url(obj),
+                score=obj.score
+            )
+            for obj in queryset.order_by('-score')[:limit]
+        ]
+
+    def get_title(self, obj):
+        return str(obj)
+
+    def get_description(self, obj):
+        return ''
+
+    def get_url(self, obj):
+        raise NotImplementedError
+
+
+class BatchSource(SearchSource):
+    label = 'Batch'
+    model = Batch
+    fields = ['name', 'lc_number']
+
+    def get_queryset(self):
+        return Batch.objects.select_related('product', 'supplier')
+
+    def get_description(self, obj):
+        return f'L/C {obj.lc_number} · {obj.product} · {obj.supplier}'
+
+    def get_url(self, obj):
+        return reverse('orders:batch-detail', args=[obj.pk])
+
+
+class DeliveryOrderSource(SearchSource):
+    label = 'Delivery Order'
+    model = DeliveryOrder
+    fields = ['vessel', 'bill_of_loading']
+
+    def get_queryset(self):
+        return DeliveryOrder.objects.filter(
+            batch__isnull=False
+        ).select_related('batch')
+
+    def get_description(self, obj):
+        return f'B/L {obj.bill_of_loading} · {obj.batch}'
+
+    def get_url(self, obj):
+        url = reverse('orders:batch-detail', args=[obj.batch_id])
+        return f'{url}?{urlencode({"active_delivery_order": obj.pk})}'
+
+
+class SupplierSource(SearchSource):
+    label = 'Supplier'
+    model = Supplier
+    fields = ['name', 'short_name']
+
+    def get_description(self, obj):
+        return obj.short_name
+
+    def get_url(self, obj):
+        url = reverse('purchases:supplier-list')
+        return f'{url}?{urlencode({"search": obj.name})}'
+
+
+class UnionSource(SearchSource):
+    label = 'Union'
+    model = Union
+    fields = ['name']
+
+    def get_queryset(self):
+        return Union.objects.select_related('customer')
+
+    def get_description(self, obj):
+        return obj.customer.region
+
+    def get_url(self, obj):
+        url = reverse('customers:union-list')
+        return f'{url}?{urlencode({"search": obj.name})}'
+
+
+class ProductSource(SearchSource):
+    label = 'Product'
+    model = Product
+    fields = ['name']
+
+    def get_url(self, obj):
+        url = reverse('purchases:product-list')
+        return f'{url}?{urlencode({"search": obj.name})}'
+
+
+SEARCH_SOURCES = [
+    BatchSource(),
+    DeliveryOrderSource(),
+    SupplierSource(),
+    UnionSource(),
+    ProductSource(),
+]
+
+
+def search(query, limit=SEARCH_RESULT_LIMIT):
+    """Returns the `limit` most relevant results of all the sources.
+
+    Returns:
+        results (list<SearchResult>): the results, most relevant first
+    """
+    if not get_terms(query):
+        return []
+
+    results = []
+    for source in SEARCH_SOURCES:
+        results.extend(source.search(query, limit))
+    results.sort(key=lambda result: result.score, reverse=True)
+    return results[:limit]
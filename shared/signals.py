@@ -0,0 +1,57 @@
+import time
+
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+# Seconds a connection stays trusted after its last query, MySQL drops the
+# idle connections only after `wait_timeout` (hours by default)
+HEALTH_CHECK_INTERVAL = 5
+
+
+def get_checked_connections():
+    """Returns the open connections with `CONN_HEALTH_CHECKS` enabled."""
+    return [
+        conn for conn in connections.all()
+        if (conn.connection is not None and
+            conn.settings_dict.get('CONN_HEALTH_CHECKS'))
+    ]
+
+
+@receiver(request_started)
+def check_connection_health(**kwargs):
+    """Closes the persistent database connections that are no longer usable.
+
+    Django 2.2 only checks a reused connection after a database error, so
+    a connection dropped by MySQL (e.g. after `wait_timeout`) would fail
+    the next request. Enabled per database with `CONN_HEALTH_CHECKS`.
+
+    The connections used in the last `HEALTH_CHECK_INTERVAL` seconds are
+    not pinged, so busy workers don't pay a round trip on every request.
+    """
+    now = time.monotonic()
+    for conn in get_checked_connections():
+        last_used = getattr(conn, 'last_used_at', None)
+        if last_used is not None and now - last_used < HEALTH_CHECK_INTERVAL:
+            continue
+        if conn.is_usable():
+            conn.last_used_at = now
+        else:
+            conn.close()
+
+
+def record_connection_use(execute, sql, params, many, context):
+    """Execute wrapper recording the last successful query of a connection."""
+    result = execute(sql, params, many, context)
+    context['connection'].last_used_at = time.monotonic()
+    return result
+
+
+@receiver(connection_created)
+def track_connection_use(sender, connection, **kwargs):
+    """Records the queries of the connections with health checks."""
+    if (connection.settings_dict.get('CONN_HEALTH_CHECKS') and
+            record_connection_use not in connection.execute_wrappers):
+        connection.execute_wrappers.append(record_connection_use)
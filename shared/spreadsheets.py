@@ -0,0 +1,307 @@
+"""Module for streaming CSV & Excel spreadsheets row by row.
+
+The rows are encoded as they are consumed, so the memory usage doesn't
+grow with the number of rows (e.g. rows read with `QuerySet.iterator`).
+Uploaded spreadsheets are likewise read one row at a time.
+"""
+import codecs
+import csv
+import datetime
+import posixpath
+import re
+import zipfile
+from decimal import Decimal
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+from .zipstream import stream_zip
+
+
+# Number of encoded rows joined in each streamed chunk
+ROWS_PER_CHUNK = 500
+
+CSV_CONTENT_TYPE = 'text/csv'
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+CONTENT_TYPES_XML = (
+    XML_DECLARATION +
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '{overrides}'
+    '</Types>'
+)
+
+SHEET_OVERRIDE_XML = (
+    '<Override PartName="/xl/worksheets/sheet{number}.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+)
+
+ROOT_RELS_XML = (
+    XML_DECLARATION +
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+WORKBOOK_XML = (
+    XML_DECLARATION +
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets>{sheets}</sheets>'
+    '</workbook>'
+)
+
+WORKBOOK_SHEET_XML = '<sheet name="{title}" sheetId="{number}" r:id="rId{number}"/>'
+
+WORKBOOK_RELS_XML = (
+    XML_DECLARATION +
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '{relationships}'
+    '</Relationships>'
+)
+
+WORKBOOK_REL_XML = (
+    '<Relationship Id="rId{number}" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet{number}.xml"/>'
+)
+
+WORKSHEET_START_XML = (
+    XML_DECLARATION +
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetData>'
+)
+
+WORKSHEET_END_XML = '</sheetData></worksheet>'
+
+MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+RELS_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+DOC_RELS_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+
+CELL_REFERENCE = re.compile(r'^([A-Z]+)')
+
+
+class SpreadsheetError(Exception):
+    """Raised when an uploaded spreadsheet can't be read."""
+
+
+class Echo:
+    """Pseudo file object returning the written value instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def iter_chunks(lines, size=ROWS_PER_CHUNK):
+    """Yields the encoded `lines` joined by groups of `size` lines."""
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= size:
+            yield ''.join(chunk).encode('utf-8')
+            chunk = []
+    if chunk:
+        yield ''.join(chunk).encode('utf-8')
+
+
+def stream_csv(header, rows):
+    """Yields a CSV file chunk by chunk.
+
+    Args:
+        header (list<str>): the column titles
+        rows (iterable<list>): the values of each row
+
+    Yields:
+        chunk (bytes): the next UTF-8 encoded part of the file
+    """
+    writer = csv.writer(Echo())
+    # The BOM makes Excel read the file as UTF-8
+    yield '\ufeff'.encode('utf-8')
+    yield from iter_chunks(
+        writer.writerow(row) for row in _prepend(header, rows)
+    )
+
+
+def stream_xlsx(sheets):
+    """Yields an Excel (xlsx) workbook chunk by chunk.
+
+    Strings are written as inline strings instead of a shared strings
+    table, so each row can be written as soon as it is read.
+
+    Args:
+        sheets (list<tuple>): `(title, header, rows)` of each worksheet
+
+    Yields:
+        chunk (bytes): the next part of the workbook archive
+    """
+    numbers = range(1, len(sheets) + 1)
+    overrides = ''.join(SHEET_OVERRIDE_XML.format(number=n) for n in numbers)
+    workbook_sheets = ''.join(
+        WORKBOOK_SHEET_XML.format(title=escape(title, {'"': '&quot;'}), number=n)
+        for n, (title, header, rows) in zip(numbers, sheets)
+    )
+    relationships = ''.join(WORKBOOK_REL_XML.format(number=n) for n in numbers)
+    entries = [
+        ('[Content_Types].xml', [
+            CONTENT_TYPES_XML.format(overrides=overrides).encode('utf-8')
+        ]),
+        ('_rels/.rels', [ROOT_RELS_XML.encode('utf-8')]),
+        ('xl/workbook.xml', [
+            WORKBOOK_XML.format(sheets=workbook_sheets).encode('utf-8')
+        ]),
+        ('xl/_rels/workbook.xml.rels', [
+            WORKBOOK_RELS_XML.format(relationships=relationships).encode('utf-8')
+        ]),
+    ]
+    entries.extend(
+        (f'xl/worksheets/sheet{n}.xml', iter_worksheet(header, rows))
+        for n, (title, header, rows) in zip(numbers, sheets)
+    )
+    return stream_zip(entries)
+
+
+def iter_worksheet(header, rows):
+    """Yields the XML of a worksheet chunk by chunk."""
+    yield WORKSHEET_START_XML.encode('utf-8')
+    yield from iter_chunks(
+        '<row>' + ''.join(map(get_cell_xml, row)) + '</row>'
+        for row in _prepend(header, rows)
+    )
+    yield WORKSHEET_END_XML.encode('utf-8')
+
+
+def get_cell_xml(value):
+    """Returns the XML of a worksheet cell, empty for `None` values."""
+    if value is None or value == '':
+        return '<c/>'
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return f'<c><v>{value}</v></c>'
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        value = value.isoformat()
+    return f'<c t="inlineStr"><is><t>{escape(str(value))}</t></is></c>'
+
+
+def _prepend(header, rows):
+    yield header
+    yield from rows
+
+
+def read_csv(file):
+    """Returns the rows of an uploaded UTF-8 CSV file.
+
+    The rows are parsed as they are consumed.
+
+    Returns:
+        sheets (list<tuple>): a single `('', rows)` sheet
+    """
+    lines = codecs.iterdecode(file, 'utf-8-sig')
+    return [('', _iter_csv_rows(lines))]
+
+
+def _iter_csv_rows(lines):
+    try:
+        yield from csv.reader(lines)
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise SpreadsheetError(f'Invalid CSV file: {e}')
+
+
+def read_xlsx(file):
+    """Returns the worksheets of an uploaded Excel (xlsx) workbook.
+
+    The rows of each worksheet are parsed as they are consumed. Cell values
+    are returned as strings, missing cells as empty strings.
+
+    Returns:
+        sheets (list<tuple>): `(title, iterable of rows)` of each worksheet
+    """
+    try:
+        archive = zipfile.ZipFile(file)
+        workbook = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+        rels = ElementTree.fromstring(
+            archive.read('xl/_rels/workbook.xml.rels')
+        )
+        shared_strings = _read_shared_strings(archive)
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError):
+        raise SpreadsheetError('Invalid Excel file.')
+
+    targets = {
+        rel.get('Id'): rel.get('Target')
+        for rel in rels.iter(f'{RELS_NS}Relationship')
+    }
+    sheets = []
+    for sheet in workbook.iter(f'{MAIN_NS}sheet'):
+        target = targets.get(sheet.get(f'{DOC_RELS_NS}id'), '')
+        name = posixpath.normpath(
+            target.lstrip('/') if target.startswith('/')
+            else posixpath.join('xl', target)
+        )
+        sheets.append((
+            sheet.get('name'),
+            _iter_worksheet_rows(archive, name, shared_strings)
+        ))
+    return sheets
+
+
+def _read_shared_strings(archive):
+    if 'xl/sharedStrings.xml' not in archive.namelist():
+        return []
+    root = ElementTree.fromstring(archive.read('xl/sharedStrings.xml'))
+    return [
+        ''.join(text.text or '' for text in item.iter(f'{MAIN_NS}t'))
+        for item in root.iter(f'{MAIN_NS}si')
+    ]
+
+
+def _iter_worksheet_rows(archive, name, shared_strings):
+    try:
+        with archive.open(name) as f:
+            for event, element in ElementTree.iterparse(f):
+                if element.tag == f'{MAIN_NS}row':
+                    yield _get_row_values(element, shared_strings)
+                    element.clear()
+    except (KeyError, ElementTree.ParseError):
+        raise SpreadsheetError(f'Invalid Excel worksheet {name}.')
+
+
+def _get_row_values(row, shared_strings):
+    values = []
+    for cell in row.iter(f'{MAIN_NS}c'):
+        match = CELL_REFERENCE.match(cell.get('r') or '')
+        if match:
+            # Empty cells may be left out, the reference gives the column
+            column = 0
+            for letter in match.group(1):
+                column = column * 26 + ord(letter) - ord('A') + 1
+            values.extend([''] * (column - 1 - len(values)))
+        values.append(_get_cell_value(cell, shared_strings))
+    return values
+
+
+def _get_cell_value(cell, shared_strings):
+    cell_type = cell.get('t')
+    if cell_type == 'inlineStr':
+        return ''.join(text.text or '' for text in cell.iter(f'{MAIN_NS}t'))
+    value = cell.findtext(f'{MAIN_NS}v') or ''
+    if cell_type == 's' and value:
+        try:
+            return shared_strings[int(value)]
+        except (IndexError, ValueError):
+            raise SpreadsheetError(f'Invalid Excel shared string "{value}".')
+    return value
+
+
+def read_spreadsheet(file):
+    """Returns the sheets of an uploaded CSV or Excel file by extension.
+
+    Raises:
+        SpreadsheetError: if the file is not a readable CSV or Excel file
+    """
+    if file.name.lower().endswith('.xlsx'):
+        return read_xlsx(file)
+    if file.name.lower().endswith('.csv'):
+        return read_csv(file)
+    raise SpreadsheetError('Only CSV & Excel (.xlsx) files are supported.')
@@ -44,3 +44,20 @@ def object_type(value):
         type (str): The type of the object
     """
     return type(value)
+
+
+@register.simple_tag(takes_context=True)
+def cursor_url(context, cursor):
+    """Returns the query string of the current request with a new cursor.
+
+    Args:
+        cursor (str): the cursor of the linked page
+
+    Returns:
+        url (str): the query string, keeping the other query parameters
+    """
+    kwarg = getattr(context.get('view'), 'cursor_kwarg', 'cursor')
+    query = context['request'].GET.copy()
+    query.pop('page', None)
+    query[kwarg] = cursor
+    return f'?{query.urlencode()}'
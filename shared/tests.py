@@ -1,3 +1,607 @@
+import io
+import shutil
+import tempfile
+import time
+import zipfile
+from decimal import Decimal
+from xml.etree import ElementTree
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.tests.factories import AdminUserFactory
+from customers.models import Union
+from customers.tests.factories import UnionFactory
+from orders.models import Batch
+from orders.tests.factories import BatchFactory, DeliveryOrderFactory, \
+    AllocationFactory, UnionAllocationFactory
+from purchases.tests.factories import SupplierFactory
+from shared.benchmarks.runner import get_percentile, measure, compare
+from shared.cache import get_or_compute, make_key, \
+    bump_version, get_stats, reset_stats
+from shared.explain import QueryPlanMixin, get_full_scans, \
+    get_sql_full_scans
+from shared.fulltext import Match
+from shared.letters import replace_file
+from shared.pagination import CursorPaginator, InvalidCursor
+from shared.search import search
+from shared.signals import HEALTH_CHECK_INTERVAL, check_connection_health, \
+    track_connection_use
+from shared.spreadsheets import SpreadsheetError, read_xlsx, stream_csv, \
+    stream_xlsx
+from shared.zipstream import stream_zip
+
+
+User = get_user_model()
+
+
+class BenchmarkRunnerTests(TestCase):
+    """
+    Tests for the view benchmark helpers.
+    """
+    fixtures = ['roles', 'customers']
+
+    def setUp(self):
+        self.baseline = {'UnionListView': {'queries': 5, 'p95_ms': 10.0}}
+
+    def test_get_percentile_function(self):
+        """
+        Ensure `get_percentile` returns the nearest-rank percentile.
+        """
+        values = list(range(1, 21))
+
+        # Assertions
+        self.assertEqual(get_percentile(values, 95), 19)
+        self.assertEqual(get_percentile(values, 100), 20)
+        self.assertEqual(get_percentile([7], 95), 7)
+
+    def test_measure_function(self):
+        """
+        Ensure `measure` records the queries, p95 time & peak memory.
+        """
+        self.client.force_login(AdminUserFactory(status=User.ACTIVE))
+        url = reverse('customers:union-list')
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(url)
+        query_count = len(context.captured_queries)
+        result = measure(self.client, url, repeat=3)
+
+        # Assertions
+        self.assertGreater(query_count, 0)
+        self.assertEqual(result['queries'], query_count)
+        self.assertGreater(result['p95_ms'], 0)
+        self.assertGreater(result['peak_kb'], 0)
+
+    def test_compare_function_without_regressions(self):
+        """
+        Ensure `compare` accepts results within the baseline & tolerance.
+        """
+        results = {
+            'UnionListView': {'queries': 5, 'p95_ms': 14.0},
+            'UserListView': {'queries': 50, 'p95_ms': 100.0}
+        }
+        self.assertEqual(compare(results, self.baseline, 0.5), [])
+
+    def test_compare_function_with_regressions(self):
+        """
+        Ensure `compare` reports query count & p95 time regressions.
+        """
+        results = {'UnionListView': {'queries': 6, 'p95_ms': 16.0}}
+        regressions = compare(results, self.baseline, 0.5)
+
+        # Assertions
+        self.assertEqual(len(regressions), 2)
+        self.assertIn('6 queries, baseline is 5', regressions[0])
+        self.assertIn('p95 16.0ms, baseline is 10.0ms', regressions[1])
+
+    def test_compare_function_without_time_tolerance(self):
+        """
+        Ensure `compare` only checks query counts without a time tolerance.
+        """
+        results = {'UnionListView': {'queries': 5, 'p95_ms': 100.0}}
+        self.assertEqual(compare(results, self.baseline, None), [])
+
+
+class StreamZipTests(TestCase):
+    """
+    Tests for the `stream_zip` function.
+    """
+
+    def test_stream_zip_function(self):
+        """
+        Ensure the streamed chunks build a valid zip archive.
+        """
+        entries = [
+            ('a.txt', (b'x' * 1000 for _ in range(100))),
+            ('b.txt', iter([b'hello', b' ', b'world'])),
+        ]
+        chunks = list(stream_zip(entries))
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(chunks)))
+
+        # Assertions
+        self.assertGreater(len(chunks), 2)
+        self.assertEqual(archive.namelist(), ['a.txt', 'b.txt'])
+        self.assertEqual(archive.read('a.txt'), b'x' * 100000)
+        self.assertEqual(archive.read('b.txt'), b'hello world')
+        self.assertIsNone(archive.testzip())
+
+
+class ReplaceFileTests(TestCase):
+    """
+    Tests for the `replace_file` function.
+    """
+
+    def setUp(self):
+        self.storage = FileSystemStorage(location=tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.storage.location, ignore_errors=True)
+
+    def test_replace_stored_file(self):
+        """
+        Ensure a stored file is replaced in place instead of being stored
+        under another name.
+        """
+        first_name = replace_file(
+            self.storage, 'letters/1/a.docx', ContentFile(b'first')
+        )
+        second_name = replace_file(
+            self.storage, 'letters/1/a.docx', ContentFile(b'second')
+        )
+
+        # Assertions
+        self.assertEqual(first_name, 'letters/1/a.docx')
+        self.assertEqual(second_name, 'letters/1/a.docx')
+        self.assertEqual(self.storage.listdir('letters/1'), ([], ['a.docx']))
+        with self.storage.open('letters/1/a.docx') as f:
+            self.assertEqual(f.read(), b'second')
+
+
+class StreamSpreadsheetTests(TestCase):
+    """
+    Tests for the `stream_csv` & `stream_xlsx` functions.
+    """
+
+    def test_stream_csv_function(self):
+        """
+        Ensure the rows are streamed as a UTF-8 CSV file readable by Excel.
+        """
+        rows = ([n, f'Union {n}'] for n in range(1000))
+        chunks = list(stream_csv(['Quantity', 'Union'], rows))
+        lines = b''.join(chunks).decode('utf-8').splitlines()
+
+        # Assertions
+        self.assertGreater(len(chunks), 2)
+        self.assertEqual(lines[0], '\ufeffQuantity,Union')
+        self.assertEqual(lines[-1], '999,Union 999')
+
+    def test_stream_xlsx_function(self):
+        """
+        Ensure the worksheets are valid XML with escaped string cells and
+        numeric cells.
+        """
+        rows = iter([['A & B <union>', Decimal('10.5000'), None]])
+        content = b''.join(stream_xlsx([('Sheet', ['Name', 'Quantity'], rows)]))
+        archive = zipfile.ZipFile(io.BytesIO(content))
+        namespace = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+        sheet = ElementTree.fromstring(archive.read('xl/worksheets/sheet1.xml'))
+        cells = sheet.findall(f'.//{namespace}row')[1]
+
+        # Assertions
+        self.assertIn('[Content_Types].xml', archive.namelist())
+        self.assertEqual(cells[0].get('t'), 'inlineStr')
+        self.assertEqual(
+            cells[0].find(f'.//{namespace}t').text,
+            'A & B <union>'
+        )
+        self.assertEqual(cells[1].find(f'{namespace}v').text, '10.5000')
+        self.assertEqual(len(cells[2]), 0)
+
+    def test_read_xlsx_function(self):
+        """
+        Ensure the rows of the worksheets are read with their shared
+        strings, inline strings & left out empty cells.
+        """
+        workbook = zipfile.ZipFile(io.BytesIO(b''.join(stream_xlsx([
+            ('First', ['Name', 'Quantity'], iter([['Merkeb', 10]])),
+            ('Second', ['Name'], iter([])),
+        ]))))
+        parts = {name: workbook.read(name) for name in workbook.namelist()}
+        parts['xl/sharedStrings.xml'] = (
+            '<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+            '<si><t>Shared</t></si></sst>'
+        )
+        parts['xl/worksheets/sheet2.xml'] = (
+            '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+            '<sheetData><row r="1"><c r="C1" t="s"><v>0</v></c></row>'
+            '</sheetData></worksheet>'
+        )
+        content = io.BytesIO()
+        with zipfile.ZipFile(content, 'w') as archive:
+            for name, data in parts.items():
+                archive.writestr(name, data)
+        sheets = [(title, list(rows)) for title, rows in read_xlsx(content)]
+
+        # Assertions
+        self.assertEqual(sheets, [
+            ('First', [['Name', 'Quantity'], ['Merkeb', '10']]),
+            ('Second', [['', '', 'Shared']]),
+        ])
+
+    def test_read_invalid_xlsx_file(self):
+        """
+        Ensure files which are not Excel workbooks raise `SpreadsheetError`.
+        """
+        # Assertions
+        with self.assertRaises(SpreadsheetError):
+            read_xlsx(io.BytesIO(b'Name,Quantity'))
+
+
+class CursorPaginatorTests(TestCase):
+    """
+    Tests for the `CursorPaginator` paginator.
+    """
+    fixtures = ['units', 'customers']
+
+    def setUp(self):
+        # Duplicated names are ordered by their primary keys
+        for name in ('c', 'a', 'b', 'a', 'e', 'd', 'b'):
+            UnionFactory(name=name)
+        self.unions = list(Union.objects.order_by('name', 'pk'))
+
+    def walk(self, paginator):
+        """Returns the pages of `paginator` from the first to the last."""
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            pages.append(paginator.page(pages[-1].next_cursor))
+        return pages
+
+    def test_next_pages(self):
+        """
+        Ensure following the next cursors lists every object once & in
+        order.
+        """
+        pages = self.walk(CursorPaginator(Union.objects.all(), 3, ['name']))
+
+        # Assertions
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual(
+            [union for page in pages for union in page], self.unions
+        )
+        self.assertFalse(pages[0].has_previous())
+        self.assertTrue(pages[1].has_previous())
+        self.assertFalse(pages[-1].has_next())
+
+    def test_previous_pages(self):
+        """
+        Ensure the previous cursors return the same pages backwards.
+        """
+        paginator = CursorPaginator(Union.objects.all(), 3, ['name'])
+        pages = self.walk(paginator)
+        second = paginator.page(pages[2].previous_cursor)
+        first = paginator.page(second.previous_cursor)
+
+        # Assertions
+        self.assertEqual(second.object_list, pages[1].object_list)
+        self.assertEqual(first.object_list, pages[0].object_list)
+        self.assertFalse(first.has_previous())
+        self.assertEqual(
+            paginator.page(first.next_cursor).object_list,
+            pages[1].object_list
+        )
+
+    def test_descending_datetime_ordering(self):
+        """
+        Ensure descending datetime orderings keep rows created within the
+        same millisecond.
+        """
+        BatchFactory.create_batch(5)
+        paginator = CursorPaginator(Batch.objects.all(), 2, ['-created_at'])
+        batches = [batch for page in self.walk(paginator) for batch in page]
+
+        # Assertions
+        self.assertEqual(
+            batches, list(Batch.objects.order_by('-created_at', 'pk'))
+        )
+
+    def test_page_query_count(self):
+        """
+        Ensure a page is fetched in a single query without counting rows.
+        """
+        paginator = CursorPaginator(Union.objects.all(), 3, ['name'])
+        cursor = paginator.page().next_cursor
+        with CaptureQueriesContext(connection) as context:
+            list(paginator.page(cursor))
+        sql = context.captured_queries[0]['sql']
+
+        # Assertions
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertNotIn('COUNT', sql.upper())
+        self.assertNotIn('OFFSET', sql.upper())
+
+    def test_invalid_cursor(self):
+        """
+        Ensure malformed cursors raise `InvalidCursor`.
+        """
+        paginator = CursorPaginator(Union.objects.all(), 3, ['name'])
+        for cursor in ('invalid', 'e30', paginator.page().next_cursor[:-2]):
+            with self.assertRaises(InvalidCursor):
+                paginator.page(cursor)
+
+
+class SearchTests(TestCase):
+    """
+    Tests for the global search.
+    """
+    fixtures = ['roles', 'units', 'customers']
+
+    def setUp(self):
+        self.url = reverse('shared:search')
+        self.batch = BatchFactory(name='Urea 2020', lc_number='LC-7781')
+        self.delivery_order = DeliveryOrderFactory(
+            batch=self.batch, vessel='MV Golden Star',
+            bill_of_loading='MSCU-4410'
+        )
+        SupplierFactory(name='Golden Fertilizers', short_name='GF')
+        UnionFactory(name='Star Union')
+
+    def test_match_query(self):
+        """
+        Ensure the FULLTEXT query requires every term as a prefix & drops
+        the boolean operators of the user input.
+        """
+        self.assertEqual(
+            Match('name', query='mv-golden +star*').query,
+            '+mv* +golden* +star*'
+        )
+
+    def test_search_function(self):
+        """
+        Ensure all the sources are searched & prefix matches rank first.
+        """
+        results = search('golden')
+
+        # Assertions
+        self.assertEqual(
+            [result.label for result in results],
+            ['Supplier', 'Delivery Order']
+        )
+        self.assertEqual(
+            results[1].url,
+            f'{reverse("orders:batch-detail", args=[self.batch.pk])}'
+            f'?active_delivery_order={self.delivery_order.pk}'
+        )
+
+    def test_search_by_bill_of_loading_and_lc_number(self):
+        """
+        Ensure vessels & batches are found by their B/L & L/C numbers.
+        """
+        self.assertEqual(
+            [result.title for result in search('mscu 4410')],
+            ['MV Golden Star']
+        )
+        self.assertEqual(
+            [result.title for result in search('lc-7781')], [str(self.batch)]
+        )
+        self.assertEqual(search(' -+* '), [])
+
+    def test_search_view(self):
+        """
+        Ensure the search view lists the paginated results.
+        """
+        self.client.force_login(AdminUserFactory(status=User.ACTIVE))
+        response = self.client.get(self.url, {'q': 'star'})
+
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'shared/search.html')
+        self.assertEqual(len(response.context['result_list']), 2)
+        self.assertContains(response, 'Star Union')
+        self.assertContains(response, 'MV Golden Star')
+
+
+class QueryPlanTests(QueryPlanMixin, TestCase):
+    """
+    Tests for the indexes of the hot list & detail view queries.
+    """
+    fixtures = ['roles', 'units', 'customers', 'ports']
+
+    # Tables growing with the data, the small lookup tables may be scanned
+    HOT_TABLES = [
+        'orders_batch', 'orders_batchtotals', 'orders_deliveryorder',
+        'orders_deliveryordertotals', 'orders_allocation',
+        'orders_unionallocation', 'orders_distribution',
+        'orders_uniondistribution', 'accounts_customuser'
+    ]
+
+    def setUp(self):
+        for _ in range(12):
+            self.batch = BatchFactory()
+            self.delivery_order = DeliveryOrderFactory(batch=self.batch)
+        self.client.force_login(AdminUserFactory(status=User.ACTIVE))
+
+    def test_full_scan_is_detected(self):
+        """
+        Ensure `get_full_scans` & `get_sql_full_scans` report queries
+        without a usable index.
+        """
+        queryset = Batch.objects.filter(rate=1)
+
+        # Assertions
+        self.assertEqual(get_full_scans(queryset), [Batch._meta.db_table])
+        self.assertEqual(
+            get_sql_full_scans(str(queryset.query)), [Batch._meta.db_table]
+        )
+
+    def test_batch_list_queries(self):
+        """
+        Ensure the batch list pages, filters & rollups read on an index.
+        """
+        url = reverse('orders:open-batch-list')
+        response = self.client.get(url)
+        cursor = response.context['page_obj'].next_cursor
+        for query in (
+            '',
+            f'?cursor={cursor}',
+            f'?supplier={self.batch.supplier.pk}',
+            f'?product={self.batch.product.pk}'
+        ):
+            self.assertViewUsesIndexes(f'{url}{query}', self.HOT_TABLES)
+
+    def test_batch_detail_queries(self):
+        """
+        Ensure the batch detail page prefetches its tree on an index.
+        """
+        allocation = AllocationFactory(delivery_order=self.delivery_order)
+        UnionAllocationFactory(allocation=allocation)
+        self.assertViewUsesIndexes(
+            reverse('orders:batch-detail', args=[self.batch.pk]),
+            self.HOT_TABLES
+        )
+
+    def test_user_list_queries(self):
+        """
+        Ensure the user list page, status filter & facet counts read the
+        users on an index.
+        """
+        url = reverse('users:user-list')
+        for query in ('', f'?status={User.ACTIVE}'):
+            self.assertViewUsesIndexes(f'{url}{query}', self.HOT_TABLES)
+
+
+class CacheTests(TestCase):
+    """
+    Tests for the `shared.cache` helpers.
+    """
+
+    def setUp(self):
+        cache.clear()
+        reset_stats()
+        self.compute = mock.Mock(return_value={'count': 1})
+
+    def test_get_or_compute_function(self):
+        """
+        Ensure the value is computed once & counted as a miss then a hit.
+        """
+        key = make_key('tests', 'counts')
+        values = [
+            get_or_compute('tests', key, self.compute, 60) for _ in range(3)
+        ]
+
+        # Assertions
+        self.assertEqual(values, [{'count': 1}] * 3)
+        self.assertEqual(self.compute.call_count, 1)
+        self.assertEqual(get_stats(), {'tests': {'hits': 2, 'misses': 1}})
+
+    def test_get_or_compute_without_timeout(self):
+        """
+        Ensure a 0 timeout always computes the value.
+        """
+        for _ in range(2):
+            get_or_compute('tests', 'tests:counts', self.compute, 0)
+        self.assertEqual(self.compute.call_count, 2)
+
+    def test_get_or_compute_with_other_value_type(self):
+        """
+        Ensure cached values of an unexpected type are recomputed.
+        """
+        get_or_compute('tests', 'tests:counts', lambda: [1], 60)
+        value = get_or_compute(
+            'tests', 'tests:counts', self.compute, 60, value_type=dict
+        )
+        self.assertEqual(value, {'count': 1})
+
+    def test_get_or_compute_early_expiry(self):
+        """
+        Ensure a value close to its expiry is recomputed early.
+        """
+        cache.set('tests:counts', ({'count': 0}, 10, time.time() + 1), 60)
+        with mock.patch('shared.cache.random.random', return_value=0.5):
+            value = get_or_compute('tests', 'tests:counts', self.compute, 60)
+        self.assertEqual(value, {'count': 1})
+
+    def test_bump_version_function(self):
+        """
+        Ensure bumping a namespace version changes its keys.
+        """
+        key = make_key('tests', 'counts')
+        get_or_compute('tests', key, self.compute, 60)
+        bump_version('tests')
+        new_key = make_key('tests', 'counts')
+        get_or_compute('tests', new_key, self.compute, 60)
+
+        # Assertions
+        self.assertNotEqual(key, new_key)
+        self.assertEqual(self.compute.call_count, 2)
+
+
+class ConnectionHealthCheckTests(TestCase):
+    """
+    Tests for the `check_connection_health` signal receiver.
+    """
+
+    def test_unusable_connection_is_closed(self):
+        """
+        Ensure only the unusable connections with health checks are closed.
+        """
+        healthy, broken, unchecked = [
+            mock.Mock(last_used_at=None) for _ in range(3)
+        ]
+        healthy.is_usable.return_value = True
+        broken.is_usable.return_value = unchecked.is_usable.return_value = False
+        healthy.settings_dict = broken.settings_dict = {
+            'CONN_HEALTH_CHECKS': True
+        }
+        unchecked.settings_dict = {}
+        with mock.patch('shared.signals.connections') as connections:
+            connections.all.return_value = [healthy, broken, unchecked]
+            check_connection_health()
+
+        # Assertions
+        healthy.close.assert_not_called()
+        broken.close.assert_called_once()
+        unchecked.close.assert_not_called()
+
+    def test_recently_used_connection_is_not_pinged(self):
+        """
+        Ensure a connection used within the check interval isn't pinged,
+        unlike an idle one.
+        """
+        recent, idle = [
+            mock.Mock(settings_dict={'CONN_HEALTH_CHECKS': True})
+            for _ in range(2)
+        ]
+        recent.last_used_at = time.monotonic()
+        idle.last_used_at = time.monotonic() - HEALTH_CHECK_INTERVAL - 1
+        with mock.patch('shared.signals.connections') as connections:
+            connections.all.return_value = [recent, idle]
+            check_connection_health()
+
+        # Assertions
+        recent.is_usable.assert_not_called()
+        idle.is_usable.assert_called_once()
+
+    def test_queries_record_connection_use(self):
+        """
+        Ensure the executed queries record the last use of the connection.
+        """
+        conn = mock.Mock(execute_wrappers=[])
+        conn.settings_dict = {'CONN_HEALTH_CHECKS': True}
+        track_connection_use(sender=None, connection=conn)
+        track_connection_use(sender=None, connection=conn)
+        execute = mock.Mock(return_value='result')
+        result = conn.execute_wrappers[0](
+            execute, 'SELECT 1', None, False, {'connection': conn}
+        )
 
-# Create your tests here.
+        # Assertions
+        self.assertEqual(len(conn.execute_wrappers), 1)
+        self.assertEqual(result, 'result')
+        self.assertIsInstance(conn.last_used_at, float)
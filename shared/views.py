@@ -0,0 +1,28 @@
+from django.core.paginator import Paginator
+from django.views.generic import TemplateView
+
+from shared.constants import ROLE_ADMIN, ROLE_MANAGEMENT, ROLE_STAFF, ROLE_GUEST
+from shared.mixins import BaseAccessMixin
+from shared.search import search
+
+
+class SearchView(BaseAccessMixin, TemplateView):
+    """Ranked search results of batches, delivery orders, suppliers,
+    unions & products."""
+    template_name = 'shared/search.html'
+    paginate_by = 20
+    page_name = 'search'
+    access_roles = [ROLE_STAFF, ROLE_MANAGEMENT, ROLE_ADMIN, ROLE_GUEST]
+
+    def get_context_data(self, **kwargs):
+        query = self.request.GET.get('q', '').strip()
+        paginator = Paginator(search(query), self.paginate_by)
+        page = paginator.get_page(self.request.GET.get('page'))
+        kwargs.update({
+            'search_query': query,
+            'paginator': paginator,
+            'page_obj': page,
+            'is_paginated': page.has_other_pages(),
+            'result_list': page.object_list
+        })
+        return super().get_context_data(**kwargs)
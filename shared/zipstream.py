@@ -0,0 +1,73 @@
+"""Module for streaming zip archives without building them in memory."""
+import zipfile
+
+from django.core.files.storage import default_storage
+
+
+CHUNK_SIZE = 64 * 1024
+
+
+class StreamBuffer:
+    """Write-only file object collecting the bytes written by `ZipFile`.
+
+    It has no `tell` & `seek` methods, so `ZipFile` writes the archive
+    sequentially and the written bytes can be flushed after each chunk.
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        """Returns & clears the bytes written so far."""
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def iter_storage_file(name, storage=default_storage, chunk_size=CHUNK_SIZE):
+    """Returns an iterator of the content of a storage file chunk by chunk.
+
+    The file is opened right away rather than on the first chunk, so a
+    local file removed before it's streamed is still read in full.
+    """
+    return iter_file(storage.open(name, 'rb'), chunk_size)
+
+
+def iter_file(f, chunk_size=CHUNK_SIZE):
+    """Yields the content of an open file chunk by chunk, then closes it."""
+    with f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            yield chunk
+
+
+def stream_zip(entries, compression=zipfile.ZIP_DEFLATED):
+    """Yields a zip archive chunk by chunk.
+
+    Only one chunk of an entry is held in memory at a time, so the memory
+    usage doesn't grow with the size of the archive.
+
+    Args:
+        entries (iterable<tuple>): `(file name, iterable of bytes)` pairs
+        compression (int): the `zipfile` compression method
+
+    Yields:
+        chunk (bytes): the next part of the archive
+    """
+    buffer = StreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=compression) as archive:
+        for name, chunks in entries:
+            with archive.open(name, 'w') as entry:
+                for chunk in chunks:
+                    entry.write(chunk)
+                    data = buffer.pop()
+                    if data:
+                        yield data
+            yield buffer.pop()
+    yield buffer.pop()
@@ -1,3 +1,71 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
 
-# Create your tests here.
+from accounts.tests.factories import UserFactory, AdminUserFactory, \
+    StaffUserFactory, GuestUserFactory, SupplierUserFactory
+
+
+User = get_user_model()
+
+
+class UserListViewTests(TestCase):
+    """
+    Tests for the `UserListView` view.
+    """
+    fixtures = ['roles']
+
+    def setUp(self):
+        self.template = 'users/user_list.html'
+        self.url = reverse('users:user-list')
+        self.admin = AdminUserFactory(status=User.ACTIVE)
+        StaffUserFactory.create_batch(2, status=User.ACTIVE)
+        GuestUserFactory(status=User.DISABLED)
+        SupplierUserFactory.create_batch(3)
+        UserFactory()
+        cache.clear()
+
+    def test_facet_counts(self):
+        """
+        Ensure the status & role counts cover all the listed users.
+        """
+        self.client.force_login(self.admin)
+        response = self.client.get(self.url, {'status': User.PENDING})
+        context = response.context
+
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, self.template)
+        self.assertEqual(context['all_count'], 8)
+        self.assertEqual(context['pending_count'], 4)
+        self.assertEqual(context['active_count'], 3)
+        self.assertEqual(context['disabled_count'], 1)
+        self.assertEqual(context['admin_count'], 1)
+        self.assertEqual(context['management_count'], 0)
+        self.assertEqual(context['staff_count'], 2)
+        self.assertEqual(context['supplier_count'], 3)
+        self.assertEqual(context['guest_count'], 1)
+
+    def test_facet_counts_query(self):
+        """
+        Ensure all the facet counts are computed in a single query.
+        """
+        self.client.force_login(self.admin)
+        view = self.client.get(self.url).context['view']
+        with self.assertNumQueries(1):
+            view.get_facet_counts()
+
+    @override_settings(USER_FACET_COUNTS_TIMEOUT=30)
+    def test_facet_counts_are_cached(self):
+        """
+        Ensure the facet counts are cached when a timeout is set.
+        """
+        self.client.force_login(self.admin)
+        view = self.client.get(self.url).context['view']
+        UserFactory()
+
+        # Assertions
+        with self.assertNumQueries(0):
+            counts = view.get_facet_counts()
+        self.assertEqual(counts['all_count'], 8)
@@ -1,13 +1,16 @@
 from collections import namedtuple
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
-from django.db.models import Q
+from django.db.models import Count, Q
 from django.urls import reverse_lazy
 from django.views.generic import ListView, DetailView, UpdateView, DeleteView
 
 from shared.constants import ROLE_ADMIN, ROLE_MANAGEMENT, ROLE_STAFF, \
     ROLE_SUPPLIER, ROLE_GUEST
+from shared.cache import get_or_compute, make_key
+from shared.pagination import CursorPaginationMixin
 from purchases.models import Supplier
 
 from .forms import UserForm
@@ -17,9 +20,11 @@ from .mixins import BaseUserEditView
 User = get_user_model()
 
 
-class UserListView(BaseUserEditView, ListView):
+class UserListView(BaseUserEditView, CursorPaginationMixin, ListView):
     template_name = 'users/user_list.html'
     paginate_by = 10
+    cursor_ordering = ('status', )
+    facet_counts_namespace = 'users:facet-counts'
     access_roles = [ROLE_ADMIN, ROLE_GUEST]
 
     def get_queryset(self):
@@ -41,28 +46,10 @@ class UserListView(BaseUserEditView, ListView):
         return qs.order_by('status')
 
     def get_context_data(self, **kwargs):
-        # status
-        status = self.request.GET.get('status')
-        all_count = self.queryset.count()
-        pending_list = self.queryset.filter(status=User.PENDING)
-        active_list = self.queryset.filter(status=User.ACTIVE)
-        disabled_list = self.queryset.filter(status=User.DISABLED)
-
-        # Role
-        role = self.request.GET.get('role')
-        admin_list = self.queryset.filter(groups__name=ROLE_ADMIN)
-        management_list = self.queryset.filter(groups__name=ROLE_MANAGEMENT)
-        staff_list = self.queryset.filter(groups__name=ROLE_STAFF)
-        supplier_list = self.queryset.filter(groups__name=ROLE_SUPPLIER)
-        guest_list = self.queryset.filter(groups__name=ROLE_GUEST)
-
+        kwargs.update(self.get_facet_counts())
         kwargs.update({
             # Status
-            'selected_status': status,
-            'all_count': all_count,
-            'pending_count': pending_list.count(),
-            'active_count': active_list.count(),
-            'disabled_count': disabled_list.count(),
+            'selected_status': self.request.GET.get('status'),
 
             # Status Constants
             'PENDING': User.PENDING,
@@ -70,12 +57,7 @@ class UserListView(BaseUserEditView, ListView):
             'DISABLED': User.DISABLED,
 
             # Role
-            'selected_role': role,
-            'admin_count': admin_list.count(),
-            'management_count': management_list.count(),
-            'staff_count': staff_list.count(),
-            'supplier_count': supplier_list.count(),
-            'guest_count': guest_list.count(),
+            'selected_role': self.request.GET.get('role'),
 
             # Role Constants
             'ROLE_ADMIN': ROLE_ADMIN,
@@ -86,6 +68,40 @@ class UserListView(BaseUserEditView, ListView):
         })
         return super().get_context_data(**kwargs)
 
+    def get_facet_counts(self):
+        """Returns the user counts of each status & role in a single query.
+
+        The counts are cached for `USER_FACET_COUNTS_TIMEOUT` seconds. They
+        cover all the listed users, so they don't depend on the filters.
+        """
+        return get_or_compute(
+            self.facet_counts_namespace,
+            make_key(self.facet_counts_namespace),
+            self.compute_facet_counts,
+            settings.USER_FACET_COUNTS_TIMEOUT,
+            value_type=dict
+        )
+
+    def compute_facet_counts(self):
+        """Returns the user counts of each status & role."""
+        return self.queryset.aggregate(
+            all_count=Count('pk', distinct=True),
+            pending_count=self.count_users(Q(status=User.PENDING)),
+            active_count=self.count_users(Q(status=User.ACTIVE)),
+            disabled_count=self.count_users(Q(status=User.DISABLED)),
+            admin_count=self.count_users(Q(groups__name=ROLE_ADMIN)),
+            management_count=self.count_users(
+                Q(groups__name=ROLE_MANAGEMENT)
+            ),
+            staff_count=self.count_users(Q(groups__name=ROLE_STAFF)),
+            supplier_count=self.count_users(Q(groups__name=ROLE_SUPPLIER)),
+            guest_count=self.count_users(Q(groups__name=ROLE_GUEST))
+        )
+
+    def count_users(self, condition):
+        """Returns an aggregate counting the users matching `condition`."""
+        return Count('pk', filter=condition, distinct=True)
+
     def get_search_result(self, query):
         """Returns a user queryset using search query."""
         search_qs = self.queryset.filter(